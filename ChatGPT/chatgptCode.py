@@ -1,17 +1,29 @@
 # Prompt :- Simulate a double pendulum system with chaotic motion and allow user interaction to change initial conditions. Use Python to create a real-time visualization of the system's evolution.
 
+import atexit
+import math
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-from scipy.integrate import solve_ivp
-import tkinter as tk
-from tkinter import simpledialog
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.chain import Chain  # noqa: E402
+from common.playback import DensePlayback  # noqa: E402
+from common.trail import TrailBuffer  # noqa: E402
+from common.trajectory_cache import TrajectoryCache  # noqa: E402
 
 # Constants
 g = 9.81  # Gravity (m/s^2)
 L1, L2 = 1.0, 1.0  # Lengths of the rods (m)
 m1, m2 = 1.0, 1.0  # Masses (kg)
 
+# CHAIN_LINKS >= 1 swaps the double pendulum for a common/chain.py chain of that many links with
+# the same total length and mass, split evenly. theta1 sets the upper half of the links and theta2
+# the lower half. (2 links give the textbook double pendulum, which the equations below are not.)
+CHAIN_LINKS = 0
+
 def equations(t, y):
     """Defines the system of equations for the double pendulum."""
     theta1, z1, theta2, z2 = y
@@ -33,56 +45,188 @@ def equations(t, y):
     
     return [dtheta1_dt, dz1_dt, dtheta2_dt, dz2_dt]
 
+def equations_fast(t, y):
+    """Same system as equations(), returning an array; also accepts (4, k) columns for vectorized=True."""
+    # A single state goes through the math module, which is much cheaper than NumPy on 4 numbers
+    if np.ndim(y) == 1:
+        theta1, z1, theta2, z2 = y.tolist()
+        xp = math
+    else:
+        theta1, z1, theta2, z2 = y
+        xp = np
+    
+    delta = theta2 - theta1
+    sin_d, cos_d = xp.sin(delta), xp.cos(delta)
+    den1 = (m1 + m2) * L1 - m2 * L1 * cos_d ** 2
+    den2 = (L2 / L1) * den1
+    
+    dz1_dt = (m2 * L1 * z1 ** 2 * sin_d * cos_d +
+              m2 * g * xp.sin(theta2) * cos_d +
+              m2 * L2 * z2 ** 2 * sin_d -
+              (m1 + m2) * g * xp.sin(theta1)) / den1
+    dz2_dt = (-L1 * z1 ** 2 * sin_d * cos_d +
+              g * xp.sin(theta1) * cos_d -
+              L2 * z2 ** 2 * sin_d * (m1 + m2) / m2 -
+              g * xp.sin(theta2)) / den2
+    return np.array([z1, dz1_dt, z2, dz2_dt])
+
+def jacobian(t, y):
+    """Closed-form Jacobian of equations(), so implicit solvers skip finite differences."""
+    theta1, z1, theta2, z2 = y.tolist()
+    
+    delta = theta2 - theta1
+    s, c = math.sin(delta), math.cos(delta)
+    cos2 = c * c - s * s  # d(sin*cos)/d(delta)
+    k = (m1 + m2) / m2
+    den1 = (m1 + m2) * L1 - m2 * L1 * c ** 2
+    den2 = (L2 / L1) * den1
+    dden1 = -2 * m2 * L1 * c * s  # d(den1)/d(theta1) = -d(den1)/d(theta2)
+    dden2 = (L2 / L1) * dden1
+    
+    n1 = (m2 * L1 * z1 ** 2 * s * c + m2 * g * math.sin(theta2) * c +
+          m2 * L2 * z2 ** 2 * s - (m1 + m2) * g * math.sin(theta1))
+    n2 = -L1 * z1 ** 2 * s * c + g * math.sin(theta1) * c - L2 * z2 ** 2 * s * k - g * math.sin(theta2)
+    dn1_dtheta1 = (-m2 * L1 * z1 ** 2 * cos2 + m2 * g * math.sin(theta2) * s -
+                   m2 * L2 * z2 ** 2 * c - (m1 + m2) * g * math.cos(theta1))
+    dn1_dtheta2 = (m2 * L1 * z1 ** 2 * cos2 + m2 * g * (math.cos(theta2) * c - math.sin(theta2) * s) +
+                   m2 * L2 * z2 ** 2 * c)
+    dn2_dtheta1 = (L1 * z1 ** 2 * cos2 + g * (math.cos(theta1) * c + math.sin(theta1) * s) +
+                   L2 * z2 ** 2 * c * k)
+    dn2_dtheta2 = (-L1 * z1 ** 2 * cos2 - g * math.sin(theta1) * s -
+                   L2 * z2 ** 2 * c * k - g * math.cos(theta2))
+    
+    # Rows/columns follow the state order (theta1, z1, theta2, z2)
+    jac = np.zeros((4, 4))
+    jac[0, 1] = 1.0
+    jac[2, 3] = 1.0
+    jac[1, 0] = (dn1_dtheta1 - n1 / den1 * dden1) / den1
+    jac[1, 2] = (dn1_dtheta2 + n1 / den1 * dden1) / den1
+    jac[1, 1] = 2 * m2 * L1 * z1 * s * c / den1
+    jac[1, 3] = 2 * m2 * L2 * z2 * s / den1
+    jac[3, 0] = (dn2_dtheta1 - n2 / den2 * dden2) / den2
+    jac[3, 2] = (dn2_dtheta2 + n2 / den2 * dden2) / den2
+    jac[3, 1] = -2 * L1 * z1 * s * c / den2
+    jac[3, 3] = -2 * L2 * z2 * s * k / den2
+    return jac
+
+# Solver settings: FAST_RHS uses the array-returning RHS above (and the Jacobian for implicit
+# methods). See benchmarks/bench_solvers.py for how the methods compare.
+FAST_RHS = True
+METHOD = 'RK45'  # 'RK45', 'DOP853', 'Radau' or 'LSODA'
+# Tighter than solve_ivp's defaults (1e-3, 1e-6): playback runs and seeks indefinitely, and at the
+# defaults a chaotic start is 0.1 rad off the true path after a few seconds (about 20 s at 1e-8)
+RTOL, ATOL = 1e-8, 1e-8
+if CHAIN_LINKS:
+    chain = Chain(np.full(CHAIN_LINKS, (L1 + L2) / CHAIN_LINKS), (m1 + m2) / CHAIN_LINKS, g=g)
+    rhs = chain.rhs
+    # Looser, or a long chain can't be integrated as fast as it plays (about 50 links at 1e-6)
+    RTOL, ATOL = 1e-6, 1e-6
+    solver_options = {'method': METHOD, 'rtol': RTOL, 'atol': ATOL}
+elif FAST_RHS:
+    rhs = equations_fast
+    solver_options = {'method': METHOD, 'rtol': RTOL, 'atol': ATOL}
+    if METHOD in ('Radau', 'BDF', 'LSODA'):
+        solver_options['jac'] = jacobian
+else:
+    rhs = equations
+    solver_options = {'method': METHOD, 'rtol': RTOL, 'atol': ATOL}
+
 # Initial conditions (theta1, omega1, theta2, omega2 in radians)
 def get_initial_conditions():
+    import tkinter as tk  # only needed for the interactive run
+    from tkinter import simpledialog
     root = tk.Tk()
     root.withdraw()
     theta1 = np.radians(float(simpledialog.askstring("Input", "Enter initial theta1 (degrees):")))
     theta2 = np.radians(float(simpledialog.askstring("Input", "Enter initial theta2 (degrees):")))
+    if CHAIN_LINKS:
+        # Chain state: every angle, then every angular velocity
+        return list(np.where(np.arange(CHAIN_LINKS) < CHAIN_LINKS / 2, theta1, theta2)) + [0.0] * CHAIN_LINKS
     return [theta1, 0, theta2, 0]
 
-# Time array
-t_span = (0, 20)  # Simulate for 20 seconds
-t_eval = np.linspace(0, 20, 1000)
+# Playback parameters: the motion is integrated lazily in segments and interpolated per frame
+SEGMENT = 5.0  # seconds of simulation per dense-output segment
+PLAYBACK_SPEED = 1.0  # simulated seconds per wall-clock second
+SEEK_STEP = 2.0  # seconds jumped by the arrow keys
+TRAIL_LENGTH = 300  # trail points kept at full resolution
+TRAIL_LEVELS = 3  # older points are kept at 1/4, 1/16, ... of the frame rate
 
-# Get user input
-initial_conditions = get_initial_conditions()
+def init():
+    line.set_data([], [])
+    trace.set_data([], [])
+    return line, trace, time_text
 
-# Solve the differential equations
-sol = solve_ivp(equations, t_span, initial_conditions, t_eval=t_eval, method='RK45')
+def arms(state):
+    """x and y of the pivot and every bob."""
+    if CHAIN_LINKS:
+        bobs = chain.positions(state[:CHAIN_LINKS])
+        return np.append(0, bobs[:, 0]), np.append(0, -bobs[:, 1])  # the chain has y down
+    theta1, z1, theta2, z2 = state
 
-# Extract angles
-theta1, theta2 = sol.y[0], sol.y[2]
+    # Convert to Cartesian coordinates
+    x1 = L1 * np.sin(theta1)
+    y1 = -L1 * np.cos(theta1)
+    x2 = x1 + L2 * np.sin(theta2)
+    y2 = y1 - L2 * np.cos(theta2)
+    return [0, x1, x2], [0, y1, y2]
 
-# Convert to Cartesian coordinates
-x1 = L1 * np.sin(theta1)
-y1 = -L1 * np.cos(theta1)
-x2 = x1 + L2 * np.sin(theta2)
-y2 = y1 - L2 * np.cos(theta2)
+def update(frame):
+    # Interpolate the state at the current playback time rather than stepping by frame index
+    t, state = playback.current_state()
+    xs, ys = arms(state)
 
-# Create animation
-fig, ax = plt.subplots()
-ax.set_xlim(-2, 2)
-ax.set_ylim(-2, 2)
-ax.set_aspect('equal')
-ax.grid()
+    trail.append(xs[-1], ys[-1])
+    points = trail.points()
+    
+    line.set_data(xs, ys)
+    trace.set_data(points[:, 0], points[:, 1])
+    time_text.set_text(f"t = {t:.1f} s  ({playback.speed:g}x)")
+    return line, trace, time_text
 
-line, = ax.plot([], [], 'o-', lw=2)
-trace_x, trace_y = [], []
-trace, = ax.plot([], [], 'r-', alpha=0.5)
+def on_key(event):
+    # Up/down change playback speed, left/right seek, space pauses
+    if event.key == 'up':
+        playback.set_speed(playback.speed * 2 if playback.speed else 1.0)
+    elif event.key == 'down':
+        playback.set_speed(playback.speed / 2)
+    elif event.key == 'right':
+        playback.seek(playback.now() + SEEK_STEP)
+    elif event.key == 'left':
+        playback.seek(playback.now() - SEEK_STEP)
+    elif event.key == ' ':
+        playback.set_speed(0.0 if playback.speed else PLAYBACK_SPEED)
+    if event.key in ('left', 'right'):
+        # The old trace no longer leads up to the new position
+        trail.clear()
 
-def init():
-    line.set_data([], [])
-    trace.set_data([], [])
-    return line, trace
+if __name__ == "__main__":
+    # Get user input
+    initial_conditions = get_initial_conditions()
 
-def update(frame):
-    trace_x.append(x2[frame])
-    trace_y.append(y2[frame])
-    
-    line.set_data([0, x1[frame], x2[frame]], [0, y1[frame], y2[frame]])
-    trace.set_data(trace_x, trace_y)
-    return line, trace
+    # Reuse the segment boundary states of an earlier run with the same settings, so seeking
+    # anywhere in it only integrates the one segment being shown
+    cache = TrajectoryCache('chatgpt')
+    atexit.register(cache.flush)
+    solver = {'method': METHOD, 'rtol': RTOL, 'atol': ATOL}
+    key = cache.key(initial_conditions, solver=solver, g=g, L1=L1, L2=L2, m1=m1, m2=m2, segment=SEGMENT,
+                    links=CHAIN_LINKS)
+    checkpoints = cache.get(key)
+    playback = DensePlayback(rhs, initial_conditions, segment=SEGMENT, speed=PLAYBACK_SPEED,
+                             checkpoints=checkpoints, **solver_options)
+    atexit.register(lambda: cache.put(key, playback.checkpoint_array()))
+
+    # Create animation
+    fig, ax = plt.subplots()
+    ax.set_xlim(-2, 2)
+    ax.set_ylim(-2, 2)
+    ax.set_aspect('equal')
+    ax.grid()
+
+    line, = ax.plot([], [], 'o-', lw=2, ms=6 if CHAIN_LINKS <= 2 else 2)
+    trail = TrailBuffer(TRAIL_LENGTH, levels=TRAIL_LEVELS)
+    trace, = ax.plot([], [], 'r-', alpha=0.5)
+    time_text = ax.text(0.02, 0.95, '', transform=ax.transAxes)
 
-ani = FuncAnimation(fig, update, frames=len(t_eval), init_func=init, blit=True, interval=20)
-plt.show()
+    fig.canvas.mpl_connect('key_press_event', on_key)
+    ani = FuncAnimation(fig, update, init_func=init, blit=True, interval=20, cache_frame_data=False)
+    plt.show()
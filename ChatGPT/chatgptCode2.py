@@ -1,106 +1,102 @@
 # Prompt :- Simulate multiple balls bouncing off the walls and colliding with each other, following gravity and momentum conservation.
 
+import os
+import sys
 import pygame
 import random
-import math
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.ball_recording import BallRecorder  # noqa: E402
+from common.ball_renderer import BallRenderer  # noqa: E402
+from common.ball_world import BallView, BallWorld  # noqa: E402
+from common.fixed_step import FixedStep  # noqa: E402
+from common.parallel_balls import ParallelBallWorld  # noqa: E402
 
 # Constants
 WIDTH, HEIGHT = 800, 600
 BALL_COUNT = 10
 GRAVITY = 0.2
 FRICTION = 0.99
+SLEEP_DRIFT = 1.0  # balls resting on something and moving under this many pixels a frame for SLEEP_FRAMES frames stop being simulated
+SLEEP_FRAMES = 30
+RECORD_PATH = None  # e.g. 'chatgpt.balls' to record the run for tools/replay_balls.py
+SPRITE_RENDERER = True  # cached sprites + dirty rectangles instead of fill/draw.circle/flip
+FPS = 60  # rendering cap
+PHYSICS_RATE = 60  # world steps per second of wall time, independent of the frame rate
+PARALLEL_WORKERS = 0  # > 0 splits the box into strips simulated by that many processes (for 100k+ balls)
 
-# Initialize Pygame
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-clock = pygame.time.Clock()
+class Ball(BallView):
+    # Thin view onto one slot of the BallWorld arrays; the physics runs on the whole world at once
+    def draw(self, x=None, y=None):
+        if x is None:
+            x, y = self.x, self.y
+        pygame.draw.circle(screen, self.color, (int(x), int(y)), int(self.radius))
 
-class Ball:
-    def __init__(self, x, y, radius, color, mass):
-        self.x = x
-        self.y = y
-        self.radius = radius
-        self.color = color
-        self.mass = mass
-        self.vx = random.uniform(-2, 2)
-        self.vy = random.uniform(-2, 2)
-    
-    def move(self):
-        self.vy += GRAVITY  # Apply gravity
-        self.x += self.vx
-        self.y += self.vy
-        self.vx *= FRICTION
-        self.vy *= FRICTION
+def create_world():
+    # Create balls
+    initial = dict(
+        x=[random.randint(50, WIDTH - 50) for _ in range(BALL_COUNT)],
+        y=[random.randint(50, HEIGHT - 50) for _ in range(BALL_COUNT)],
+        vx=[random.uniform(-2, 2) for _ in range(BALL_COUNT)],
+        vy=[random.uniform(-2, 2) for _ in range(BALL_COUNT)],
+        radius=[random.randint(10, 20) for _ in range(BALL_COUNT)],
+        mass=[random.uniform(1, 3) for _ in range(BALL_COUNT)],
+        color=[(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)) for _ in range(BALL_COUNT)],
+        width=WIDTH,
+        height=HEIGHT,
+        gravity=(0, GRAVITY),
+        friction=FRICTION,
+        wall_elasticity=1.0,
+        pair_elasticity=1.0,  # Elastic collision formula
+        separate=True,  # Separate the balls to avoid overlap
+    )
+    if PARALLEL_WORKERS:
+        return ParallelBallWorld(**initial, workers=PARALLEL_WORKERS)
+    # Settled balls sleep until something hits them
+    return BallWorld(**initial, sleep_drift=SLEEP_DRIFT, sleep_frames=SLEEP_FRAMES)
 
-        # Collision with walls
-        if self.x - self.radius < 0 or self.x + self.radius > WIDTH:
-            self.vx *= -1
-            self.x = max(self.radius, min(WIDTH - self.radius, self.x))
-        if self.y - self.radius < 0 or self.y + self.radius > HEIGHT:
-            self.vy *= -1
-            self.y = max(self.radius, min(HEIGHT - self.radius, self.y))
+def step():
+    # Gravity, friction, walls and collisions for every ball at once
+    world.step()
+    if recorder:
+        recorder.add(world)
 
-    def draw(self):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+if __name__ == "__main__":
+    # Initialize Pygame
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    clock = pygame.time.Clock()
 
-# Collision detection and response
+    world = create_world()
+    balls = [Ball(world, i) for i in range(BALL_COUNT)]
+    renderer = BallRenderer(screen, (0, 0, 0)) if SPRITE_RENDERER else None
+    recorder = BallRecorder(RECORD_PATH, world) if RECORD_PATH else None
 
-def resolve_collision(ball1, ball2):
-    dx = ball2.x - ball1.x
-    dy = ball2.y - ball1.y
-    distance = math.sqrt(dx**2 + dy**2)
-    
-    if distance < ball1.radius + ball2.radius:
-        angle = math.atan2(dy, dx)
-        
-        # Decompose velocities into parallel and perpendicular components
-        v1_parallel = ball1.vx * math.cos(angle) + ball1.vy * math.sin(angle)
-        v2_parallel = ball2.vx * math.cos(angle) + ball2.vy * math.sin(angle)
-        
-        # Elastic collision formula
-        v1_new = ((ball1.mass - ball2.mass) * v1_parallel + 2 * ball2.mass * v2_parallel) / (ball1.mass + ball2.mass)
-        v2_new = ((ball2.mass - ball1.mass) * v2_parallel + 2 * ball1.mass * v1_parallel) / (ball1.mass + ball2.mass)
-        
-        # Convert back to x, y components
-        ball1.vx += (v1_new - v1_parallel) * math.cos(angle)
-        ball1.vy += (v1_new - v1_parallel) * math.sin(angle)
-        ball2.vx += (v2_new - v2_parallel) * math.cos(angle)
-        ball2.vy += (v2_new - v2_parallel) * math.sin(angle)
-        
-        # Separate the balls to avoid overlap
-        overlap = ball1.radius + ball2.radius - distance
-        ball1.x -= math.cos(angle) * overlap / 2
-        ball1.y -= math.sin(angle) * overlap / 2
-        ball2.x += math.cos(angle) * overlap / 2
-        ball2.y += math.sin(angle) * overlap / 2
+    # The world steps at PHYSICS_RATE off the wall clock, however long drawing takes; frames show
+    # positions interpolated between the last two steps
+    driver = FixedStep(step, lambda: (world.x.copy(), world.y.copy()), rate=PHYSICS_RATE)
 
-# Create balls
-balls = [
-    Ball(
-        random.randint(50, WIDTH - 50),
-        random.randint(50, HEIGHT - 50),
-        random.randint(10, 20),
-        (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)),
-        random.uniform(1, 3)
-    )
-    for _ in range(BALL_COUNT)
-]
-
-running = True
-while running:
-    screen.fill((0, 0, 0))
-    
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
     
-    for i, ball in enumerate(balls):
-        ball.move()
-        ball.draw()
-        for j in range(i + 1, len(balls)):
-            resolve_collision(ball, balls[j])
+        driver.advance()
+        x, y = driver.state()
     
-    pygame.display.flip()
-    clock.tick(60)
+        if renderer:
+            # One batched blit, and only the rectangles that changed go to the display
+            renderer.draw(world, x, y)
+        else:
+            screen.fill((0, 0, 0))
+            for ball, bx, by in zip(balls, x, y):
+                ball.draw(bx, by)
+            pygame.display.flip()
+        clock.tick(FPS)
 
-pygame.quit()
\ No newline at end of file
+    if recorder:
+        recorder.close()
+    if PARALLEL_WORKERS:
+        world.close()
+    pygame.quit()
\ No newline at end of file
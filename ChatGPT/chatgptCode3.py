@@ -1,16 +1,26 @@
 # Prompt :- Create a visually stunning fireworks simulation where particles shoot up from the ground, explode into vibrant, colorful patterns, and fade out naturally. The simulation should include realistic physics with gravity affecting the particles, slight randomness in explosion patterns, and smooth color transitions. Implement multiple firework launches at random intervals, each with different colors and explosion styles (e.g., circular, starburst, and cascading effects). The particles should have a fading effect to simulate realistic fireworks. Use Python with Pygame or Matplotlib to animate the scene in real-time.
 
+import itertools
+import os
+import sys
 import pygame
 import random
-import math
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.explosions import ExplosionTemplates  # noqa: E402
+from common.fixed_step import FixedStep, blend  # noqa: E402
+from common.frame_budget import FrameBudget  # noqa: E402
+from common.particles import ParticlePool  # noqa: E402
+from common.raster import AccumulationBuffer  # noqa: E402
+from common.sprite_atlas import SpriteAtlas  # noqa: E402
 
 # Initialize Pygame
 pygame.init()
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Fireworks Simulation")
+FPS = 60  # rendering cap
+PHYSICS_RATE = 60  # simulation ticks per second of wall time, independent of the frame rate
 
 # Colors
 BLACK = (0, 0, 0)
@@ -19,31 +29,29 @@ COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 165, 0), (
 # Gravity
 GRAVITY = 0.05
 
-class Particle:
-    def __init__(self, x, y, color, angle, speed, lifetime):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.angle = angle
-        self.speed = speed
-        self.lifetime = lifetime
-        self.alpha = 255  # Initial opacity
+# Every explosion particle lives in one preallocated pool, updated in a single batch per frame:
+# slow down by 2% and sink by GRAVITY each frame, fading by 4 alpha per frame
+particles = ParticlePool(capacity=4096, fall=GRAVITY, drag=0.98, fade='rate', fade_rate=4)
+firework_ids = itertools.count()
+dots = SpriteAtlas(radius=2)  # 5x5 dot, as before
 
-    def update(self):
-        # Move particle based on angle and speed
-        self.x += self.speed * math.cos(self.angle)
-        self.y += self.speed * math.sin(self.angle)
-        self.speed *= 0.98  # Slow down over time
-        self.y += GRAVITY  # Apply gravity
-        self.alpha = max(0, self.alpha - 4)  # Fade out
-        self.lifetime -= 1
-
-    def draw(self, surface):
-        if self.alpha > 0:
-            color = (*self.color, self.alpha)  # Apply alpha for fading
-            s = pygame.Surface((5, 5), pygame.SRCALPHA)
-            pygame.draw.circle(s, color, (2, 2), 2)
-            surface.blit(s, (int(self.x), int(self.y)))
+# Draw into an additive float buffer that fades by TRAIL_DECAY per frame (glow and trails)
+# instead of clearing the screen and drawing each particle
+ACCUMULATE = True
+TRAIL_DECAY = 0.85
+glow = AccumulationBuffer(WIDTH, HEIGHT, decay=TRAIL_DECAY, radius=2) if ACCUMULATE else None
+
+# Keep update + draw under 16.6 ms: over budget, launch less often, make smaller explosions and
+# merge particles crowding the same MERGE_CELL square; quality comes back when there is headroom
+budget = FrameBudget(budget=1 / 60)
+MERGE_CELL = 4
+
+# Explosions are drawn from precomputed templates by one NumPy generator; set a seed to make
+# them (and the launches) repeat from run to run
+SEED = None
+explosions = ExplosionTemplates(seed=SEED)
+if SEED is not None:
+    random.seed(SEED)
 
 class Firework:
     def __init__(self):
@@ -52,7 +60,8 @@ class Firework:
         self.color = random.choice(COLORS)
         self.speed = random.uniform(5, 7)
         self.exploded = False
-        self.explosion_particles = []
+        self.id = next(firework_ids)
+        self.explosion_slots = []  # pool slots of this firework's particles
 
     def update(self):
         if not self.exploded:
@@ -60,54 +69,97 @@ class Firework:
             self.speed *= 0.98  # Slow down
             if self.speed < 1:  # Explosion trigger
                 self.explode()
-        else:
-            for particle in self.explosion_particles:
-                particle.update()
-            self.explosion_particles = [p for p in self.explosion_particles if p.lifetime > 0]
 
     def explode(self):
         self.exploded = True
-        num_particles = random.randint(30, 60)
-        explosion_type = random.choice(["circle", "star", "cascade"])
-        for _ in range(num_particles):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 5)
-            lifetime = random.randint(40, 80)
-            if explosion_type == "star" and _ % 2 == 0:
-                angle += math.pi / 8  # Slight angle shift
-            elif explosion_type == "cascade":
-                speed *= random.uniform(0.5, 1.5)  # Varying speeds
-            self.explosion_particles.append(Particle(self.x, self.y, self.color, angle, speed, lifetime))
-
-    def draw(self, surface):
-        if not self.exploded:
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), 3)
+        num_particles = budget.count(explosions.integers(30, 60))
+        explosion_type = explosions.choice(["circle", "star", "cascade"])
+        # Random directions either way: "star" used to shift every other angle by pi / 8,
+        # which makes no difference to uniformly random angles
+        if explosion_type == "cascade":
+            vx, vy = explosions.burst(num_particles, speed=(2, 5), spread=(0.5, 1.5))  # Varying speeds
         else:
-            for particle in self.explosion_particles:
-                particle.draw(surface)
+            vx, vy = explosions.burst(num_particles, speed=(2, 5))
+        lifetimes = explosions.integers(40, 80, num_particles)
+        self.explosion_slots = particles.spawn(self.x, self.y, vx, vy, self.color, lifetimes, owner=self.id)
 
-# Main loop
-running = True
-clock = pygame.time.Clock()
-fireworks = []
+    def is_alive(self):
+        return not self.exploded or particles.owned(self.explosion_slots, self.id)
 
-while running:
-    screen.fill(BLACK)
-    
-    if random.random() < 0.02:  # Random firework launch interval
+    def draw(self, surface, x, y):
+        if not self.exploded:
+            pygame.draw.circle(surface, self.color, (int(x), int(y)), 3)
+
+def draw_particles(surface, px, py):
+    # Faded dots come from the sprite atlas instead of a new surface per particle; the sprite's
+    # top-left corner sits on the particle position, as before
+    live = particles.live()
+    dots.blits(surface, px[live].astype(int), py[live].astype(int),
+               particles.color[live], particles.alpha(live), offset=0)
+
+def draw_glow(rockets, px, py):
+    # Last frame dims, then rockets and particles add their light on top
+    glow.fade()
+    if rockets:
+        glow.splat([x for _, (x, _) in rockets], [y for _, (_, y) in rockets], [fw.color for fw, _ in rockets])
+    live = particles.live()
+    # + 2: the old 5x5 dot sprite had its top-left corner on the particle
+    glow.splat(px[live] + 2, py[live] + 2, particles.color[live], particles.alpha(live))
+    glow.present(screen)
+
+def simulate():
+    global fireworks
+    if random.random() < budget.chance(0.02):  # Random firework launch interval
         fireworks.append(Firework())
     
+    particles.update()
+    if budget.merging:
+        particles.merge(MERGE_CELL)
     for firework in fireworks:
         firework.update()
-        firework.draw(screen)
-    
-    fireworks = [fw for fw in fireworks if not fw.exploded or fw.explosion_particles]
+    fireworks = [fw for fw in fireworks if fw.is_alive()]
+
+def snapshot():
+    rockets = {fw.id: (fw.x, fw.y) for fw in fireworks if not fw.exploded}
+    return {'rockets': rockets, 'particles': particles.snapshot()}
+
+fireworks = []
+
+if __name__ == "__main__":
+    # Open the window
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Fireworks Simulation")
+
+    # Main loop
+    running = True
+    clock = pygame.time.Clock()
+
+    # Physics ticks at PHYSICS_RATE off the wall clock, however long drawing takes; frames show
+    # rockets and particles interpolated between the last two ticks
+    driver = FixedStep(simulate, snapshot, rate=PHYSICS_RATE)
+
+    while running:
+        budget.begin()
+        driver.advance()
+        budget.mark()
+
+        rocket_positions = blend(driver.previous['rockets'], driver.current['rockets'], driver.alpha)
+        rockets = [(fw, rocket_positions[fw.id]) for fw in fireworks if not fw.exploded]
+        px, py = particles.interpolate(driver.previous['particles'], driver.current['particles'], driver.alpha)
+        if glow:
+            draw_glow(rockets, px, py)
+        else:
+            screen.fill(BLACK)
+            for firework, (x, y) in rockets:
+                firework.draw(screen, x, y)
+            draw_particles(screen, px, py)
     
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
     
-    pygame.display.flip()
-    clock.tick(60)
+        pygame.display.flip()
+        budget.end()
+        clock.tick(FPS)
 
-pygame.quit()
+    pygame.quit()
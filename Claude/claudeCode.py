@@ -1,22 +1,37 @@
 # Prompt :- Simulate a double pendulum system with chaotic motion and allow user interaction to change initial conditions. Use Python to create a real-time visualization of the system's evolution.
 
+import os
 import pygame
 import numpy as np
 from numpy import sin, cos
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.chain import Chain  # noqa: E402
+from common.fixed_step import FixedStep  # noqa: E402
+from common.integrators import make_stepper  # noqa: E402
+from common.trail import TrailBuffer  # noqa: E402
+
 # Initialize Pygame
 pygame.init()
 
 # Constants
 WIDTH = 800
 HEIGHT = 600
-FPS = 60
+FPS = 60  # rendering cap
+PHYSICS_RATE = 60  # physics ticks per second of wall time, each advancing the pendulum 1/PHYSICS_RATE
 G = 9.81  # gravitational constant
 L1 = 100  # length of first pendulum
 L2 = 100  # length of second pendulum
 M1 = 1.0  # mass of first pendulum
 M2 = 1.0  # mass of second pendulum
+STEPPER = 'rk4'  # 'euler', 'rk4', 'leapfrog', 'midpoint' or 'adaptive'
+TRAIL_LENGTH = 100  # trail points kept at full resolution
+TRAIL_LEVELS = 3  # older points are kept at 1/4, 1/16, ... of the frame rate
+CHAIN_LINKS = 0  # >= 1 swaps the double pendulum for a chain of this many links (50-100 run in real time)
+CHAIN_LENGTH = 250  # total length of the chain, split evenly over the links
+CHAIN_MASS = 1.0  # total mass of the chain, split evenly over the bobs
+CHAIN_STEPPER = 'adaptive'  # a long chain whips: fixed RK4 steps at 1/60 s drift badly past ~50 links
 
 # Colors
 BLACK = (0, 0, 0)
@@ -24,102 +39,158 @@ WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 
+def state_derivatives(state):
+    # state is (theta1, theta2, p1, p2): angles first, momenta second, as the steppers expect
+    theta1, theta2, p1, p2 = state
+    dtheta1 = 6.0/(M1+M2)/(L1**2) * p1 - 3.0*cos(theta1-theta2)/(M1+M2)/(L1**2) * p2
+    dtheta2 = 3.0*cos(theta1-theta2)/(M1+M2)/(L1**2) * p1 + 3.0/(M1+M2)/(L1**2) * p2
+
+    dp1 = -(M1+M2)*G*L1*sin(theta1) - 3.0*sin(theta1-theta2)*dtheta2**2
+    dp2 = -M2*G*L2*sin(theta2) + 3.0*sin(theta1-theta2)*dtheta1**2
+
+    return np.array([dtheta1, dtheta2, dp1, dp2])
+
 class DoublePendulum:
-    def __init__(self, theta1, theta2, p1, p2):
+    def __init__(self, theta1, theta2, p1, p2, stepper=STEPPER):
         self.theta1 = theta1
         self.theta2 = theta2
         self.p1 = p1  # angular momentum of pendulum 1
         self.p2 = p2  # angular momentum of pendulum 2
-        self.trail = []
+        self.trail = TrailBuffer(TRAIL_LENGTH, levels=TRAIL_LEVELS)
+        self.step = make_stepper(stepper)
         
     def derivatives(self):
-        dtheta1 = 6.0/(M1+M2)/(L1**2) * self.p1 - 3.0*cos(self.theta1-self.theta2)/(M1+M2)/(L1**2) * self.p2
-        dtheta2 = 3.0*cos(self.theta1-self.theta2)/(M1+M2)/(L1**2) * self.p1 + 3.0/(M1+M2)/(L1**2) * self.p2
-        
-        dp1 = -(M1+M2)*G*L1*sin(self.theta1) - 3.0*sin(self.theta1-self.theta2)*dtheta2**2
-        dp2 = -M2*G*L2*sin(self.theta2) + 3.0*sin(self.theta1-self.theta2)*dtheta1**2
-        
-        return dtheta1, dtheta2, dp1, dp2
-    
-    def update(self, dt):
-        dtheta1, dtheta2, dp1, dp2 = self.derivatives()
-        
-        self.theta1 += dtheta1 * dt
-        self.theta2 += dtheta2 * dt
-        self.p1 += dp1 * dt
-        self.p2 += dp2 * dt
-        
-        # Calculate positions
+        return tuple(state_derivatives(self.state()))
+
+    def state(self):
+        return np.array([self.theta1, self.theta2, self.p1, self.p2], dtype=float)
+
+    def positions(self):
         x1 = L1 * sin(self.theta1)
         y1 = L1 * cos(self.theta1)
         x2 = x1 + L2 * sin(self.theta2)
         y2 = y1 + L2 * cos(self.theta2)
+        return (x1, y1), (x2, y2)
+
+    def update(self, dt):
+        self.theta1, self.theta2, self.p1, self.p2 = self.step(state_derivatives, self.state(), dt)
+        
+        # Calculate positions
+        (x1, y1), (x2, y2) = self.positions()
         
         # Add to trail
-        self.trail.append((int(x2 + WIDTH//2), int(y2 + HEIGHT//2)))
-        if len(self.trail) > 100:  # Keep only last 100 points
-            self.trail.pop(0)
+        self.trail.append(x2 + WIDTH//2, y2 + HEIGHT//2)
             
         return (x1, y1), (x2, y2)
 
-# Set up display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Double Pendulum Simulation")
-clock = pygame.time.Clock()
-
-# Initial conditions
-pendulum = DoublePendulum(np.pi/2, np.pi/2, 0, 0)
-paused = False
-dt = 1/FPS
-
-# Main game loop
-running = True
-while running:
-    # Event handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                paused = not paused
-            elif event.key == pygame.K_r:  # Reset
-                pendulum = DoublePendulum(np.pi/2, np.pi/2, 0, 0)
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            # Change initial conditions based on mouse position
-            x, y = pygame.mouse.get_pos()
-            pendulum.theta1 = np.arctan2(x - WIDTH//2, y - HEIGHT//2)
-            pendulum.p1 = 0
-            pendulum.p2 = 0
-            pendulum.trail = []
-
-    if not paused:
-        # Update physics
-        pos1, pos2 = pendulum.update(dt)
-        
-        # Clear screen
-        screen.fill(BLACK)
-        
-        # Draw trail
-        if len(pendulum.trail) > 1:
-            pygame.draw.lines(screen, BLUE, False, pendulum.trail, 1)
-        
-        # Draw pendulum
-        center = (WIDTH//2, HEIGHT//2)
-        p1 = (int(pos1[0] + WIDTH//2), int(pos1[1] + HEIGHT//2))
-        p2 = (int(pos2[0] + WIDTH//2), int(pos2[1] + HEIGHT//2))
-        
-        pygame.draw.line(screen, WHITE, center, p1, 2)
-        pygame.draw.line(screen, WHITE, p1, p2, 2)
-        pygame.draw.circle(screen, RED, p1, 10)
-        pygame.draw.circle(screen, RED, p2, 10)
-        
-        # Draw instructions
-        font = pygame.font.Font(None, 24)
-        text = font.render("Space: Pause/Resume | R: Reset | Click: Change Initial Position", True, WHITE)
-        screen.blit(text, (10, 10))
-        
-        pygame.display.flip()
-        clock.tick(FPS)
+    def drag(self, theta1):
+        # Swing the first arm to theta1 and let go from rest
+        self.theta1 = theta1
+        self.p1 = 0
+        self.p2 = 0
+        self.trail.clear()
+
+class PendulumChain:
+    # N links with their own lengths and masses, stepped by the same integrators; the O(N)
+    # dynamics are in common/chain.py
+    def __init__(self, theta, lengths, masses, stepper=CHAIN_STEPPER):
+        self.chain = Chain(lengths, masses, g=G)
+        n = len(self.chain)
+        self.y = np.concatenate([np.broadcast_to(np.asarray(theta, dtype=float), n), np.zeros(n)])
+        self.trail = TrailBuffer(TRAIL_LENGTH, levels=TRAIL_LEVELS)
+        self.step = make_stepper(stepper)
+
+    def state(self):
+        return self.y.copy()
+
+    def positions(self):
+        # (N, 2) bob positions relative to the pivot
+        return self.chain.positions(self.y[:len(self.chain)])
+
+    def update(self, dt):
+        self.y = self.step(self.chain.derivatives, self.y, dt)
+        points = self.positions()
+        x, y = points[-1]
+        self.trail.append(x + WIDTH//2, y + HEIGHT//2)
+        return points
+
+    def drag(self, theta1):
+        # Swing the whole chain out straight at theta1 and let go from rest
+        self.y[:] = 0
+        self.y[:len(self.chain)] = theta1
+        self.trail.clear()
+
+def new_pendulum():
+    if CHAIN_LINKS >= 1:
+        return PendulumChain(np.pi/2, np.full(CHAIN_LINKS, CHAIN_LENGTH / CHAIN_LINKS),
+                             np.full(CHAIN_LINKS, CHAIN_MASS / CHAIN_LINKS))
+    return DoublePendulum(np.pi/2, np.pi/2, 0, 0)
+
+def main():
+    # Set up display
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Double Pendulum Simulation")
+    clock = pygame.time.Clock()
+
+    # Initial conditions
+    pendulum = new_pendulum()
+    paused = False
+    dt = 1/PHYSICS_RATE
+
+    # Physics ticks at PHYSICS_RATE off the wall clock, however long drawing takes; frames show
+    # the bob positions interpolated between the last two ticks
+    driver = FixedStep(lambda: pendulum.update(dt), lambda: pendulum.positions(), rate=PHYSICS_RATE)
+
+    # Main game loop
+    running = True
+    while running:
+        # Event handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                    driver.reset()
+                elif event.key == pygame.K_r:  # Reset
+                    pendulum = new_pendulum()
+                    driver.reset()
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                # Change initial conditions based on mouse position
+                x, y = pygame.mouse.get_pos()
+                pendulum.drag(np.arctan2(x - WIDTH//2, y - HEIGHT//2))
+                driver.reset()
+
+        if not paused:
+            # Update physics: as many fixed ticks as the time since the last frame calls for
+            driver.advance()
+            points = driver.state()
+            
+            # Clear screen
+            screen.fill(BLACK)
+            
+            # Draw trail
+            if len(pendulum.trail) > 1:
+                pygame.draw.lines(screen, BLUE, False, pendulum.trail.points(), 1)
+            
+            # Draw pendulum: arms from the pivot through every bob
+            joints = [(WIDTH//2, HEIGHT//2)] + [(int(x + WIDTH//2), int(y + HEIGHT//2)) for x, y in points]
+            for start, end in zip(joints, joints[1:]):
+                pygame.draw.line(screen, WHITE, start, end, 2)
+            radius = 10 if len(joints) <= 3 else 2
+            for joint in joints[1:]:
+                pygame.draw.circle(screen, RED, joint, radius)
+            
+            # Draw instructions
+            font = pygame.font.Font(None, 24)
+            text = font.render("Space: Pause/Resume | R: Reset | Click: Change Initial Position", True, WHITE)
+            screen.blit(text, (10, 10))
+            
+            pygame.display.flip()
+            clock.tick(FPS)
+
+    pygame.quit()
+    sys.exit()
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,97 +1,72 @@
 # Prompt :- Simulate multiple balls bouncing off the walls and colliding with each other, following gravity and momentum conservation.
 
+import os
 import pygame
 import random
-import math
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.ball_recording import BallRecorder  # noqa: E402
+from common.ball_renderer import BallRenderer  # noqa: E402
+from common.ball_world import BallView, BallWorld  # noqa: E402
+from common.fixed_step import FixedStep  # noqa: E402
+from common.frame_profiler import FrameProfiler  # noqa: E402
+from common.parallel_balls import ParallelBallWorld  # noqa: E402
+
 # Initialize Pygame
 pygame.init()
 
 # Constants
 WIDTH = 800
 HEIGHT = 600
-FPS = 60
+FPS = 60  # rendering cap
+PHYSICS_RATE = 60  # world steps per second of wall time, independent of the frame rate
 GRAVITY = 0.5
 ELASTICITY = 0.95  # Energy conservation coefficient
 BALL_COUNT = 5
+SLEEP_DRIFT = 1.0  # balls resting on something and moving under this many pixels a frame for SLEEP_FRAMES frames stop being simulated
+SLEEP_FRAMES = 30
+SPRITE_RENDERER = True  # cached sprites + dirty rectangles instead of fill/draw.circle/flip
+RECORD_PATH = None  # e.g. 'claude.balls' to record the run for tools/replay_balls.py
+PARALLEL_WORKERS = 0  # > 0 splits the box into strips simulated by that many processes (for 100k+ balls)
+PROFILE = False  # overlay of per-phase frame times and counts
+TRACE_PATH = None  # e.g. 'balls.trace.json' (with PROFILE) to save a Chrome trace on exit
 
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)]
 
-class Ball:
-    def __init__(self, x, y, radius):
-        self.x = x
-        self.y = y
-        self.radius = radius
-        self.dx = random.uniform(-5, 5)
-        self.dy = random.uniform(-5, 5)
-        self.mass = radius * radius  # Mass proportional to area
-        self.color = random.choice(COLORS)
-
-    def move(self):
-        # Apply gravity
-        self.dy += GRAVITY
-        
-        # Update position
-        self.x += self.dx
-        self.y += self.dy
-
-        # Wall collisions
-        if self.x - self.radius < 0:
-            self.x = self.radius
-            self.dx *= -ELASTICITY
-        elif self.x + self.radius > WIDTH:
-            self.x = WIDTH - self.radius
-            self.dx *= -ELASTICITY
-
-        if self.y - self.radius < 0:
-            self.y = self.radius
-            self.dy *= -ELASTICITY
-        elif self.y + self.radius > HEIGHT:
-            self.y = HEIGHT - self.radius
-            self.dy *= -ELASTICITY
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-
-def check_collision(ball1, ball2):
-    dx = ball2.x - ball1.x
-    dy = ball2.y - ball1.y
-    distance = math.sqrt(dx * dx + dy * dy)
-    
-    if distance < ball1.radius + ball2.radius:
-        # Collision detected - calculate collision response
-        # Normal vector
-        nx = dx / distance
-        ny = dy / distance
-        
-        # Relative velocity
-        dvx = ball2.dx - ball1.dx
-        dvy = ball2.dy - ball1.dy
-        
-        # Normal velocity
-        normal_vel = dvx * nx + dvy * ny
-        
-        # Only proceed if objects are moving toward each other
-        if normal_vel < 0:
-            # Impact speed
-            imp = -(1 + ELASTICITY) * normal_vel
-            
-            # Total mass
-            total_mass = ball1.mass + ball2.mass
-            
-            # Impulse
-            imp1 = (2 * ball2.mass * imp) / total_mass
-            imp2 = (2 * ball1.mass * imp) / total_mass
-            
-            # Update velocities
-            ball1.dx -= imp1 * nx
-            ball1.dy -= imp1 * ny
-            ball2.dx += imp2 * nx
-            ball2.dy += imp2 * ny
+class Ball(BallView):
+    # Thin view onto one slot of the BallWorld arrays; the physics runs on the whole world at once
+    def draw(self, screen, x=None, y=None):
+        if x is None:
+            x, y = self.x, self.y
+        pygame.draw.circle(screen, self.color, (int(x), int(y)), int(self.radius))
+
+def create_world():
+    # Random positions, sizes and velocities, as before, stored in a structure of arrays
+    radii = [random.randint(20, 40) for _ in range(BALL_COUNT)]
+    initial = dict(
+        x=[random.randint(r, WIDTH - r) for r in radii],
+        y=[random.randint(r, HEIGHT - r) for r in radii],
+        vx=[random.uniform(-5, 5) for _ in radii],
+        vy=[random.uniform(-5, 5) for _ in radii],
+        radius=radii,
+        mass=[r * r for r in radii],  # Mass proportional to area
+        color=[random.choice(COLORS) for _ in radii],
+        width=WIDTH,
+        height=HEIGHT,
+        gravity=(0, GRAVITY),
+        wall_elasticity=ELASTICITY,
+        pair_elasticity=ELASTICITY,
+        separate=False,
+    )
+    if PARALLEL_WORKERS:
+        world = ParallelBallWorld(**initial, workers=PARALLEL_WORKERS)
+    else:
+        world = BallWorld(**initial, sleep_drift=SLEEP_DRIFT, sleep_frames=SLEEP_FRAMES)
+    return world, [Ball(world, i) for i in range(BALL_COUNT)]
 
 def main():
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -99,38 +74,69 @@ def main():
     clock = pygame.time.Clock()
 
     # Create balls with random positions and sizes
-    balls = []
-    for _ in range(BALL_COUNT):
-        radius = random.randint(20, 40)
-        x = random.randint(radius, WIDTH - radius)
-        y = random.randint(radius, HEIGHT - radius)
-        balls.append(Ball(x, y, radius))
+    world, balls = create_world()
+    renderer = BallRenderer(screen, BLACK) if SPRITE_RENDERER else None
+    recorder = BallRecorder(RECORD_PATH, world) if RECORD_PATH else None
+
+    def step():
+        # Gravity, motion, wall bounces and ball-ball impulses for every ball at once
+        world.step()
+        if recorder:
+            recorder.add(world)
+
+    # The world steps at PHYSICS_RATE off the wall clock, however long drawing takes; frames show
+    # positions interpolated between the last two steps
+    driver = FixedStep(step, lambda: (world.x.copy(), world.y.copy()), rate=PHYSICS_RATE)
+
+    # Time the world's stages and every display update, wherever they are called from
+    profiler = FrameProfiler(enabled=PROFILE, trace_path=TRACE_PATH)
+    if not PARALLEL_WORKERS:
+        profiler.instrument(world, integrate='integrate', collide_walls='walls', collide_pairs='collisions')
+    profiler.instrument(pygame.display, update='display', flip='display')
 
     running = True
     while running:
         # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-        # Update ball positions
-        for ball in balls:
-            ball.move()
+        with profiler.phase('events'):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
 
-        # Check for collisions between all pairs of balls
-        for i in range(len(balls)):
-            for j in range(i + 1, len(balls)):
-                check_collision(balls[i], balls[j])
+        with profiler.phase('physics'):
+            steps = driver.advance()
+            x, y = driver.state()
 
         # Draw
-        screen.fill(BLACK)
-        for ball in balls:
-            ball.draw(screen)
-        pygame.display.flip()
+        with profiler.phase('draw'):
+            if renderer:
+                renderer.draw(world, x, y)
+            else:
+                screen.fill(BLACK)
+                for ball, bx, by in zip(balls, x, y):
+                    ball.draw(screen, bx, by)
+        hud = profiler.draw(screen)
+        if not renderer:
+            pygame.display.flip()
+        elif hud:
+            pygame.display.update(hud)  # the renderer has already pushed its own rectangles
+
+        if profiler.enabled:
+            profiler.count('balls', len(world))
+            profiler.count('steps', steps)
+            if not PARALLEL_WORKERS:
+                profiler.count('pairs', world.pair_count)
+                profiler.count('asleep', int(world.asleep.sum()))
 
         # Cap the frame rate
-        clock.tick(FPS)
-
+        with profiler.phase('tick'):
+            clock.tick(FPS)
+        profiler.end_frame()
+
+    profiler.close()
+    if recorder:
+        recorder.close()
+    if PARALLEL_WORKERS:
+        world.close()
     pygame.quit()
     sys.exit()
 
@@ -1,58 +1,58 @@
 # Prompt :- Create a visually stunning fireworks simulation where particles shoot up from the ground, explode into vibrant, colorful patterns, and fade out naturally. The simulation should include realistic physics with gravity affecting the particles, slight randomness in explosion patterns, and smooth color transitions. Implement multiple firework launches at random intervals, each with different colors and explosion styles (e.g., circular, starburst, and cascading effects). The particles should have a fading effect to simulate realistic fireworks. Use Python with Pygame or Matplotlib to animate the scene in real-time.
 
+import itertools
+import os
+import sys
 import pygame
 import random
-import math
 from pygame import gfxdraw
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.explosions import ExplosionTemplates  # noqa: E402
+from common.fixed_step import FixedStep, blend  # noqa: E402
+from common.frame_profiler import FrameProfiler  # noqa: E402
+from common.particles import ParticlePool  # noqa: E402
+from common.raster import AccumulationBuffer  # noqa: E402
+from common.sprite_atlas import SpriteAtlas  # noqa: E402
+
 # Initialize Pygame
 pygame.init()
 
 # Set up the display
 WIDTH = 800
 HEIGHT = 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Fireworks Simulation")
+FPS = 60  # rendering cap
+PHYSICS_RATE = 60  # simulation ticks per second of wall time, independent of the frame rate
 
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 
-class Particle:
-    def __init__(self, x, y, color, velocity_x, velocity_y):
-        self.x = x
-        self.y = y
-        self.color = list(color)
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.alpha = 255
-        self.lifetime = random.randint(30, 60)
-        self.age = 0
-        
-    def update(self):
-        # Apply gravity
-        self.velocity_y += 0.15
-        
-        # Update position
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        
-        # Age the particle
-        self.age += 1
-        self.alpha = int(255 * (1 - self.age / self.lifetime))
-        
-        # Fade out color
-        self.color[3] = self.alpha
-        
-    def is_alive(self):
-        return self.age < self.lifetime
+# Every explosion particle lives in one preallocated pool, updated in a single batch per frame
+GRAVITY = 0.15
+firework_ids = itertools.count()
+
+# Draw into an additive float buffer that fades by TRAIL_DECAY per frame (glow and trails)
+# instead of clearing the screen and drawing each particle
+ACCUMULATE = True
+TRAIL_DECAY = 0.85
+
+# Explosions are drawn from precomputed templates by one NumPy generator; set a seed to make
+# them repeat from run to run
+SEED = None
+
+PROFILE = False  # overlay of per-phase frame times and counts
+TRACE_PATH = None  # e.g. 'fireworks.trace.json' (with PROFILE) to save a Chrome trace on exit
 
 class Firework:
-    def __init__(self, x, y):
+    def __init__(self, x, y, particles, templates):
         self.x = x
         self.y = y
         self.exploded = False
-        self.particles = []
+        self.particles = particles
+        self.templates = templates
+        self.id = next(firework_ids)
+        self.slots = []  # pool slots of this firework's particles
         self.velocity_y = random.uniform(-16, -12)
         self.color = (
             random.randint(50, 255),
@@ -62,30 +62,19 @@ class Firework:
         )
         
     def explode(self):
-        num_particles = random.randint(50, 80)
-        explosion_type = random.choice(['circular', 'starburst', 'cascade'])
+        templates = self.templates
+        num_particles = templates.integers(50, 80)
+        explosion_type = templates.choice(['circular', 'starburst', 'cascade'])
         
         if explosion_type == 'circular':
-            for i in range(num_particles):
-                angle = (i / num_particles) * 2 * math.pi
-                speed = random.uniform(3, 6)
-                vx = math.cos(angle) * speed
-                vy = math.sin(angle) * speed
-                self.particles.append(Particle(self.x, self.y, self.color, vx, vy))
-                
+            vx, vy = templates.circular(num_particles, speed=(3, 6))
         elif explosion_type == 'starburst':
-            for _ in range(num_particles):
-                angle = random.uniform(0, 2 * math.pi)
-                speed = random.uniform(2, 8)
-                vx = math.cos(angle) * speed
-                vy = math.sin(angle) * speed
-                self.particles.append(Particle(self.x, self.y, self.color, vx, vy))
-                
+            vx, vy = templates.burst(num_particles, speed=(2, 8))
         else:  # cascade
-            for _ in range(num_particles):
-                vx = random.uniform(-3, 3)
-                vy = random.uniform(-2, 4)
-                self.particles.append(Particle(self.x, self.y, self.color, vx, vy))
+            vx, vy = templates.box(num_particles, vx=(-3, 3), vy=(-2, 4))
+        
+        lifetimes = templates.integers(30, 60, num_particles)
+        self.slots = self.particles.spawn(self.x, self.y, vx, vy, self.color[:3], lifetimes, owner=self.id)
     
     def update(self):
         if not self.exploded:
@@ -95,61 +84,119 @@ class Firework:
             if self.velocity_y >= 0:
                 self.exploded = True
                 self.explode()
-        else:
-            for particle in self.particles:
-                particle.update()
-            self.particles = [p for p in self.particles if p.is_alive()]
     
     def is_alive(self):
-        return not self.exploded or len(self.particles) > 0
+        return not self.exploded or self.particles.owned(self.slots, self.id)
+
+class FireworkShow:
+    # Everything the physics ticks touch: rockets, the particle pool and the launch schedule
+    def __init__(self, seed=SEED):
+        self.fireworks = []
+        self.particles = ParticlePool(capacity=4096, gravity=GRAVITY)
+        self.templates = ExplosionTemplates(seed=seed)
+        if seed is not None:
+            random.seed(seed)  # rocket colours, speeds and positions too
+        self.last_launch = 0
+        self.ticks = 0
+    
+    def launch(self, x):
+        self.fireworks.append(Firework(x, HEIGHT, self.particles, self.templates))
+    
+    def step(self):
+        # Simulated milliseconds, so launches keep pace with the physics rather than the display
+        current_time = self.ticks * 1000 // PHYSICS_RATE
+        self.ticks += 1
+        
+        # Automatic launching
+        if current_time - self.last_launch > random.randint(500, 2000):
+            self.launch(random.randint(50, WIDTH - 50))
+            self.last_launch = current_time
+        
+        # Update: every particle at once, then the rockets (which may explode into new particles)
+        self.particles.update()
+        for firework in self.fireworks:
+            firework.update()
+        self.fireworks = [f for f in self.fireworks if f.is_alive()]
+    
+    def snapshot(self):
+        rockets = {f.id: (f.x, f.y) for f in self.fireworks if not f.exploded}
+        return {'rockets': rockets, 'particles': self.particles.snapshot()}
 
 def main():
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Fireworks Simulation")
     clock = pygame.time.Clock()
-    fireworks = []
+    show = FireworkShow()
+    particles = show.particles
+    dots = SpriteAtlas(radius=1)  # 3x3 dot, as before
+    glow = AccumulationBuffer(WIDTH, HEIGHT, decay=TRAIL_DECAY, radius=1) if ACCUMULATE else None
     running = True
-    last_launch = 0
+    
+    # Physics ticks at PHYSICS_RATE off the wall clock, however long drawing takes; frames show
+    # rockets and particles interpolated between the last two ticks
+    driver = FixedStep(show.step, show.snapshot, rate=PHYSICS_RATE)
+    
+    # Time the particle batch, explosions, each drawing stage and the flip, wherever they are called from
+    profiler = FrameProfiler(enabled=PROFILE, trace_path=TRACE_PATH)
+    profiler.instrument(particles, update='particles')
+    profiler.instrument(Firework, explode='explode')
+    profiler.instrument(pygame.display, flip='display')
+    if glow:
+        profiler.instrument(glow, fade='fade', splat='splat', present='present')
+    else:
+        profiler.instrument(dots, blits='sprites')
     
     while running:
-        current_time = pygame.time.get_ticks()
+        with profiler.phase('events'):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    # Launch firework at mouse click position
+                    x, _ = pygame.mouse.get_pos()
+                    show.launch(x)
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                # Launch firework at mouse click position
-                x, _ = pygame.mouse.get_pos()
-                fireworks.append(Firework(x, HEIGHT))
-        
-        # Automatic launching
-        if current_time - last_launch > random.randint(500, 2000):
-            x = random.randint(50, WIDTH - 50)
-            fireworks.append(Firework(x, HEIGHT))
-            last_launch = current_time
-        
-        # Update
-        for firework in fireworks:
-            firework.update()
-        fireworks = [f for f in fireworks if f.is_alive()]
+        with profiler.phase('physics'):
+            steps = driver.advance()
+        with profiler.phase('interpolate'):
+            rocket_positions = blend(driver.previous['rockets'], driver.current['rockets'], driver.alpha)
+            rockets = [(f, rocket_positions.get(f.id, (f.x, f.y))) for f in show.fireworks if not f.exploded]
+            px, py = particles.interpolate(driver.previous['particles'], driver.current['particles'], driver.alpha)
         
         # Draw
-        screen.fill(BLACK)
-        
-        # Draw fireworks
-        for firework in fireworks:
-            if not firework.exploded:
-                pygame.draw.circle(screen, firework.color, (int(firework.x), int(firework.y)), 2)
-            
-            for particle in firework.particles:
-                color = list(particle.color)
-                if len(color) == 4:  # Remove alpha if present
-                    color = color[:3]
-                surface = pygame.Surface((3, 3), pygame.SRCALPHA)
-                pygame.draw.circle(surface, (*color, particle.alpha), (1, 1), 1)
-                screen.blit(surface, (int(particle.x) - 1, int(particle.y) - 1))
+        with profiler.phase('draw'):
+            live = particles.live()
+            if glow:
+                # Last frame dims, then rockets and particles add their light on top
+                glow.fade()
+                if rockets:
+                    glow.splat([x for _, (x, _) in rockets], [y for _, (_, y) in rockets],
+                               [f.color[:3] for f, _ in rockets])
+                glow.splat(px[live], py[live], particles.color[live], particles.alpha(live))
+                glow.present(screen)
+            else:
+                screen.fill(BLACK)
+                
+                # Draw fireworks
+                for firework, (x, y) in rockets:
+                    pygame.draw.circle(screen, firework.color, (int(x), int(y)), 2)
+                
+                # Faded dots come from the sprite atlas instead of a new surface per particle
+                dots.blits(screen, px[live].astype(int), py[live].astype(int),
+                           particles.color[live], particles.alpha(live))
+        profiler.draw(screen)
         
         pygame.display.flip()
-        clock.tick(60)
+        
+        if profiler.enabled:
+            profiler.count('particles', len(live))
+            profiler.count('rockets', len(rockets))
+            profiler.count('steps', steps)
+        with profiler.phase('tick'):
+            clock.tick(FPS)
+        profiler.end_frame()
     
+    profiler.close()
     pygame.quit()
 
 if __name__ == "__main__":
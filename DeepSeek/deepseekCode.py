@@ -1,9 +1,22 @@
 # Prompt :- Simulate a double pendulum system with chaotic motion and allow user interaction to change initial conditions. Use Python to create a real-time visualization of the system's evolution.
+import atexit
+import math
+import os
+import queue
+import sys
+import threading
+import time
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
 from matplotlib.widgets import Slider
 from scipy.integrate import solve_ivp
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.chain import Chain  # noqa: E402
+from common.playback import DensePlayback  # noqa: E402
+from common.trajectory_cache import TrajectoryCache  # noqa: E402
+
 # Constants
 g = 9.81  # gravity (m/s^2)
 L1 = 1.0  # length of the first pendulum (m)
@@ -11,6 +24,13 @@ L2 = 1.0  # length of the second pendulum (m)
 m1 = 1.0  # mass of the first pendulum (kg)
 m2 = 1.0  # mass of the second pendulum (kg)
 
+# CHAIN_LINKS >= 1 swaps the double pendulum for a common/chain.py chain of that many links with
+# the same total length and mass, split evenly. Theta1/Omega1 set the upper half of the links and
+# Theta2/Omega2 the lower half. (2 links give the textbook double pendulum, which the equations
+# below are not.)
+CHAIN_LINKS = 0
+LINKS = CHAIN_LINKS or 2
+
 # Initial conditions
 theta1_0 = np.pi / 2  # initial angle of the first pendulum (rad)
 theta2_0 = np.pi / 2  # initial angle of the second pendulum (rad)
@@ -22,6 +42,40 @@ t_max = 30  # maximum time (s)
 dt = 0.05  # time step (s)
 t_eval = np.arange(0, t_max, dt)
 
+# Background integration parameters
+DEBOUNCE = 0.03  # wait this long after the last slider event before solving (s)
+FIRST_CHUNK = 1.0  # simulated seconds in the first streamed chunk, so something draws right away (s)
+CHUNK = 5.0  # simulated seconds in every later chunk (s)
+POLL_INTERVAL = 30  # how often the GUI checks for finished chunks (ms)
+
+# Solver settings. FAST_RHS hands solve_ivp an array-returning right-hand side (safe with
+# vectorized=True) and, for the implicit methods, a closed-form Jacobian instead of finite
+# differences. See benchmarks/bench_solvers.py for how the methods compare.
+FAST_RHS = True
+METHOD = 'RK45'  # 'RK45', 'DOP853', 'Radau' or 'LSODA'
+RTOL, ATOL = 1e-3, 1e-6  # solve_ivp's defaults
+
+# Animation parameters: the pendulum is drawn at the state interpolated for the wall-clock time
+SEGMENT = 2.0  # seconds of simulation per dense-output segment
+PLAYBACK_SPEED = 1.0  # simulated seconds per wall-clock second
+
+# Solved trajectories, so revisiting a slider setting needs no solve at all
+cache = TrajectoryCache('deepseek')
+atexit.register(cache.flush)
+
+
+def cache_key(y0):
+    # Different solver settings give different trajectories, so they are part of the key too
+    solver = {'method': METHOD, 'rtol': RTOL, 'atol': ATOL}
+    return cache.key(y0, solver=solver, g=g, L1=L1, L2=L2, m1=m1, m2=m2, t_max=t_max, dt=dt,
+                     links=CHAIN_LINKS)
+
+
+def initial_state(theta1, theta2, omega1, omega2):
+    """State vector for the slider values: every angle, then every angular velocity."""
+    upper = np.arange(LINKS) < LINKS / 2
+    return list(np.where(upper, theta1, theta2)) + list(np.where(upper, omega1, omega2))
+
 # Function to compute the derivatives of the state vector
 def derivatives(t, y):
     theta1, theta2, omega1, omega2 = y
@@ -44,6 +98,150 @@ def derivatives(t, y):
     
     return [dtheta1_dt, dtheta2_dt, domega1_dt, domega2_dt]
 
+# Same equations as derivatives(), returning an array. A single state goes through the math
+# module (much cheaper than NumPy on 4 numbers); (4, k) columns from vectorized=True use NumPy.
+def derivatives_fast(t, y):
+    if np.ndim(y) == 1:
+        theta1, theta2, omega1, omega2 = y.tolist()
+        xp = math
+    else:
+        theta1, theta2, omega1, omega2 = y
+        xp = np
+    delta_theta = theta2 - theta1
+    sin_d = xp.sin(delta_theta)
+    cos_d = xp.cos(delta_theta)
+    den1 = (m1 + m2) * L1 - m2 * L1 * cos_d ** 2
+    den2 = (L2 / L1) * den1
+
+    domega1_dt = (m2 * L2 * omega2 ** 2 * sin_d -
+                  m2 * g * xp.sin(theta2) * cos_d +
+                  (m1 + m2) * g * xp.sin(theta1)) / den1
+    domega2_dt = (-L1 / L2 * omega1 ** 2 * sin_d -
+                  g * xp.sin(theta2) +
+                  g * xp.sin(theta1) * cos_d) / den2
+    return np.array([omega1, omega2, domega1_dt, domega2_dt])
+
+# Closed-form Jacobian of derivatives(), used by the implicit solvers
+def jacobian(t, y):
+    theta1, theta2, omega1, omega2 = y.tolist()
+    delta_theta = theta2 - theta1
+    s = math.sin(delta_theta)
+    c = math.cos(delta_theta)
+    den1 = (m1 + m2) * L1 - m2 * L1 * c ** 2
+    den2 = (L2 / L1) * den1
+    # d(den1)/d(theta1); d(den1)/d(theta2) is the negative of this
+    dden1 = -2 * m2 * L1 * c * s
+    dden2 = (L2 / L1) * dden1
+
+    n1 = m2 * L2 * omega2 ** 2 * s - m2 * g * math.sin(theta2) * c + (m1 + m2) * g * math.sin(theta1)
+    n2 = -L1 / L2 * omega1 ** 2 * s - g * math.sin(theta2) + g * math.sin(theta1) * c
+    dn1_dtheta1 = -m2 * L2 * omega2 ** 2 * c - m2 * g * math.sin(theta2) * s + (m1 + m2) * g * math.cos(theta1)
+    dn1_dtheta2 = m2 * L2 * omega2 ** 2 * c - m2 * g * math.cos(theta2) * c + m2 * g * math.sin(theta2) * s
+    dn2_dtheta1 = L1 / L2 * omega1 ** 2 * c + g * math.cos(theta1) * c + g * math.sin(theta1) * s
+    dn2_dtheta2 = -L1 / L2 * omega1 ** 2 * c - g * math.cos(theta2) - g * math.sin(theta1) * s
+
+    jac = np.zeros((4, 4))
+    jac[0, 2] = 1.0
+    jac[1, 3] = 1.0
+    # Quotient rule: d(n/den) = (dn - (n/den) * dden) / den
+    jac[2, 0] = (dn1_dtheta1 - n1 / den1 * dden1) / den1
+    jac[2, 1] = (dn1_dtheta2 + n1 / den1 * dden1) / den1
+    jac[2, 3] = 2 * m2 * L2 * omega2 * s / den1
+    jac[3, 0] = (dn2_dtheta1 - n2 / den2 * dden2) / den2
+    jac[3, 1] = (dn2_dtheta2 + n2 / den2 * dden2) / den2
+    jac[3, 2] = -2 * L1 / L2 * omega1 * s / den2
+    return jac
+
+# Right-hand side and options handed to every solve_ivp call
+if CHAIN_LINKS:
+    chain = Chain(np.full(CHAIN_LINKS, (L1 + L2) / CHAIN_LINKS), (m1 + m2) / CHAIN_LINKS, g=g)
+    rhs = chain.rhs
+    # At the default rtol the energy of a whipping chain runs away (solve_ivp gives up after ~20 s)
+    RTOL, ATOL = 1e-6, 1e-6
+    solver_options = {'method': METHOD, 'rtol': RTOL, 'atol': ATOL}
+elif FAST_RHS:
+    rhs = derivatives_fast
+    solver_options = {'method': METHOD, 'rtol': RTOL, 'atol': ATOL}
+    if METHOD in ('Radau', 'BDF', 'LSODA'):
+        solver_options['jac'] = jacobian
+else:
+    rhs = derivatives
+    solver_options = {'method': METHOD, 'rtol': RTOL, 'atol': ATOL}
+
+# x and y of every bob (y up), for the angles of one state or of a whole trajectory (a row per link)
+def bobs(theta):
+    theta = np.asarray(theta)
+    lengths = chain.lengths if CHAIN_LINKS else np.array([L1, L2])
+    lengths = lengths.reshape((-1,) + (1,) * (theta.ndim - 1))
+    return np.cumsum(lengths * np.sin(theta), axis=0), np.cumsum(-lengths * np.cos(theta), axis=0)
+
+# Integrates trajectories off the GUI thread. Only the most recent request matters: a new
+# submit bumps the generation, which cancels any run still in progress at its next chunk
+# boundary. Results are streamed back through a queue one chunk at a time.
+class IntegrationWorker:
+    def __init__(self):
+        self.results = queue.Queue()
+        self.generation = 0
+        self.request = None
+        self.request_time = 0.0
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, y0):
+        with self.condition:
+            self.generation += 1
+            self.request = (self.generation, list(y0))
+            self.request_time = time.perf_counter()
+            self.condition.notify()
+        return self.generation
+
+    def is_stale(self, generation):
+        return generation != self.generation
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.request is None:
+                    self.condition.wait()
+                # Debounce: keep waiting while the slider is still moving
+                while time.perf_counter() - self.request_time < DEBOUNCE:
+                    self.condition.wait(DEBOUNCE - (time.perf_counter() - self.request_time))
+                generation, y0 = self.request
+                self.request = None
+            self.integrate(generation, y0)
+
+    def integrate(self, generation, y0):
+        key = cache_key(y0)
+        cached = cache.get(key)
+        if cached is not None:
+            self.results.put((generation, cached, True))
+            return
+
+        start = 0
+        chunks = []
+        chunk_steps = int(round(FIRST_CHUNK / dt))
+        y = y0
+        while start < len(t_eval):
+            if self.is_stale(generation):
+                return
+            stop = min(start + chunk_steps, len(t_eval) - 1)
+            last = stop == len(t_eval) - 1
+            t_end = t_max if last else t_eval[stop]
+            t_points = t_eval[start:stop + 1]
+            chunk = solve_ivp(rhs, [t_eval[start], t_end], y, t_eval=t_points,
+                              **solver_options)
+            y = chunk.y[:, -1]
+            # The boundary sample is the first sample of the next chunk, so only send it at the end
+            chunks.append(chunk.y if last else chunk.y[:, :-1])
+            self.results.put((generation, chunks[-1], last))
+            if last:
+                cache.put(key, np.concatenate(chunks, axis=1))
+                return
+            start = stop
+            chunk_steps = int(round(CHUNK / dt))
+
+
 # Function to update the plot when sliders are changed
 def update(val):
     # Get new initial conditions from sliders
@@ -51,60 +249,101 @@ def update(val):
     theta2_0 = slider_theta2.val
     omega1_0 = slider_omega1.val
     omega2_0 = slider_omega2.val
-    
-    # Solve the ODE with new initial conditions
-    sol = solve_ivp(derivatives, [0, t_max], [theta1_0, theta2_0, omega1_0, omega2_0], t_eval=t_eval)
-    
-    # Update the pendulum positions
-    x1 = L1 * np.sin(sol.y[0])
-    y1 = -L1 * np.cos(sol.y[0])
-    x2 = x1 + L2 * np.sin(sol.y[1])
-    y2 = y1 - L2 * np.cos(sol.y[1])
-    
-    # Update the plot
-    line1.set_data([0, x1[-1]], [0, y1[-1]])
-    line2.set_data([x1[-1], x2[-1]], [y1[-1], y2[-1]])
-    trajectory.set_data(x2, y2)
+
+    # Restart the animated pendulum from the new initial conditions
+    y0 = initial_state(theta1_0, theta2_0, omega1_0, omega2_0)
+    stream['playback'] = DensePlayback(rhs, y0, segment=SEGMENT, speed=PLAYBACK_SPEED, **solver_options)
+
+    # Hand the solve to the background worker; stale runs are cancelled there
+    stream['generation'] = worker.submit(y0)
+    stream['chunks'] = []
+    stream['submitted'] = time.perf_counter()
+    stream['first_drawn'] = False
+
+
+# Timer callback on the GUI thread: draw whatever chunks have arrived for the latest request
+def poll_results():
+    got_new = False
+    while True:
+        try:
+            generation, y, last = worker.results.get_nowait()
+        except queue.Empty:
+            break
+        if generation == stream['generation']:
+            stream['chunks'].append(y)
+            got_new = True
+    if not got_new:
+        return
+
+    y = np.concatenate(stream['chunks'], axis=1)
+
+    # Update the trajectory of the last bob
+    path_x, path_y = bobs(y[:LINKS])
+    trajectory.set_data(path_x[-1], path_y[-1])
+    if not stream['first_drawn']:
+        stream['first_drawn'] = True
+        latency = (time.perf_counter() - stream['submitted']) * 1000
+        latency_text.set_text(f"First redraw after {latency:.0f} ms")
     fig.canvas.draw_idle()
 
-# Solve the initial ODE
-sol = solve_ivp(derivatives, [0, t_max], [theta1_0, theta2_0, omega1_0, omega2_0], t_eval=t_eval)
-
-# Extract the positions of the pendulums
-x1 = L1 * np.sin(sol.y[0])
-y1 = -L1 * np.cos(sol.y[0])
-x2 = x1 + L2 * np.sin(sol.y[1])
-y2 = y1 - L2 * np.cos(sol.y[1])
-
-# Create the plot
-fig, ax = plt.subplots(figsize=(8, 8))
-ax.set_xlim(-2.5, 2.5)
-ax.set_ylim(-2.5, 2.5)
-ax.set_aspect('equal')
-ax.grid()
-
-# Plot the pendulum
-line1, = ax.plot([0, x1[-1]], [0, y1[-1]], 'k-', lw=2)
-line2, = ax.plot([x1[-1], x2[-1]], [y1[-1], y2[-1]], 'k-', lw=2)
-trajectory, = ax.plot(x2, y2, 'r-', lw=1)
-
-# Create sliders for initial conditions
-axcolor = 'lightgoldenrodyellow'
-ax_theta1 = plt.axes([0.2, 0.01, 0.65, 0.03], facecolor=axcolor)
-ax_theta2 = plt.axes([0.2, 0.05, 0.65, 0.03], facecolor=axcolor)
-ax_omega1 = plt.axes([0.2, 0.09, 0.65, 0.03], facecolor=axcolor)
-ax_omega2 = plt.axes([0.2, 0.13, 0.65, 0.03], facecolor=axcolor)
-
-slider_theta1 = Slider(ax_theta1, 'Theta1', 0, 2 * np.pi, valinit=theta1_0)
-slider_theta2 = Slider(ax_theta2, 'Theta2', 0, 2 * np.pi, valinit=theta2_0)
-slider_omega1 = Slider(ax_omega1, 'Omega1', -10, 10, valinit=omega1_0)
-slider_omega2 = Slider(ax_omega2, 'Omega2', -10, 10, valinit=omega2_0)
-
-# Attach the update function to the sliders
-slider_theta1.on_changed(update)
-slider_theta2.on_changed(update)
-slider_omega1.on_changed(update)
-slider_omega2.on_changed(update)
-
-# Show the plot
-plt.show()
\ No newline at end of file
+
+# Animation callback: draw the arms at the current playback time
+def animate(frame):
+    t, state = stream['playback'].current_state()
+    x, y = bobs(state[:LINKS])
+    arms.set_data(np.append(0, x), np.append(0, y))
+    return arms,
+
+if __name__ == "__main__":
+    # Solve the initial ODE (or load it from the cache)
+    y0 = initial_state(theta1_0, theta2_0, omega1_0, omega2_0)
+    sol_y = cache.get(cache_key(y0))
+    if sol_y is None:
+        sol_y = solve_ivp(rhs, [0, t_max], y0, t_eval=t_eval, **solver_options).y
+        cache.put(cache_key(y0), sol_y)
+
+    # Extract the positions of the pendulums
+    path_x, path_y = bobs(sol_y[:LINKS])
+
+    # Create the plot
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.set_xlim(-2.5, 2.5)
+    ax.set_ylim(-2.5, 2.5)
+    ax.set_aspect('equal')
+    ax.grid()
+
+    # Plot the pendulum
+    arms, = ax.plot(np.append(0, path_x[:, -1]), np.append(0, path_y[:, -1]), 'k-', lw=2)
+    trajectory, = ax.plot(path_x[-1], path_y[-1], 'r-', lw=1)
+    latency_text = ax.text(0.02, 0.97, '', transform=ax.transAxes, va='top')
+
+    # Create sliders for initial conditions
+    axcolor = 'lightgoldenrodyellow'
+    ax_theta1 = plt.axes([0.2, 0.01, 0.65, 0.03], facecolor=axcolor)
+    ax_theta2 = plt.axes([0.2, 0.05, 0.65, 0.03], facecolor=axcolor)
+    ax_omega1 = plt.axes([0.2, 0.09, 0.65, 0.03], facecolor=axcolor)
+    ax_omega2 = plt.axes([0.2, 0.13, 0.65, 0.03], facecolor=axcolor)
+
+    slider_theta1 = Slider(ax_theta1, 'Theta1', 0, 2 * np.pi, valinit=theta1_0)
+    slider_theta2 = Slider(ax_theta2, 'Theta2', 0, 2 * np.pi, valinit=theta2_0)
+    slider_omega1 = Slider(ax_omega1, 'Omega1', -10, 10, valinit=omega1_0)
+    slider_omega2 = Slider(ax_omega2, 'Omega2', -10, 10, valinit=omega2_0)
+
+    # Start the background integration worker and poll it from a GUI timer
+    worker = IntegrationWorker()
+    stream = {'generation': 0, 'chunks': [], 'submitted': 0.0, 'first_drawn': True,
+              'playback': DensePlayback(rhs, y0, segment=SEGMENT, speed=PLAYBACK_SPEED,
+                                            **solver_options)}
+    timer = fig.canvas.new_timer(interval=POLL_INTERVAL)
+    timer.add_callback(poll_results)
+    timer.start()
+
+    # Attach the update function to the sliders
+    slider_theta1.on_changed(update)
+    slider_theta2.on_changed(update)
+    slider_omega1.on_changed(update)
+    slider_omega2.on_changed(update)
+
+    # Animate the arms and show the plot
+    ani = FuncAnimation(fig, animate, interval=20, cache_frame_data=False)
+    plt.show()
\ No newline at end of file
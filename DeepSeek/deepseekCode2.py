@@ -1,8 +1,16 @@
 # Prompt :- Simulate multiple balls bouncing off the walls and colliding with each other, following gravity and momentum conservation.
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+from matplotlib.collections import EllipseCollection
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.ball_recording import BallRecorder  # noqa: E402
+from common.ball_world import BallWorld  # noqa: E402
+from common.event_collisions import EventDrivenWorld  # noqa: E402
 
 # Constants
 NUM_BALLS = 5
@@ -10,66 +18,52 @@ RADIUS = 0.1
 WIDTH, HEIGHT = 10, 10
 GRAVITY = 9.81
 DT = 0.01
+RECORD_PATH = None  # e.g. 'deepseek.balls' to record the run for tools/replay_balls.py
+EVENT_DRIVEN = True  # jump from collision to collision instead of stepping by DT and checking overlaps
 
-# Ball class
-class Ball:
-    def __init__(self, position, velocity, mass):
-        self.position = np.array(position, dtype=float)
-        self.velocity = np.array(velocity, dtype=float)
-        self.mass = mass
-
-    def update_position(self):
-        self.position += self.velocity * DT
-        self.velocity[1] -= GRAVITY * DT  # Apply gravity
-
-    def check_wall_collision(self):
-        if self.position[0] <= RADIUS or self.position[0] >= WIDTH - RADIUS:
-            self.velocity[0] *= -1  # Reverse horizontal velocity
-        if self.position[1] <= RADIUS or self.position[1] >= HEIGHT - RADIUS:
-            self.velocity[1] *= -1  # Reverse vertical velocity
-
-    def check_ball_collision(self, other):
-        distance = np.linalg.norm(self.position - other.position)
-        if distance <= 2 * RADIUS:
-            # Elastic collision calculation
-            normal = (other.position - self.position) / distance
-            tangent = np.array([-normal[1], normal[0]])
-            v1n = np.dot(self.velocity, normal)
-            v1t = np.dot(self.velocity, tangent)
-            v2n = np.dot(other.velocity, normal)
-            v2t = np.dot(other.velocity, tangent)
+def create_world():
+    # Initialize balls: every ball's state lives in the world's arrays
+    initial = dict(
+        x=np.random.uniform(RADIUS, WIDTH - RADIUS, NUM_BALLS),
+        y=np.random.uniform(RADIUS, HEIGHT - RADIUS, NUM_BALLS),
+        vx=np.random.uniform(-5, 5, NUM_BALLS),
+        vy=np.random.uniform(-5, 5, NUM_BALLS),
+        radius=RADIUS,
+        mass=np.random.uniform(0.5, 1.5, NUM_BALLS),
+        width=WIDTH,
+        height=HEIGHT,
+        gravity=(0, -GRAVITY),  # y points up here
+        dt=DT,
+    )
+    if EVENT_DRIVEN:
+        # Exact for elastic balls: each frame advances DT through every wall and pair impact in between
+        return EventDrivenWorld(**initial)
+    return BallWorld(**initial, wall_elasticity=1.0,
+                     pair_elasticity=1.0,  # Conservation of momentum and kinetic energy
+                     separate=False)
 
-            # Conservation of momentum and kinetic energy
-            v1n_new = (v1n * (self.mass - other.mass) + 2 * other.mass * v2n) / (self.mass + other.mass)
-            v2n_new = (v2n * (other.mass - self.mass) + 2 * self.mass * v1n) / (self.mass + other.mass)
-
-            # Update velocities
-            self.velocity = v1n_new * normal + v1t * tangent
-            other.velocity = v2n_new * normal + v2t * tangent
+def update(frame):
+    world.step()
+    if recorder:
+        recorder.add(world)
+    circles.set_offsets(np.column_stack([world.x, world.y]))
+    return circles,
 
-# Initialize balls
-balls = [Ball(
-    position=[np.random.uniform(RADIUS, WIDTH - RADIUS), np.random.uniform(RADIUS, HEIGHT - RADIUS)],
-    velocity=[np.random.uniform(-5, 5), np.random.uniform(-5, 5)],
-    mass=np.random.uniform(0.5, 1.5)
-) for _ in range(NUM_BALLS)]
+if __name__ == "__main__":
+    world = create_world()
 
-# Animation setup
-fig, ax = plt.subplots()
-ax.set_xlim(0, WIDTH)
-ax.set_ylim(0, HEIGHT)
-circles = [plt.Circle((ball.position[0], ball.position[1]), RADIUS, color='b') for ball in balls]
-for circle in circles:
-    ax.add_patch(circle)
+    # Animation setup: one collection for all balls, moved by updating its offsets
+    fig, ax = plt.subplots()
+    ax.set_xlim(0, WIDTH)
+    ax.set_ylim(0, HEIGHT)
+    ax.set_aspect('equal')
+    circles = EllipseCollection(2 * RADIUS, 2 * RADIUS, 0, units='xy', facecolors='b',
+                                offsets=np.column_stack([world.x, world.y]), offset_transform=ax.transData)
+    ax.add_collection(circles)
 
-def update(frame):
-    for i, ball in enumerate(balls):
-        ball.update_position()
-        ball.check_wall_collision()
-        for other in balls[i+1:]:
-            ball.check_ball_collision(other)
-        circles[i].center = (ball.position[0], ball.position[1])
-    return circles
+    recorder = BallRecorder(RECORD_PATH, world, y_down=False, color=(0, 0, 255)) if RECORD_PATH else None
 
-ani = FuncAnimation(fig, update, frames=200, interval=DT*1000, blit=True)
-plt.show()
\ No newline at end of file
+    ani = FuncAnimation(fig, update, frames=200, interval=DT*1000, blit=True)
+    plt.show()
+    if recorder:
+        recorder.close()
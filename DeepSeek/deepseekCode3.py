@@ -1,16 +1,25 @@
 # Prompt :- Create a visually stunning fireworks simulation where particles shoot up from the ground, explode into vibrant, colorful patterns, and fade out naturally. The simulation should include realistic physics with gravity affecting the particles, slight randomness in explosion patterns, and smooth color transitions. Implement multiple firework launches at random intervals, each with different colors and explosion styles (e.g., circular, starburst, and cascading effects). The particles should have a fading effect to simulate realistic fireworks. Use Python with Pygame or Matplotlib to animate the scene in real-time.
 
+import itertools
+import os
+import sys
 import pygame
 import random
 import math
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.fixed_step import FixedStep, blend  # noqa: E402
+from common.frame_budget import FrameBudget  # noqa: E402
+from common.particles import ParticlePool  # noqa: E402
+from common.raster import AccumulationBuffer  # noqa: E402
+
 # Initialize Pygame
 pygame.init()
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Fireworks Simulation")
+FPS = 60  # rendering cap
+PHYSICS_RATE = 30  # simulation ticks per second of wall time (the old frame rate), independent of FPS
 
 # Colors
 BLACK = (0, 0, 0)
@@ -19,25 +28,21 @@ COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255), (
 # Gravity constant
 GRAVITY = 0.1
 
-# Particle class
-class Particle:
-    def __init__(self, x, y, color, speed, angle):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.speed = speed
-        self.angle = angle
-        self.age = 0
-        self.lifetime = random.randint(50, 100)
-
-    def move(self):
-        self.x += math.cos(self.angle) * self.speed
-        self.y += math.sin(self.angle) * self.speed + GRAVITY
-        self.speed *= 0.95  # Air resistance
-        self.age += 1
+# Every explosion particle lives in one preallocated pool, updated in a single batch per frame:
+# sink by GRAVITY and lose 5% of the speed to air resistance each frame
+particles = ParticlePool(capacity=4096, fall=GRAVITY, drag=0.95)
+firework_ids = itertools.count()
 
-    def is_alive(self):
-        return self.age < self.lifetime
+# Draw into an additive float buffer that fades by TRAIL_DECAY per frame (glow and trails)
+# instead of clearing the screen and drawing each particle
+ACCUMULATE = True
+TRAIL_DECAY = 0.9  # per rendered frame: about 0.8 per frame at the old 30 fps
+glow = AccumulationBuffer(WIDTH, HEIGHT, decay=TRAIL_DECAY, radius=2) if ACCUMULATE else None
+
+# Keep update + draw under 16.6 ms: over budget, launch less often, make smaller explosions and
+# merge particles crowding the same MERGE_CELL square; quality comes back when there is headroom
+budget = FrameBudget(budget=1 / 60)
+MERGE_CELL = 4
 
 # Firework class
 class Firework:
@@ -45,8 +50,9 @@ class Firework:
         self.x = random.randint(100, WIDTH - 100)
         self.y = HEIGHT
         self.color = random.choice(COLORS)
-        self.particles = []
         self.exploded = False
+        self.id = next(firework_ids)
+        self.slots = []  # pool slots of this firework's particles
 
     def launch(self):
         self.y -= 5  # Move upwards
@@ -56,54 +62,102 @@ class Firework:
 
     def explode(self):
         self.exploded = True
-        num_particles = random.randint(50, 100)
+        num_particles = budget.count(random.randint(50, 100))
+        vx, vy, lifetimes = [], [], []
         for _ in range(num_particles):
             speed = random.uniform(2, 5)
             angle = random.uniform(0, 2 * math.pi)
-            self.particles.append(Particle(self.x, self.y, self.color, speed, angle))
+            vx.append(math.cos(angle) * speed)
+            vy.append(math.sin(angle) * speed)
+            lifetimes.append(random.randint(50, 100))
+        self.slots = particles.spawn(self.x, self.y, vx, vy, self.color, lifetimes, owner=self.id)
 
     def update(self):
         if not self.exploded:
             self.launch()
-        else:
-            for particle in self.particles:
-                particle.move()
-            self.particles = [p for p in self.particles if p.is_alive()]
 
-    def draw(self):
+    def draw(self, x, y):
         if not self.exploded:
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 3)
-        else:
-            for particle in self.particles:
-                alpha = 255 * (1 - particle.age / particle.lifetime)
-                color = (*particle.color, alpha)
-                pygame.draw.circle(screen, color, (int(particle.x), int(particle.y)), 2)
-
-# Main loop
-clock = pygame.time.Clock()
-fireworks = []
-
-running = True
-while running:
-    screen.fill(BLACK)
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+            pygame.draw.circle(screen, self.color, (int(x), int(y)), 3)
 
+    def is_alive(self):
+        return not self.exploded or particles.owned(self.slots, self.id)
+
+def draw_particles(px, py):
+    live = particles.live()
+    for x, y, color, alpha in zip(px[live].astype(int).tolist(),
+                                  py[live].astype(int).tolist(),
+                                  particles.color[live].tolist(),
+                                  particles.alpha(live).tolist()):
+        pygame.draw.circle(screen, (*color, alpha), (x, y), 2)
+
+def draw_glow(rockets, px, py):
+    # Last frame dims, then rockets and particles add their light on top
+    glow.fade()
+    if rockets:
+        glow.splat([x for _, (x, _) in rockets], [y for _, (_, y) in rockets], [f.color for f, _ in rockets])
+    live = particles.live()
+    glow.splat(px[live], py[live], particles.color[live], particles.alpha(live))
+    glow.present(screen)
+
+def simulate():
+    global fireworks
     # Launch new fireworks at random intervals
-    if random.random() < 0.05:
+    if random.random() < budget.chance(0.05):
         fireworks.append(Firework())
 
-    # Update and draw fireworks
+    # Update fireworks: all particles in one batch, then the rockets
+    particles.update()
+    if budget.merging:
+        particles.merge(MERGE_CELL)
     for firework in fireworks:
         firework.update()
-        firework.draw()
 
     # Remove dead fireworks
-    fireworks = [f for f in fireworks if not f.exploded or len(f.particles) > 0]
+    fireworks = [f for f in fireworks if f.is_alive()]
+
+def snapshot():
+    rockets = {f.id: (f.x, f.y) for f in fireworks if not f.exploded}
+    return {'rockets': rockets, 'particles': particles.snapshot()}
+
+fireworks = []
+
+if __name__ == "__main__":
+    # Open the window
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Fireworks Simulation")
+
+    # Main loop
+    clock = pygame.time.Clock()
+
+    # Physics ticks at PHYSICS_RATE off the wall clock, however long drawing takes; frames show
+    # rockets and particles interpolated between the last two ticks
+    driver = FixedStep(simulate, snapshot, rate=PHYSICS_RATE)
+
+    running = True
+    while running:
+        budget.begin()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        driver.advance()
+        budget.mark()
+
+        rocket_positions = blend(driver.previous['rockets'], driver.current['rockets'], driver.alpha)
+        rockets = [(f, rocket_positions[f.id]) for f in fireworks if not f.exploded]
+        px, py = particles.interpolate(driver.previous['particles'], driver.current['particles'], driver.alpha)
+        if glow:
+            draw_glow(rockets, px, py)
+        else:
+            screen.fill(BLACK)
+            for firework, (x, y) in rockets:
+                firework.draw(x, y)
+            draw_particles(px, py)
 
-    pygame.display.flip()
-    clock.tick(30)
+        pygame.display.flip()
+        budget.end()
+        clock.tick(FPS)
 
-pygame.quit()
\ No newline at end of file
+    pygame.quit()
\ No newline at end of file
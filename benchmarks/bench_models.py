@@ -0,0 +1,284 @@
+# Runtime cost of each model's simulation code, side by side: the three prompts (double
+# pendulum, bouncing balls, fireworks) as implemented by ChatGPT, Claude and DeepSeek.
+#
+# Every script is imported headless and only its physics is driven: no window and no drawing.
+# Workloads are fixed and seeded and grow in scale.
+#   pendulum:  simulated seconds played back, one step per frame at the script's rate
+#   balls:     ball count, with the box grown to keep each script's ball density
+#   fireworks: particles kept alive, by launching rockets at a rate steered by the shortfall
+#              from the target; a case whose mean live count after the warm-up falls more than
+#              10% short fails, like a regression
+# For each case the table shows steps per second, how many times faster than real time that is,
+# and per-step time percentiles, from the fastest of --repeat runs; then the peak memory traced
+# while setting up and running it (a separate, untimed pass under tracemalloc).
+#
+# --json writes the results. --baseline compares against an earlier --json file and flags cases
+# that got slower, spikier or bigger by more than --tolerance; the exit status is 1 if any did.
+#
+# Usage: python benchmarks/bench_models.py [--quick] [--models claude deepseek] [--prompts balls]
+#                                          [--json results.json] [--baseline baseline.json]
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.scripts import load_script  # noqa: E402
+from common.playback import DensePlayback  # noqa: E402
+
+MODELS = ['chatgpt', 'claude', 'deepseek']
+PROMPTS = ['pendulum', 'balls', 'fireworks']
+SCALES = {'pendulum': [10, 60, 300], 'balls': [10, 100, 1000], 'fireworks': [500, 2000, 8000]}
+SCRIPTS = {
+    ('chatgpt', 'pendulum'): 'ChatGPT/chatgptCode.py',
+    ('chatgpt', 'balls'): 'ChatGPT/chatgptCode2.py',
+    ('chatgpt', 'fireworks'): 'ChatGPT/chatgptCode3.py',
+    ('claude', 'pendulum'): 'Claude/claudeCode.py',
+    ('claude', 'balls'): 'Claude/claudeCode2.py',
+    ('claude', 'fireworks'): 'Claude/claudeCode3.py',
+    ('deepseek', 'pendulum'): 'DeepSeek/deepseekCode.py',
+    ('deepseek', 'balls'): 'DeepSeek/deepseekCode2.py',
+    ('deepseek', 'fireworks'): 'DeepSeek/deepseekCode3.py',
+}
+
+# Fireworks: mean particles per rocket in each script, and the launch controller. The particle count
+# answers a launch only after the rocket's climb (60-90 ticks), so the gains are small enough not
+# to overshoot across that delay, and the untimed warm-up is long enough for the count to settle.
+BURST = {'chatgpt': 45, 'claude': 65, 'deepseek': 75}
+LAUNCH_GAIN = 0.006  # rockets per tick per burst of shortfall
+LAUNCH_RATE_GAIN = 0.0001  # how fast the steady launch rate follows the shortfall
+FIREWORKS_WARMUP = 15.0  # simulated seconds
+REACHED = 0.9  # share of the target particle count a fireworks case has to keep alive
+
+
+# Workload setup: each returns (rate in steps per simulated second, step function, stats function)
+
+def pendulum_case(model, m, scale, seed):
+    if model == 'claude':
+        pendulum = m.DoublePendulum(np.pi / 2, np.pi / 2, 0, 0)
+        dt = 1 / m.PHYSICS_RATE
+        return m.PHYSICS_RATE, lambda: pendulum.update(dt), dict
+    # The matplotlib scripts integrate lazily in segments and interpolate one state per frame
+    if model == 'chatgpt':
+        rate = 50  # the animation's 20 ms interval
+        playback = DensePlayback(m.rhs, [np.pi / 2, 0, np.pi / 2, 0], segment=m.SEGMENT,
+                                 **m.solver_options)
+    else:
+        rate = 1 / m.dt
+        playback = DensePlayback(m.rhs, [m.theta1_0, m.theta2_0, m.omega1_0, m.omega2_0],
+                                 segment=m.SEGMENT, **m.solver_options)
+    frame = iter(range(10 ** 9))
+    return rate, lambda: playback.state_at(next(frame) / rate), dict
+
+
+def balls_case(model, m, scale, seed):
+    count_name = 'NUM_BALLS' if model == 'deepseek' else 'BALL_COUNT'
+    # Same area per ball as the script's own box
+    grow = math.sqrt(scale / getattr(m, count_name))
+    setattr(m, count_name, scale)
+    if model == 'deepseek':
+        m.WIDTH, m.HEIGHT = m.WIDTH * grow, m.HEIGHT * grow
+        np.random.seed(seed)
+    else:
+        m.WIDTH, m.HEIGHT = int(m.WIDTH * grow), int(m.HEIGHT * grow)
+        random.seed(seed)
+    world = m.create_world()
+    if model == 'claude':
+        world = world[0]
+    rate = 1 / m.DT if model == 'deepseek' else m.PHYSICS_RATE
+    return rate, world.step, dict
+
+
+def fireworks_case(model, m, scale, seed):
+    random.seed(seed)
+    if model == 'claude':
+        show = m.FireworkShow(seed=seed)
+        particles, launch, step = show.particles, lambda: show.launch(random.randint(50, m.WIDTH - 50)), show.step
+
+        def flying():
+            return sum(not f.exploded for f in show.fireworks)
+    else:
+        if model == 'chatgpt':
+            m.explosions = m.ExplosionTemplates(seed=seed)
+        particles, step = m.particles, m.simulate
+
+        def launch():
+            m.fireworks.append(m.Firework())
+
+        def flying():
+            return sum(not f.exploded for f in m.fireworks)
+
+    # Room for the target and its swings, so the pool never grows inside the timed loop
+    particles.grow(max(particles.capacity, 2 * scale))
+    control = {'rate': 0.0, 'owed': 0.0}  # steady launches per tick, launches not yet made
+    live = []
+
+    def tick():
+        # Shortfall in rockets' worth of particles: a proportional term for the launches now,
+        # and an integral one for the steady rate that makes up for the rockets still climbing
+        rockets = (scale - len(particles)) / BURST[model]
+        control['rate'] = max(0.0, control['rate'] + LAUNCH_RATE_GAIN * rockets)
+        control['owed'] += max(0.0, control['rate'] + LAUNCH_GAIN * rockets)
+        while control['owed'] >= 1:
+            launch()
+            control['owed'] -= 1
+        step()
+        live.append(len(particles))
+
+    for _ in range(round(FIREWORKS_WARMUP * m.PHYSICS_RATE)):
+        tick()
+    live.clear()
+
+    def stats():
+        return {'mean_particles': round(float(np.mean(live)))}
+    return m.PHYSICS_RATE, tick, stats
+
+
+CASES = {'pendulum': pendulum_case, 'balls': balls_case, 'fireworks': fireworks_case}
+
+
+def setup(model, prompt, scale, seed, tag):
+    # A fresh copy of the script for every run, so no state carries over between cases
+    name = f'bench_{model}_{prompt}_{tag}'
+    m = load_script(SCRIPTS[model, prompt], name=name)
+    return name, m
+
+
+def time_case(model, prompt, scale, seconds, seed):
+    name, m = setup(model, prompt, scale, seed, 'timed')
+    rate, step, stats = CASES[prompt](model, m, scale, seed)
+    steps = round((scale if prompt == 'pendulum' else seconds) * rate)
+    times = np.empty(steps)
+    clock = time.perf_counter
+    began = clock()
+    for i in range(steps):
+        start = clock()
+        step()
+        times[i] = clock() - start
+    total = clock() - began
+    sys.modules.pop(name)
+    return {
+        'model': model, 'prompt': prompt, 'scale': scale, 'steps': steps,
+        'steps_per_s': steps / total,
+        'realtime': steps / rate / total,
+        'p50_ms': float(np.percentile(times, 50) * 1000),
+        'p95_ms': float(np.percentile(times, 95) * 1000),
+        'p99_ms': float(np.percentile(times, 99) * 1000),
+        **stats(),
+    }
+
+
+def trace_case(model, prompt, scale, steps, seed):
+    """Peak traced memory (MB) for setting up the workload and running it for steps."""
+    name, m = setup(model, prompt, scale, seed, 'traced')
+    tracemalloc.start()
+    rate, step, _ = CASES[prompt](model, m, scale, seed)
+    for _ in range(steps):
+        step()
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    sys.modules.pop(name)
+    return peak
+
+
+def run_case(model, prompt, scale, seconds, seed, repeat, memory):
+    # The fastest of several runs: the others only measured interference from the rest of the machine
+    result = max((time_case(model, prompt, scale, seconds, seed) for _ in range(repeat)),
+                 key=lambda r: r['steps_per_s'])
+    if memory:
+        result['peak_mb'] = trace_case(model, prompt, scale, result['steps'], seed)
+    return result
+
+
+def key(result):
+    return f"{result['model']}/{result['prompt']}/{result['scale']}"
+
+
+def regressions(result, baseline, tolerance):
+    """What got worse than the baseline run of the same case by more than tolerance."""
+    flags = []
+    if result['steps_per_s'] < baseline['steps_per_s'] * (1 - tolerance):
+        flags.append(f"slower {result['steps_per_s'] / baseline['steps_per_s'] - 1:+.0%}")
+    if result['p95_ms'] > baseline['p95_ms'] * (1 + tolerance):
+        flags.append(f"p95 {result['p95_ms'] / baseline['p95_ms'] - 1:+.0%}")
+    if 'peak_mb' in result and 'peak_mb' in baseline and result['peak_mb'] > baseline['peak_mb'] * (1 + tolerance):
+        flags.append(f"memory {result['peak_mb'] / baseline['peak_mb'] - 1:+.0%}")
+    return flags
+
+
+def short_of_target(result):
+    """A note if a fireworks case kept too few particles alive to be the scale it is labelled."""
+    if result.get('mean_particles', result['scale']) < REACHED * result['scale']:
+        return f"only {result['mean_particles']} particles"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the three models' simulations headless.")
+    parser.add_argument("--models", nargs='+', choices=MODELS, default=MODELS)
+    parser.add_argument("--prompts", nargs='+', choices=PROMPTS, default=PROMPTS)
+    parser.add_argument("--quick", action='store_true', help="only the smallest scale of each workload")
+    parser.add_argument("--seconds", type=float, default=10.0,
+                        help="simulated seconds timed for balls and fireworks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the fastest is kept")
+    parser.add_argument("--no-memory", dest='memory', action='store_false',
+                        help="skip the tracemalloc pass")
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--baseline", help="results from an earlier --json run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="relative change that counts as a regression")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {key(r): r for r in json.load(f)['results']}
+
+    print(f"{'case':<28}{'steps':>8}{'steps/s':>10}{'x real':>8}{'p50 ms':>8}{'p95 ms':>8}"
+          f"{'p99 ms':>8}{'peak MB':>9}  vs baseline")
+    results = []
+    flagged = 0
+    failed = 0
+    for prompt in args.prompts:
+        for scale in SCALES[prompt][:1 if args.quick else None]:
+            for model in args.models:
+                result = run_case(model, prompt, scale, args.seconds, args.seed, args.repeat, args.memory)
+                results.append(result)
+                note = ''
+                if key(result) in baseline:
+                    flags = regressions(result, baseline[key(result)], args.tolerance)
+                    flagged += bool(flags)
+                    note = ', '.join(flags) if flags else 'ok'
+                short = short_of_target(result)
+                if short:
+                    failed += 1
+                    note = f"{note}, {short}" if note else short
+                peak = f"{result['peak_mb']:>9.2f}" if 'peak_mb' in result else f"{'-':>9}"
+                print(f"{key(result):<28}{result['steps']:>8}{result['steps_per_s']:>10.0f}"
+                      f"{result['realtime']:>8.1f}{result['p50_ms']:>8.3f}{result['p95_ms']:>8.3f}"
+                      f"{result['p99_ms']:>8.3f}{peak}  {note}", flush=True)
+
+    if args.json:
+        machine = {'python': platform.python_version(), 'platform': platform.platform(),
+                   'cpus': os.cpu_count(), 'numpy': np.__version__}
+        with open(args.json, 'w') as f:
+            json.dump({'machine': machine, 'seed': args.seed, 'seconds': args.seconds, 'repeat': args.repeat,
+                       'results': results}, f, indent=2)
+    if failed:
+        print(f"{failed} fireworks case(s) kept fewer than {REACHED:.0%} of their target particles alive")
+    if flagged:
+        print(f"{flagged} case(s) regressed by more than {args.tolerance:.0%}")
+    if failed or flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Steps per second of the strip-decomposed ParallelBallWorld against the single-process BallWorld.
+#
+# Balls start uniformly spread over a wide box with random velocities; the same start is used for
+# every worker count. The "max diff" column is the largest position difference from the
+# single-process run after the timed steps, which should stay at rounding level.
+#
+# Usage: python benchmarks/bench_parallel_balls.py [--balls 100000] [--steps 50] [--workers 1 2 4 8]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.ball_world import BallWorld  # noqa: E402
+from common.parallel_balls import ParallelBallWorld  # noqa: E402
+
+
+def make_start(balls, seed=0):
+    rng = np.random.default_rng(seed)
+    # A sparse gas: the balls cover about 1% of a 4:1 box
+    width = 4.0 * np.sqrt(balls * 600)
+    height = width / 4
+    return dict(
+        x=rng.uniform(0, width, balls),
+        y=rng.uniform(0, height, balls),
+        vx=rng.uniform(-2, 2, balls),
+        vy=rng.uniform(-2, 2, balls),
+        radius=rng.uniform(2, 4, balls),
+        mass=rng.uniform(1, 3, balls),
+        width=width,
+        height=height,
+        gravity=(0, 0.2),
+        friction=0.99,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process ball world.")
+    parser.add_argument("--balls", type=int, default=100000)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    start = make_start(args.balls)
+    serial = BallWorld(**start)
+    began = time.perf_counter()
+    for _ in range(args.steps):
+        serial.step()
+    base = args.steps / (time.perf_counter() - began)
+    print(f"{args.balls} balls, {args.steps} steps, {os.cpu_count()} cores")
+    print(f"{'workers':<10}{'steps/s':>10}{'speedup':>10}{'max diff':>12}")
+    print(f"{'serial':<10}{base:>10.1f}{1.0:>10.2f}{0.0:>12.1e}")
+
+    for workers in args.workers:
+        with ParallelBallWorld(**start, workers=workers) as world:
+            world.step()  # first step is untimed: it includes the workers starting up
+            began = time.perf_counter()
+            world.step(args.steps - 1)
+            rate = (args.steps - 1) / (time.perf_counter() - began)
+            diff = np.max(np.abs(world.x - serial.x))
+        print(f"{workers:<10}{rate:>10.1f}{rate / base:>10.2f}{diff:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
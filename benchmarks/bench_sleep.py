@@ -0,0 +1,94 @@
+# Check that a settled pile of balls goes to sleep, and what sleeping saves.
+#
+# Drops --balls balls into ChatGPT/chatgptCode2.py's and Claude/claudeCode2.py's boxes (their own
+# gravity, friction and sleep settings) and steps each world for --steps steps. It prints how many
+# balls are asleep every --every steps and the time per step over the last stretch, against the
+# same world stepped with sleeping turned off. The exit status is 1 if fewer than --expect of the
+# balls are asleep at the end of any run, or if any sleeping ball was left poking out of the box.
+#
+# Usage: python benchmarks/bench_sleep.py [--balls 200] [--steps 2000] [--iterations 1 4]
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.scripts import load_script  # noqa: E402
+
+SCRIPTS = ['ChatGPT/chatgptCode2.py', 'Claude/claudeCode2.py']
+
+
+def make_world(script, balls, iterations, seed, sleep):
+    # A fresh copy of the script every time, so no settings carry over between runs
+    name = f"bench_sleep_{os.path.basename(script)[:-3]}"
+    m = load_script(script, name=name)
+    sys.modules.pop(name)
+    m.BALL_COUNT = balls
+    random.seed(seed)
+    world = m.create_world()
+    if isinstance(world, tuple):  # claudeCode2.py also returns its views
+        world = world[0]
+    world.iterations = iterations
+    if not sleep:
+        world.sleep_drift = 0.0
+    return world
+
+
+def outside(world, tolerance=1e-6):
+    """How many sleeping balls are frozen (partly) outside the box."""
+    x, y, r = world.x, world.y, world.radius
+    out = ((x < r - tolerance) | (x > world.width - r + tolerance) |
+           (y < r - tolerance) | (y > world.height - r + tolerance))
+    return int(np.sum(out & world.asleep))
+
+
+def run(world, steps, every):
+    """Asleep counts every `every` steps, ms per step over the last quarter of the run, and the
+    most sleeping balls seen outside the box at once."""
+    counts = []
+    escaped = 0
+    timed_from = steps - steps // 4
+    for step in range(steps):
+        if step == timed_from:
+            began = time.perf_counter()
+        world.step()
+        if (step + 1) % every == 0:
+            counts.append(int(world.asleep.sum()))
+            escaped = max(escaped, outside(world))
+    return counts, (time.perf_counter() - began) / (steps - timed_from) * 1000, escaped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that settled balls fall asleep.")
+    parser.add_argument("--balls", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--every", type=int, default=250, help="report the asleep count this often")
+    parser.add_argument("--iterations", type=int, nargs='+', default=[1, 4], help="solver passes per step")
+    parser.add_argument("--expect", type=float, default=0.95, help="fraction that must be asleep at the end")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failed = 0
+    print(f"{args.balls} balls, {args.steps} steps; asleep every {args.every} steps")
+    for script in SCRIPTS:
+        for iterations in args.iterations:
+            counts, sleeping, escaped = run(make_world(script, args.balls, iterations, args.seed, True),
+                                            args.steps, args.every)
+            _, plain, _ = run(make_world(script, args.balls, iterations, args.seed, False),
+                              args.steps, args.every)
+            settled = counts[-1] >= args.expect * args.balls
+            failed += not settled or escaped > 0
+            verdict = 'ok' if settled else 'NOT SETTLED'
+            if escaped:
+                verdict += f', {escaped} ASLEEP OUTSIDE THE BOX'
+            print(f"{script:<26} iterations {iterations}: {' '.join(f'{c:>4}' for c in counts)}"
+                  f"   {sleeping:.3f} ms/step (awake {plain:.3f})  {verdict}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
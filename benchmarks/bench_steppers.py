@@ -0,0 +1,117 @@
+# Accuracy vs. cost of the pendulum steppers in common/integrators.py.
+#
+# For each stepper and step size this reports the CPU time per simulated second together with
+#   * claudeCode.DoublePendulum: drift of the final state from a converged reference run
+#     (claudeCode's equations of motion do not conserve an exact energy, so the reference
+#     trajectory is the accuracy yardstick there), and
+#   * the textbook double pendulum from common/pendulum.py: max energy drift, relative to the
+#     energy scale (m1 + m2) g L1 + m2 g L2 since the default start has E0 = 0.
+#
+# It then measures each fixed stepper's order of convergence on those two systems and on a
+# 4-link common/chain.py: the error after one simulated second against a converged reference,
+# and log2 of how much it shrinks each time dt is halved. A second-order method shows about 2.
+#
+# Usage: python benchmarks/bench_steppers.py [--seconds 10]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import pendulum  # noqa: E402
+from common.chain import Chain  # noqa: E402
+from common.integrators import make_stepper  # noqa: E402
+from common.scripts import load_script  # noqa: E402
+
+STEPPERS = ['euler', 'leapfrog', 'midpoint', 'rk4', 'adaptive']
+STEP_SIZES = [1 / 240, 1 / 120, 1 / 60, 1 / 30, 1 / 15]
+ORDER_STEPPERS = ['euler', 'leapfrog', 'midpoint', 'rk4']  # the adaptive stepper has no fixed order
+ORDER_STEP_SIZES = [1 / 60, 1 / 120, 1 / 240]
+
+
+def run_claude(claude, stepper, dt, seconds):
+    pend = claude.DoublePendulum(np.pi / 2, np.pi / 2, 0, 0, stepper=stepper)
+    steps = int(round(seconds / dt))
+    start = time.process_time()
+    for _ in range(steps):
+        pend.update(dt)
+    cpu = time.process_time() - start
+    return pend.state(), cpu
+
+
+def run_textbook(stepper, dt, seconds):
+    step = make_stepper(stepper)
+
+    def f(y):
+        return pendulum.derivatives(0.0, y)
+
+    y = np.array([np.pi / 2, np.pi / 2, 0.0, 0.0])
+    e0 = pendulum.energy(y)
+    drift = 0.0
+    steps = int(round(seconds / dt))
+    start = time.process_time()
+    for _ in range(steps):
+        y = step(f, y, dt)
+        drift = max(drift, abs(pendulum.energy(y) - e0))
+    cpu = time.process_time() - start
+    scale = (pendulum.M1 + pendulum.M2) * pendulum.G * pendulum.L1 + pendulum.M2 * pendulum.G * pendulum.L2
+    return drift / scale, cpu
+
+
+def integrate(stepper, f, y, dt, seconds):
+    step = make_stepper(stepper)
+    for _ in range(int(round(seconds / dt))):
+        y = step(f, y, dt)
+    return y
+
+
+def measured_orders(stepper, f, y0, seconds=1.0):
+    """log2(error(dt) / error(dt / 2)) for each halving in ORDER_STEP_SIZES."""
+    reference = integrate('rk4', f, y0, 1 / 4000, seconds)
+    errors = [np.max(np.abs(integrate(stepper, f, y0, dt, seconds) - reference)) for dt in ORDER_STEP_SIZES]
+    return [np.log2(coarse / fine) for coarse, fine in zip(errors, errors[1:])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pendulum steppers.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="simulated seconds per run")
+    args = parser.parse_args()
+
+    claude = load_script("Claude/claudeCode.py")
+    reference, _ = run_claude(claude, 'rk4', 1 / 2000, args.seconds)
+
+    print(f"claudeCode.DoublePendulum, {args.seconds:g} s simulated")
+    print(f"{'stepper':<10}{'dt':>10}{'cpu ms/sim s':>15}{'state drift':>15}")
+    for stepper in STEPPERS:
+        for dt in STEP_SIZES:
+            state, cpu = run_claude(claude, stepper, dt, args.seconds)
+            drift = np.max(np.abs(state - reference) / (1.0 + np.abs(reference)))
+            print(f"{stepper:<10}{dt:>10.4f}{cpu / args.seconds * 1000:>15.3f}{drift:>15.2e}")
+
+    print()
+    print(f"Textbook double pendulum (common/pendulum.py), {args.seconds:g} s simulated")
+    print(f"{'stepper':<10}{'dt':>10}{'cpu ms/sim s':>15}{'energy drift':>15}")
+    for stepper in STEPPERS:
+        for dt in STEP_SIZES:
+            drift, cpu = run_textbook(stepper, dt, args.seconds)
+            print(f"{stepper:<10}{dt:>10.4f}{cpu / args.seconds * 1000:>15.3f}{drift:>15.2e}")
+
+    chain = Chain(np.full(4, 1.0), 1.0)
+    systems = [
+        ('claudeCode', claude.state_derivatives, np.array([np.pi / 2, np.pi / 2, 0.0, 0.0])),
+        ('textbook', lambda y: pendulum.derivatives(0.0, y), np.array([np.pi / 2, np.pi / 2, 0.0, 0.0])),
+        ('chain x4', chain.derivatives, np.concatenate([np.linspace(0.3, 0.8, 4), np.zeros(4)])),
+    ]
+    halvings = ' -> '.join(f"1/{round(1 / dt)}" for dt in ORDER_STEP_SIZES)
+    print()
+    print(f"Measured order after 1 s simulated, dt {halvings}")
+    print(f"{'stepper':<10}" + ''.join(f"{name:>16}" for name, _, _ in systems))
+    for stepper in ORDER_STEPPERS:
+        orders = [' / '.join(f"{order:.2f}" for order in measured_orders(stepper, f, y0)) for _, f, y0 in systems]
+        print(f"{stepper:<10}" + ''.join(f"{order:>16}" for order in orders))
+
+
+if __name__ == "__main__":
+    main()
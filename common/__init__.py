@@ -0,0 +1 @@
+# Shared simulation engines used by the ChatGPT / Claude / DeepSeek scripts and the tools.
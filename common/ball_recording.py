@@ -0,0 +1,95 @@
+# Compact recordings of the bouncing-ball scenes, replayed from memory maps.
+#
+# A recording is a directory of column files:
+#   meta.json       ball count, box size, keyframe spacing, axis orientation
+#   static.npz      radius, mass, colour (never change during a run)
+#   positions.f32   float32 (frame, 2, n): x row then y row, one block appended per frame
+#   keyframes.f64   float64 (keyframe, 4, n): x, y, vx, vy every keyframe_every frames
+# The frame and keyframe counts are implied by the file sizes, so a recording cut short by a
+# crash is still readable up to its last complete frame. Replay maps the files read-only;
+# seeking to a frame is a slice, with no physics re-run.
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+class BallRecorder:
+    def __init__(self, path, world, keyframe_every=60, y_down=True, color=None):
+        """Start a recording of world (BallWorld, EventDrivenWorld, ...) in directory path.
+
+        color overrides the world's own colours (one RGB for all balls or one per ball).
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.count = len(world.x)
+        self.keyframe_every = keyframe_every
+        self.frames = 0
+        if color is None:
+            color = getattr(world, 'color', (255, 255, 255))
+        color = np.broadcast_to(np.asarray(color, dtype=np.uint8), (self.count, 3))
+        np.savez(os.path.join(path, 'static.npz'), radius=np.asarray(world.radius, dtype=float),
+                 mass=np.asarray(world.mass, dtype=float), color=color)
+        meta = {'version': FORMAT_VERSION, 'count': self.count, 'width': float(world.width),
+                'height': float(world.height), 'keyframe_every': keyframe_every, 'y_down': y_down}
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        self.positions = open(os.path.join(path, 'positions.f32'), 'wb')
+        self.keyframes = open(os.path.join(path, 'keyframes.f64'), 'wb')
+
+    def add(self, world):
+        """Append the world's current frame (and a full-state keyframe every keyframe_every)."""
+        np.stack([world.x, world.y]).astype(np.float32).tofile(self.positions)
+        if self.frames % self.keyframe_every == 0:
+            np.stack([world.x, world.y, world.vx, world.vy]).astype(np.float64).tofile(self.keyframes)
+        self.frames += 1
+
+    def close(self):
+        self.positions.close()
+        self.keyframes.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BallReplay:
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"unsupported recording version {self.meta['version']}")
+        n = self.meta['count']
+        self.keyframe_every = self.meta['keyframe_every']
+        with np.load(os.path.join(path, 'static.npz')) as static:
+            self.radius = static['radius']
+            self.mass = static['mass']
+            self.color = static['color']
+        self.positions = map_blocks(os.path.join(path, 'positions.f32'), np.float32, (2, n))
+        self.keyframes = map_blocks(os.path.join(path, 'keyframes.f64'), np.float64, (4, n))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def frame(self, index):
+        """(x, y) float32 views of one frame; negative indices count from the end."""
+        return self.positions[index]
+
+    def keyframe(self, index):
+        """Full state at or before frame index: (frame, x, y, vx, vy), e.g. to resume simulating."""
+        index = min(index % len(self), len(self.keyframes) * self.keyframe_every - 1)
+        k = index // self.keyframe_every
+        return (k * self.keyframe_every,) + tuple(self.keyframes[k])
+
+
+def map_blocks(path, dtype, block):
+    """Read-only memory map of the complete blocks in a file (empty array if there are none)."""
+    itemsize = np.dtype(dtype).itemsize * int(np.prod(block))
+    count = os.path.getsize(path) // itemsize
+    if count == 0:
+        return np.empty((0,) + block, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(count,) + block)
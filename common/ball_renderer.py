@@ -0,0 +1,65 @@
+# Sprite-cached, dirty-rectangle drawing for the pygame ball scenes.
+#
+# Every distinct (radius, colour) is rendered once into a small colour-keyed surface. A frame
+# then erases last frame's sprite rectangles from a background copy, blits all balls in a single
+# Surface.blits call and hands only the touched rectangles to pygame.display.update, instead of
+# filling and flipping the whole window and calling pygame.draw.circle per ball.
+import pygame
+
+
+class BallRenderer:
+    def __init__(self, screen, background=(0, 0, 0), full_update_fraction=0.5):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size()).convert(screen)
+        self.background.fill(background)
+        self.full_update_area = full_update_fraction * screen.get_width() * screen.get_height()
+        self.sprites = {}  # (radius, colour) -> Surface
+        self.ball_sprites = []  # sprite per ball slot, so frames never look up the cache
+        self.previous = []  # rectangles drawn last frame, to erase and update
+        self.redraw_all = True
+
+    def sprite(self, radius, color):
+        key = (radius, color)
+        if key not in self.sprites:
+            size = 2 * radius + 1
+            # Colour-keyed rather than per-pixel alpha: pygame.draw.circle is aliased anyway,
+            # and keyed blits are much faster
+            transparent = (255, 255, 255) if color == (0, 0, 0) else (0, 0, 0)
+            surface = pygame.Surface((size, size))
+            surface.fill(transparent)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            surface.set_colorkey(transparent, pygame.RLEACCEL)
+            self.sprites[key] = surface.convert(self.screen)
+        return self.sprites[key]
+
+    def draw(self, world, x=None, y=None):
+        """Draw every ball of a BallWorld-like object and push the changed areas to the display.
+
+        x, y override the world's positions (e.g. interpolated ones from FixedStep).
+        """
+        radius = world.radius.astype(int)
+        if len(self.ball_sprites) != len(radius):
+            colors = [tuple(int(c) for c in color) for color in world.color]
+            self.ball_sprites = [self.sprite(r, c) for r, c in zip(radius.tolist(), colors)]
+        if x is None:
+            x, y = world.x, world.y
+
+        # Same pixel origin pygame.draw.circle(screen, color, (int(x), int(y)), r) would use
+        left = (x.astype(int) - radius).tolist()
+        top = (y.astype(int) - radius).tolist()
+
+        previous_area = sum(rect.w * rect.h for rect in self.previous)
+        # Past full_update_area, one full blit and one flip beat long lists of small rectangles
+        whole = self.redraw_all or previous_area > self.full_update_area
+        if whole:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            self.screen.blits([(self.background, rect, rect) for rect in self.previous], False)
+        drawn = self.screen.blits(list(zip(self.ball_sprites, zip(left, top))))
+
+        if whole or previous_area + sum(rect.w * rect.h for rect in drawn) > self.full_update_area:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + drawn)
+        self.redraw_all = False
+        self.previous = drawn
@@ -0,0 +1,278 @@
+# Structure-of-arrays engine for the bouncing-ball scenes.
+#
+# Position, velocity, radius, mass and colour of every ball live in contiguous NumPy arrays and
+# each step (gravity, motion, friction, wall bounces, pair impulses) is a handful of batched
+# array operations instead of a Python method call per ball. Balls that have come to rest can be
+# put to sleep and skipped until something hits them. BallView gives the scripts a Ball-like
+# object per slot for drawing.
+import numpy as np
+
+from .broadphase import overlapping_pairs
+
+
+class BallWorld:
+    def __init__(self, x, y, vx, vy, radius, mass, width, height, color=None,
+                 gravity=(0.0, 0.5), dt=1.0, wall_elasticity=1.0, pair_elasticity=1.0,
+                 friction=1.0, separate=True, iterations=1, sleep_drift=0.0, sleep_frames=30):
+        self.x = np.array(x, dtype=float)
+        self.y = np.array(y, dtype=float)
+        self.vx = np.array(vx, dtype=float)
+        self.vy = np.array(vy, dtype=float)
+        n = len(self.x)
+        self.radius = np.broadcast_to(np.asarray(radius, dtype=float), (n,)).copy()
+        self.mass = np.broadcast_to(np.asarray(mass, dtype=float), (n,)).copy()
+        if color is None:
+            color = np.full((n, 3), 255)
+        self.color = np.array(color, dtype=np.uint8).reshape(n, 3)
+        self.width = width
+        self.height = height
+        self.gravity = gravity  # acceleration (gx, gy) in the scene's own units
+        self.dt = dt
+        self.wall_elasticity = wall_elasticity
+        self.pair_elasticity = pair_elasticity
+        self.friction = friction  # velocity multiplier applied every step
+        self.separate = separate  # push overlapping balls apart after resolving them
+        self.iterations = iterations  # solver passes over the contacts per step; piles need several
+        self.pair_count = 0
+
+        # Sleeping: a ball that rests against a wall or another ball, moving at most sleep_drift
+        # per step, for sleep_frames steps in a row is frozen and skipped until a neighbour moving
+        # faster than twice that hits it or wake() is called. Its speed is judged after the contact
+        # solve, when the bounce has taken back what gravity added. Piles never quite stop (the
+        # separation pushes keep them shuffling), so the test can't be on position. 0 turns it off.
+        self.sleep_drift = sleep_drift
+        self.sleep_frames = sleep_frames
+        self.still = np.zeros(n, dtype=np.int32)  # resting steps in a row
+        self.touching = np.zeros(n, dtype=bool)  # in a pair contact this step
+        self.asleep = np.zeros(n, dtype=bool)
+
+    def __len__(self):
+        return len(self.x)
+
+    def step(self):
+        if not self.sleep_drift:
+            self.integrate()
+            self.collide_walls()
+            self.collide_pairs()
+            return
+        awake = np.flatnonzero(~self.asleep)
+        if len(awake) == 0:
+            # Everything has settled: nothing to do until something is woken
+            self.pair_count = 0
+            return
+        self.integrate(awake)
+        self.collide_walls(awake)
+        self.collide_pairs(awake)
+        # The separation pushes can shove a ball at the bottom of a pile back into the floor.
+        # Clamp again before anything is frozen, or it would sleep there.
+        self.collide_walls(awake)
+        self.update_sleep()
+
+    def integrate(self, index=None):
+        if index is None:
+            integrate(self.x, self.y, self.vx, self.vy, self.gravity, self.dt, self.friction)
+            return
+        x, y, vx, vy = self.x[index], self.y[index], self.vx[index], self.vy[index]
+        integrate(x, y, vx, vy, self.gravity, self.dt, self.friction)
+        self.x[index], self.y[index], self.vx[index], self.vy[index] = x, y, vx, vy
+
+    def collide_walls(self, index=None):
+        if index is None:
+            bounce_walls(self.x, self.y, self.vx, self.vy, self.radius, self.width, self.height,
+                         self.wall_elasticity)
+            return
+        x, y, vx, vy = self.x[index], self.y[index], self.vx[index], self.vy[index]
+        bounce_walls(x, y, vx, vy, self.radius[index], self.width, self.height,
+                     self.wall_elasticity)
+        self.x[index], self.y[index], self.vx[index], self.vy[index] = x, y, vx, vy
+
+    def collide_pairs(self, awake=None):
+        if awake is None:
+            i, j = overlapping_pairs(self.x, self.y, self.radius)
+            mass = self.mass
+        else:
+            i, j = self.pairs_near(awake)
+            mass = np.where(self.asleep, np.inf, self.mass)  # sleepers act as fixed obstacles
+            self.touching[:] = False
+            self.touching[i] = True
+            self.touching[j] = True
+        self.pair_count = len(i)
+        if len(i) == 0:
+            return
+        contacts = busiest_contacts(i, j, len(self.x))
+        if awake is not None and self.separate:
+            # Against a sleeper the awake ball takes the whole overlap instead of half
+            push_i = np.where(self.asleep[i], 0.0, np.where(self.asleep[j], 2.0, 1.0))
+            push_j = np.where(self.asleep[j], 0.0, np.where(self.asleep[i], 2.0, 1.0))
+        else:
+            push_i = push_j = 1.0
+        for _ in range(self.iterations):
+            px, py, sx, sy = pair_response(self.x, self.y, self.vx, self.vy, self.radius, mass,
+                                           i, j, contacts, self.pair_elasticity, self.separate)
+            # Pairs are resolved together from the same pre-collision velocities (Jacobi style),
+            # with np.add.at so balls in several contacts accumulate all of their impulses.
+            # Further passes only act on pairs that are still approaching or overlapping.
+            np.add.at(self.vx, i, -px / mass[i])
+            np.add.at(self.vy, i, -py / mass[i])
+            np.add.at(self.vx, j, px / mass[j])
+            np.add.at(self.vy, j, py / mass[j])
+            if self.separate:
+                np.add.at(self.x, i, -sx * push_i)
+                np.add.at(self.y, i, -sy * push_i)
+                np.add.at(self.x, j, sx * push_j)
+                np.add.at(self.y, j, sy * push_j)
+
+    def pairs_near(self, awake):
+        """Overlapping pairs with at least one awake ball, waking sleepers that get hit."""
+        # Sleepers only matter inside the awake balls' bounding box, grown by one contact reach
+        margin = self.sleep_drift
+        reach = 2 * float(self.radius.max()) + margin
+        ax, ay = self.x[awake], self.y[awake]
+        near = np.flatnonzero((self.x > ax.min() - reach) & (self.x < ax.max() + reach) &
+                              (self.y > ay.min() - reach) & (self.y < ay.max() + reach))
+        # The margin catches sleepers just touching a ball that is about to leave them
+        i, j = overlapping_pairs(self.x[near], self.y[near], self.radius[near] + margin / 2)
+        if len(i) == 0:
+            return i, j
+        i, j = near[i], near[j]
+        sleeping_i = self.asleep[i]
+        sleeping_j = self.asleep[j]
+        i, j = i[~(sleeping_i & sleeping_j)], j[~(sleeping_i & sleeping_j)]
+
+        # Wake a sleeper touched by a partner moving faster than twice the sleep threshold. The
+        # gap keeps the balls still shuffling around in a pile from waking their neighbours.
+        fast = (self.vx * self.vx + self.vy * self.vy) * self.dt ** 2 > (2 * self.sleep_drift) ** 2
+        self.wake(np.concatenate([i[self.asleep[i] & fast[j]], j[self.asleep[j] & fast[i]]]))
+
+        dx = self.x[j] - self.x[i]
+        dy = self.y[j] - self.y[i]
+        reach = self.radius[i] + self.radius[j]
+        touching = dx * dx + dy * dy < reach * reach
+        return i[touching], j[touching]
+
+    def update_sleep(self):
+        awake = np.flatnonzero(~self.asleep)
+        x, y, r = self.x[awake], self.y[awake], self.radius[awake]
+        slow = (self.vx[awake] ** 2 + self.vy[awake] ** 2) * self.dt ** 2 <= self.sleep_drift ** 2
+        # Only supported balls rest: a slow ball in mid-air (at the top of a bounce, or with no
+        # gravity) keeps going
+        margin = self.sleep_drift
+        on_wall = ((x < r + margin) | (x > self.width - r - margin) |
+                   (y < r + margin) | (y > self.height - r - margin))
+        resting = slow & (self.touching[awake] | on_wall)
+        still = np.where(resting, self.still[awake] + 1, 0)
+        self.still[awake] = still
+        tired = awake[still >= self.sleep_frames]
+        self.asleep[tired] = True
+        self.vx[tired] = 0.0
+        self.vy[tired] = 0.0
+
+    def wake(self, index=slice(None)):
+        """Put balls back into the simulation, e.g. before giving them a push."""
+        self.asleep[index] = False
+        self.still[index] = 0
+
+    def kinetic_energy(self):
+        return 0.5 * float(np.sum(self.mass * (self.vx * self.vx + self.vy * self.vy)))
+
+    def momentum(self):
+        return float(np.sum(self.mass * self.vx)), float(np.sum(self.mass * self.vy))
+
+
+# The step phases as functions on plain arrays, so other drivers (common/parallel_balls.py)
+# can run them on slices of the state
+
+
+def integrate(x, y, vx, vy, gravity, dt, friction=1.0):
+    """Gravity, then motion, then friction, in place."""
+    gx, gy = gravity
+    if gx:
+        vx += gx * dt
+    if gy:
+        vy += gy * dt
+    x += vx * dt
+    y += vy * dt
+    if friction != 1.0:
+        vx *= friction
+        vy *= friction
+
+
+def bounce_walls(x, y, vx, vy, radius, width, height, elasticity=1.0):
+    """Clamp balls back inside the box and reflect the ones heading out, in place."""
+    for pos, vel, limit in ((x, vx, width), (y, vy, height)):
+        low = pos < radius
+        high = pos > limit - radius
+        # Clamp back inside and only reflect balls still heading outwards, so a ball
+        # that is already on its way back isn't flipped again on the next step
+        pos[low] = radius[low]
+        pos[high] = limit - radius[high]
+        out_low = low & (vel < 0)
+        out_high = high & (vel > 0)
+        vel[out_low | out_high] *= -elasticity
+
+
+def busiest_contacts(i, j, n):
+    """Per pair, the larger of the two balls' contact counts."""
+    contacts = np.bincount(np.concatenate([i, j]), minlength=n)
+    return np.maximum(contacts[i], contacts[j])
+
+
+def pair_response(x, y, vx, vy, radius, mass, i, j, contacts, elasticity=1.0, separate=True):
+    """Impulse (px, py) on ball j of each pair (ball i gets the opposite) and separation (sx, sy)."""
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    dist = np.sqrt(dx * dx + dy * dy)
+    dist = np.where(dist > 0, dist, 1e-12)
+    nx = dx / dist
+    ny = dy / dist
+
+    # Normal component of the relative velocity; only approaching pairs get an impulse
+    vn = (vx[j] - vx[i]) * nx + (vy[j] - vy[i]) * ny
+    approaching = vn < 0
+    impulse = np.where(approaching, -(1.0 + elasticity) * vn / (1.0 / mass[i] + 1.0 / mass[j]), 0.0)
+
+    # Summing full impulses over-corrects in a pile and feeds energy in until it blows up, so
+    # each pair's share is divided by the contact count of its busier ball (isolated pairs are exact)
+    share = 1.0 / contacts
+    impulse = impulse * share
+    if separate:
+        overlap = np.maximum(radius[i] + radius[j] - dist, 0.0) / 2 * share
+    else:
+        overlap = np.zeros_like(dist)
+    return impulse * nx, impulse * ny, overlap * nx, overlap * ny
+
+
+class BallView:
+    """One ball of a BallWorld, with the attribute names the scripts' Ball classes used."""
+
+    def __init__(self, world, index):
+        self.world = world
+        self.index = index
+
+    @property
+    def x(self):
+        return self.world.x[self.index]
+
+    @property
+    def y(self):
+        return self.world.y[self.index]
+
+    @property
+    def vx(self):
+        return self.world.vx[self.index]
+
+    @property
+    def vy(self):
+        return self.world.vy[self.index]
+
+    @property
+    def radius(self):
+        return self.world.radius[self.index]
+
+    @property
+    def mass(self):
+        return self.world.mass[self.index]
+
+    @property
+    def color(self):
+        return tuple(int(c) for c in self.world.color[self.index])
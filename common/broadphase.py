@@ -0,0 +1,68 @@
+# Uniform-grid (spatial hash) broad phase for ball-ball collisions.
+#
+# Every step the balls are bucketed into square cells at least as wide as the largest ball,
+# so any two touching balls are in the same or adjacent cells. Candidate pairs are found by
+# sorting the cell ids once and matching each cell against itself and four of its neighbours,
+# all with NumPy array operations, instead of testing every pair in Python.
+import numpy as np
+
+# Each cell is paired with itself and half of its 8 neighbours, so every pair turns up once
+NEIGHBOUR_OFFSETS = [(0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+
+def candidate_pairs(x, y, radius, cell_size=None):
+    """Index arrays (i, j), i != j, of balls sharing or touching a grid cell. Each pair appears once."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 2:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    if cell_size is None:
+        cell_size = 2.0 * float(np.max(radius))
+
+    cx = np.floor((x - x.min()) / cell_size).astype(np.int64)
+    cy = np.floor((y - y.min()) / cell_size).astype(np.int64)
+    width = int(cx.max()) + 3  # leave room for the -1/+1 neighbour offsets
+    cell = (cy + 1) * width + (cx + 1)
+
+    order = np.argsort(cell, kind='stable')
+    sorted_cells = cell[order]
+
+    pairs_i = []
+    pairs_j = []
+    for dx, dy in NEIGHBOUR_OFFSETS:
+        target = sorted_cells + dy * width + dx
+        lo = np.searchsorted(sorted_cells, target, side='left')
+        hi = np.searchsorted(sorted_cells, target, side='right')
+        if dx == 0 and dy == 0:
+            # Same cell: only pair each ball with the balls after it
+            lo = np.arange(n) + 1
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        # Expand each ball's [lo, hi) range of partners into flat index arrays
+        first = np.repeat(np.arange(n), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = np.repeat(lo, counts) + offsets
+        pairs_i.append(order[first])
+        pairs_j.append(order[second])
+
+    if not pairs_i:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+def overlapping_pairs(x, y, radius, cell_size=None):
+    """Candidate pairs narrowed to those whose circles actually overlap."""
+    i, j = candidate_pairs(x, y, radius, cell_size)
+    if len(i) == 0:
+        return i, j
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    r = np.broadcast_to(np.asarray(radius, dtype=float), x.shape)
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    reach = r[i] + r[j]
+    touching = dx * dx + dy * dy < reach * reach
+    return i[touching], j[touching]
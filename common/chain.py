@@ -0,0 +1,91 @@
+# N-link pendulum: point masses on massless rigid rods, hanging from a fixed pivot, in O(N) per
+# evaluation.
+#
+# The double pendulum formulas don't generalize cheaply: written in angles, an N-link chain has a
+# dense N x N mass matrix to build and solve (O(N^3)) every step. Here the chain is solved through
+# the rod tensions instead. Each bob only feels gravity and the two rods either side of it, and
+# each rod's length constraint only involves its two ends. So the tensions satisfy a tridiagonal
+# system, solved in two recursive sweeps, like the articulated-body algorithm. The inward sweep,
+# from the tip to the pivot, folds everything below each rod into one effective coefficient. The
+# outward sweep recovers the tensions from the pivot down. The angular accelerations then follow
+# link by link.
+#
+# State layout follows common/integrators.py: angles first, angular velocities second, so
+# y = (theta_1..theta_N, omega_1..omega_N). Angles are from the downward vertical, with y down
+# as on screen (gravity is +y); the N = 2 case matches common/pendulum.py.
+import numpy as np
+
+G = 9.81  # gravity
+
+
+class Chain:
+    def __init__(self, lengths, masses, g=G):
+        """lengths and masses per link, pivot first; either can be a single value for every link."""
+        lengths, masses = np.broadcast_arrays(np.asarray(lengths, dtype=float), np.asarray(masses, dtype=float))
+        self.lengths = lengths.copy()
+        self.masses = masses.copy()
+        self.g = g
+        self.inverse_mass = 1.0 / self.masses
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def accelerations(self, theta, omega):
+        """Angular accelerations of every link."""
+        n = len(self.lengths)
+        l, w = self.lengths, self.inverse_mass
+        # Between neighbouring links k and k + 1
+        delta = theta[1:] - theta[:-1]
+        cos_d, sin_d = np.cos(delta), np.sin(delta)
+
+        # Row k of the tension system, from rod k keeping bobs k-1 and k (or the pivot) l[k] apart:
+        #   coupling[k-1] T[k-1] + diag[k] T[k] + coupling[k] T[k+1] = rhs[k]
+        diag = -w
+        diag[1:] -= w[:-1]
+        coupling = cos_d * w[:-1]
+        rhs = -l * omega ** 2
+        rhs[0] -= self.g * np.cos(theta[0])
+
+        # Inward sweep: below rod k everything reduces to T[k+1] = (rhs[k+1] - coupling[k] T[k]) / diag[k+1]
+        diag, coupling, rhs = diag.tolist(), coupling.tolist(), rhs.tolist()
+        for k in range(n - 2, -1, -1):
+            ratio = coupling[k] / diag[k + 1]
+            diag[k] -= ratio * coupling[k]
+            rhs[k] -= ratio * rhs[k + 1]
+        # Outward sweep: the pivot rod's tension first, then each one from the rod above it
+        tension = [0.0] * n
+        tension[0] = rhs[0] / diag[0]
+        for k in range(1, n):
+            tension[k] = (rhs[k] - coupling[k - 1] * tension[k - 1]) / diag[k]
+        tension = np.array(tension)
+
+        # Tangential part of each bob's acceleration relative to the bob above it
+        torque = np.zeros(n)
+        torque[:-1] += tension[1:] * sin_d * w[:-1]  # rod below pulls bob k sideways
+        torque[1:] -= tension[:-1] * sin_d * w[:-1]  # rod above pulls bob k-1 sideways
+        torque[0] -= self.g * np.sin(theta[0])
+        return torque / l
+
+    def derivatives(self, y):
+        """Stepper right-hand side: d/dt of (theta, omega)."""
+        n = len(self.lengths)
+        return np.concatenate([y[n:], self.accelerations(y[:n], y[n:])])
+
+    def rhs(self, t, y):
+        """The same for solve_ivp."""
+        return self.derivatives(np.asarray(y, dtype=float))
+
+    def positions(self, theta):
+        """(N, 2) bob positions relative to the pivot, y down."""
+        return np.cumsum(self.lengths[:, None] * np.column_stack([np.sin(theta), np.cos(theta)]), axis=0)
+
+    def velocities(self, theta, omega):
+        return np.cumsum((self.lengths * omega)[:, None] * np.column_stack([np.cos(theta), -np.sin(theta)]), axis=0)
+
+    def energy(self, y):
+        """Kinetic plus potential energy (zero at the pivot's height)."""
+        n = len(self.lengths)
+        position = self.positions(y[:n])
+        velocity = self.velocities(y[:n], y[n:])
+        kinetic = 0.5 * np.sum(self.masses * np.sum(velocity ** 2, axis=1))
+        return kinetic - self.g * np.sum(self.masses * position[:, 1])
@@ -0,0 +1,210 @@
+# Event-driven (time-of-impact) engine for perfectly elastic balls in a box.
+#
+# Instead of stepping every ball by a fixed dt and then looking for overlaps, the engine predicts
+# when the next wall or pair collision happens and jumps straight to it. Motion between events is
+# exact (straight lines, or parabolas under gravity), so fast balls can't tunnel through each other
+# and slow ones can't get stuck overlapping. Cost is per collision, not per tick.
+#
+# Each ball keeps its state at its own last-update time and only the earliest predicted wall
+# and pair event per ball sits in the priority queue. Every collision bumps the collision count
+# of the balls involved; queued events remember the counts they were predicted with, so stale
+# events are recognised and dropped (or the surviving ball re-predicted) when they are popped.
+import heapq
+import math
+
+import numpy as np
+
+WALL_X = -1
+WALL_Y = -2
+EPSILON = 1e-12
+
+
+class EventDrivenWorld:
+    def __init__(self, x, y, vx, vy, radius, mass, width, height, gravity=(0.0, 0.0), dt=1.0):
+        n = len(x)
+        self._x = np.array(x, dtype=float)
+        self._y = np.array(y, dtype=float)
+        self._vx = np.array(vx, dtype=float)
+        self._vy = np.array(vy, dtype=float)
+        self._stamp = np.zeros(n)  # time each ball's state above refers to
+        self.radius = np.broadcast_to(np.asarray(radius, dtype=float), (n,)).copy()
+        self.mass = np.broadcast_to(np.asarray(mass, dtype=float), (n,)).copy()
+        self.width = width
+        self.height = height
+        self.gravity = gravity
+        self.dt = dt  # time advanced by step()
+        self.time = 0.0
+        self.counts = np.zeros(n, dtype=np.int64)
+        self.collisions = 0
+        self.queue = []
+        for i in range(n):
+            self.predict(i)
+
+    def __len__(self):
+        return len(self._x)
+
+    # State at the current time, for drawing (same attribute names as BallWorld)
+    @property
+    def x(self):
+        dt = self.time - self._stamp
+        return self._x + self._vx * dt + 0.5 * self.gravity[0] * dt * dt
+
+    @property
+    def y(self):
+        dt = self.time - self._stamp
+        return self._y + self._vy * dt + 0.5 * self.gravity[1] * dt * dt
+
+    @property
+    def vx(self):
+        return self._vx + self.gravity[0] * (self.time - self._stamp)
+
+    @property
+    def vy(self):
+        return self._vy + self.gravity[1] * (self.time - self._stamp)
+
+    def step(self):
+        self.advance(self.dt)
+
+    def advance(self, dt):
+        """Process every collision up to time + dt, then move the clock there."""
+        target = self.time + dt
+        while self.queue and self.queue[0][0] <= target:
+            t, i, j, count_i, count_j = heapq.heappop(self.queue)
+            valid_i = self.counts[i] == count_i
+            valid_j = j < 0 or self.counts[j] == count_j
+            if valid_i and valid_j:
+                self.time = t
+                if j >= 0:
+                    self.bounce_pair(i, j)
+                else:
+                    self.bounce_wall(i, j)
+            elif valid_i:
+                # Only the partner changed: i's other possible events weren't queued, so look again
+                self.time = max(self.time, t)
+                self.predict(i)
+            elif valid_j and j >= 0:
+                self.time = max(self.time, t)
+                self.predict(j)
+        self.time = target
+
+    # Collision response
+    def move_to_now(self, i):
+        dt = self.time - self._stamp[i]
+        gx, gy = self.gravity
+        self._x[i] += self._vx[i] * dt + 0.5 * gx * dt * dt
+        self._y[i] += self._vy[i] * dt + 0.5 * gy * dt * dt
+        self._vx[i] += gx * dt
+        self._vy[i] += gy * dt
+        self._stamp[i] = self.time
+
+    def bounce_wall(self, i, wall):
+        self.move_to_now(i)
+        if wall == WALL_X:
+            self._vx[i] = -self._vx[i]
+        else:
+            self._vy[i] = -self._vy[i]
+        self.counts[i] += 1
+        self.collisions += 1
+        self.predict(i)
+
+    def bounce_pair(self, i, j):
+        self.move_to_now(i)
+        self.move_to_now(j)
+        dx = self._x[j] - self._x[i]
+        dy = self._y[j] - self._y[i]
+        dist = math.hypot(dx, dy) or EPSILON
+        nx, ny = dx / dist, dy / dist
+        vn = (self._vx[j] - self._vx[i]) * nx + (self._vy[j] - self._vy[i]) * ny
+        m1, m2 = self.mass[i], self.mass[j]
+        # Elastic impulse along the line of centres
+        impulse = 2 * m1 * m2 * vn / (m1 + m2)
+        self._vx[i] += impulse / m1 * nx
+        self._vy[i] += impulse / m1 * ny
+        self._vx[j] -= impulse / m2 * nx
+        self._vy[j] -= impulse / m2 * ny
+        self.counts[i] += 1
+        self.counts[j] += 1
+        self.collisions += 1
+        self.predict(i)
+        self.predict(j)
+
+    # Prediction
+    def predict(self, i):
+        """Queue ball i's earliest wall collision and earliest pair collision."""
+        self.move_to_now(i)
+        r = self.radius[i]
+        gx, gy = self.gravity
+        t_x = wall_time(self._x[i], self._vx[i], gx, r, self.width - r)
+        t_y = wall_time(self._y[i], self._vy[i], gy, r, self.height - r)
+        if t_x < t_y:
+            heapq.heappush(self.queue, (self.time + t_x, i, WALL_X, self.counts[i], 0))
+        elif t_y < math.inf:
+            heapq.heappush(self.queue, (self.time + t_y, i, WALL_Y, self.counts[i], 0))
+
+        t_pair, j = self.pair_time(i)
+        if j >= 0:
+            heapq.heappush(self.queue, (self.time + t_pair, i, j, self.counts[i], self.counts[j]))
+
+    def pair_time(self, i):
+        """Earliest time until ball i hits another ball, and which one (-1 if none)."""
+        if len(self._x) < 2:
+            return math.inf, -1
+        # Relative motion is a straight line even under gravity: both balls feel the same pull
+        age = self.time - self._stamp
+        gx, gy = self.gravity
+        px = self._x + self._vx * age + 0.5 * gx * age * age
+        py = self._y + self._vy * age + 0.5 * gy * age * age
+        vx = self._vx + gx * age
+        vy = self._vy + gy * age
+        dx = px - px[i]
+        dy = py - py[i]
+        dvx = vx - vx[i]
+        dvy = vy - vy[i]
+        b = dx * dvx + dy * dvy
+        a = dvx * dvx + dvy * dvy
+        reach = self.radius + self.radius[i]
+        c = dx * dx + dy * dy - reach * reach
+        disc = b * b - a * c
+        candidate = (b < 0) & (disc >= 0) & (a > 0)
+        candidate[i] = False
+        if not candidate.any():
+            return math.inf, -1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(candidate, (-b - np.sqrt(np.maximum(disc, 0))) / a, np.inf)
+        # Already overlapping and approaching: collide right away
+        t = np.maximum(t, 0.0)
+        j = int(np.argmin(t))
+        return float(t[j]), (j if math.isfinite(t[j]) else -1)
+
+    def kinetic_energy(self):
+        return 0.5 * float(np.sum(self.mass * (self.vx ** 2 + self.vy ** 2)))
+
+
+def wall_time(p, v, a, lo, hi):
+    """Time until p + v t + a t^2 / 2 reaches lo while moving down or hi while moving up."""
+    best = math.inf
+    for bound, direction in ((lo, -1), (hi, 1)):
+        for t in solve_quadratic(0.5 * a, v, p - bound):
+            # Only count crossings heading into the wall, and not the one we are sitting on
+            if t > EPSILON and (v + a * t) * direction > 0 and t < best:
+                best = t
+    # Already outside and still heading outwards (e.g. spawned overlapping a wall)
+    if (p < lo and v < 0) or (p > hi and v > 0):
+        best = 0.0
+    return best
+
+
+def solve_quadratic(a, b, c):
+    """Real roots of a t^2 + b t + c = 0, including the linear case a = 0."""
+    if a == 0:
+        return [] if b == 0 else [-c / b]
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return []
+    root = math.sqrt(disc)
+    # Numerically stable form of the quadratic formula
+    q = -0.5 * (b + math.copysign(root, b))
+    roots = [q / a]
+    if q != 0:
+        roots.append(c / q)
+    return roots
@@ -0,0 +1,60 @@
+# Precomputed explosion shapes for the fireworks scenes.
+#
+# Explode used to call random.uniform, math.cos and math.sin once per particle in Python. Here
+# the unit directions are computed once (a fine table of evenly spaced angles, plus an evenly
+# spaced ring per particle count) and an explosion only picks from, rotates and scales those
+# arrays with one NumPy Generator. A 1000-particle shell costs tens of microseconds, and the
+# same seed gives the same explosions.
+import numpy as np
+
+
+class ExplosionTemplates:
+    def __init__(self, seed=None, directions=4096):
+        self.rng = np.random.default_rng(seed)
+        angles = np.arange(directions) * (2 * np.pi / directions)
+        self.directions = np.stack([np.cos(angles), np.sin(angles)])  # (2, directions) unit vectors
+        self.rings = {}  # particle count -> (2, count) evenly spaced unit vectors, first at angle 0
+
+    def ring(self, count):
+        if count not in self.rings:
+            angles = np.arange(count) * (2 * np.pi / count)
+            self.rings[count] = np.stack([np.cos(angles), np.sin(angles)])
+        return self.rings[count]
+
+    def speeds(self, count, speed):
+        """Per-particle speeds drawn uniformly from speed = (low, high)."""
+        return self.rng.uniform(speed[0], speed[1], count)
+
+    def circular(self, count, speed, rotate=False):
+        """(vx, vy): particles evenly spaced around a circle, random speeds.
+
+        rotate turns the whole ring by a random angle, so repeated shells don't line up.
+        """
+        unit = self.ring(count)
+        if rotate:
+            turn = self.rng.uniform(0, 2 * np.pi)
+            c, s = np.cos(turn), np.sin(turn)
+            unit = np.array([[c, -s], [s, c]]) @ unit
+        return unit * self.speeds(count, speed)
+
+    def burst(self, count, speed, spread=None):
+        """(vx, vy): uniformly random directions and speeds.
+
+        spread = (low, high) multiplies each speed by a further random factor.
+        """
+        picks = self.rng.integers(0, self.directions.shape[1], count)
+        speeds = self.speeds(count, speed)
+        if spread is not None:
+            speeds *= self.rng.uniform(spread[0], spread[1], count)
+        return self.directions[:, picks] * speeds
+
+    def box(self, count, vx, vy):
+        """(vx, vy): velocities uniform in the rectangle vx = (low, high) by vy = (low, high)."""
+        return self.rng.uniform((vx[0], vy[0]), (vx[1], vy[1]), (count, 2)).T
+
+    def choice(self, options):
+        return options[self.rng.integers(len(options))]
+
+    def integers(self, low, high, count=None):
+        """Like random.randint(low, high): both ends included."""
+        return self.rng.integers(low, high + 1, count)
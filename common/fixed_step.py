@@ -0,0 +1,73 @@
+# Fixed-rate simulation driver for the pygame scenes.
+#
+# The scripts used to run exactly one physics update per rendered frame, so a slow draw slowed
+# the simulation down, and a fast one sped it up. FixedStep runs the physics at its own rate
+# off the wall clock: each rendered frame it runs as many ticks as the elapsed time owes (an
+# accumulator), keeping the snapshots taken after the last two ticks. The renderer draws the
+# state blended between those two by how far into the next tick the frame falls, so motion
+# stays smooth whether the screen refreshes faster or slower than the physics.
+import time
+
+import numpy as np
+
+
+class FixedStep:
+    def __init__(self, step, snapshot, rate=60, max_steps=8):
+        """step() advances the simulation one tick; snapshot() returns a copy of what to draw
+        (numbers, arrays, or tuples/lists/dicts of them).
+
+        After a stall, at most max_steps ticks run per frame and the rest of the backlog is
+        dropped, so a slow frame can't snowball into ever slower ones.
+        """
+        self.step = step
+        self.snapshot = snapshot
+        self.rate = rate
+        self.dt = 1 / rate
+        self.max_steps = max_steps
+        self.reset()
+
+    def reset(self):
+        """Start over from the current state: after pausing, or after the state was edited."""
+        self.previous = self.current = self.snapshot()
+        self.accumulator = 0.0
+        self.last = time.perf_counter()
+
+    def advance(self):
+        """Run the ticks owed since the last call; returns how many ran."""
+        now = time.perf_counter()
+        self.accumulator += now - self.last
+        self.last = now
+        steps = 0
+        while self.accumulator >= self.dt:
+            if steps == self.max_steps:
+                self.accumulator %= self.dt
+                break
+            self.step()
+            self.previous, self.current = self.current, self.snapshot()
+            self.accumulator -= self.dt
+            steps += 1
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the wall clock is between the last tick and the next one, 0..1."""
+        return min(self.accumulator / self.dt, 1.0)
+
+    def state(self):
+        """The snapshot interpolated to the current wall-clock time."""
+        return blend(self.previous, self.current, self.alpha)
+
+
+def blend(a, b, t):
+    """a + (b - a) * t through nested tuples, lists and dicts.
+
+    Whatever can't be matched up (dict keys only in b, arrays that changed shape) is taken
+    from b as it is.
+    """
+    if isinstance(b, dict):
+        return {key: blend(a[key], value, t) if key in a else value for key, value in b.items()}
+    if isinstance(b, (tuple, list)):
+        return type(b)(blend(x, y, t) for x, y in zip(a, b))
+    if isinstance(b, np.ndarray) and np.shape(a) != b.shape:
+        return b
+    return a + (b - a) * t
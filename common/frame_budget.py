@@ -0,0 +1,70 @@
+# Frame-time budget and level-of-detail control for the fireworks scenes.
+#
+# The scripts used to launch fireworks by pure chance and let clock.tick drop frames once the
+# work outgrew the frame. FrameBudget times the update and draw halves of every frame, smooths
+# them, and turns the total into a quality level between min_quality and 1: over budget it cuts
+# quality multiplicatively, with headroom it gives it back a step at a time. The scripts scale
+# launch chances and explosion sizes by it and, at low quality, merge crowded particles.
+import time
+
+
+class FrameBudget:
+    def __init__(self, budget=1 / 60, smoothing=0.2, low=0.7, high=0.9,
+                 min_quality=0.1, cut=0.7, recover=0.05, merge_below=0.5):
+        """budget is the frame time to stay under, in seconds.
+
+        Quality drops by the factor cut when the smoothed frame time passes high * budget and
+        rises by recover when it is under low * budget; in between it holds, so it doesn't
+        oscillate. merge_below is the quality at which particle merging starts.
+        """
+        self.budget = budget
+        self.smoothing = smoothing
+        self.low = low
+        self.high = high
+        self.min_quality = min_quality
+        self.cut = cut
+        self.recover = recover
+        self.merge_below = merge_below
+        self.quality = 1.0
+        self.update_time = 0.0  # smoothed seconds per frame in each half
+        self.draw_time = 0.0
+        self.started = self.marked = time.perf_counter()
+
+    def begin(self):
+        self.started = self.marked = time.perf_counter()
+
+    def mark(self):
+        """End of the update half; everything until end() counts as drawing."""
+        self.marked = time.perf_counter()
+
+    def end(self):
+        """Close the frame (before clock.tick, so the idle wait isn't counted) and adapt quality."""
+        now = time.perf_counter()
+        a = self.smoothing
+        self.update_time += a * (self.marked - self.started - self.update_time)
+        self.draw_time += a * (now - self.marked - self.draw_time)
+        total = self.frame_time
+        if total > self.high * self.budget:
+            self.quality = max(self.min_quality, self.quality * self.cut)
+        elif total < self.low * self.budget:
+            self.quality = min(1.0, self.quality + self.recover)
+
+    @property
+    def frame_time(self):
+        return self.update_time + self.draw_time
+
+    @property
+    def over(self):
+        return self.frame_time > self.budget
+
+    def chance(self, probability):
+        """Launch probability for this frame: scaled by quality, none at all while over budget."""
+        return 0.0 if self.over else probability * self.quality
+
+    def count(self, n, minimum=8):
+        """Particles to spawn for an explosion that would have n at full quality."""
+        return min(n, max(minimum, round(n * self.quality)))
+
+    @property
+    def merging(self):
+        return self.quality < self.merge_below
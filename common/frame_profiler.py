@@ -0,0 +1,163 @@
+# Per-frame phase timing for the pygame main loops: an on-screen overlay and a Chrome trace.
+#
+# The loop wraps each stage in `with profiler.phase('physics'):` and calls end_frame() once per
+# frame. Stages buried inside other code (a world's collision pass, pygame.display.update inside
+# a renderer) are timed by instrument(), which swaps the named methods for timed wrappers. Phases
+# can nest; the overlay indents them under their parent. It shows each phase's average and worst
+# time over the last `window` frames, plus whatever counts the loop reports. With a trace_path,
+# every phase and frame is also kept as a Chrome trace event. close() writes them as JSON, for
+# chrome://tracing or https://ui.perfetto.dev.
+#
+# Disabled, phase() hands back one shared do-nothing context manager, instrument() leaves the
+# methods alone and everything else returns straight away: about 2 us per frame in all.
+import collections
+import contextlib
+import json
+import os
+import time
+
+import pygame
+
+_NULL = contextlib.nullcontext()
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.push(self.name)
+
+    def __exit__(self, *exc):
+        self.profiler.pop()
+
+
+class FrameProfiler:
+    def __init__(self, enabled=True, trace_path=None, window=120, refresh=15, max_events=500000):
+        """window is the number of frames the overlay averages over; it is re-rendered every
+        refresh frames. The trace keeps the last max_events events."""
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.refresh = refresh
+        self.phases = {}  # name -> _Phase, reused for every entry
+        self.parent = {}  # name -> enclosing phase the first time it was entered, in order of appearance
+        self.stack = []  # (name, start) of the phases currently open
+        self.totals = collections.defaultdict(float)  # seconds per phase in the current frame
+        self.counts = {}
+        self.history = collections.deque(maxlen=window)  # (frame seconds, totals) per frame
+        self.events = collections.deque(maxlen=max_events) if trace_path else None
+        self.origin = self.frame_start = time.perf_counter()
+        self.frames = 0
+        self.font = None
+        self.panel = None
+        self.panel_width = 280  # only ever grows, so a new panel always covers the old one
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = _Phase(self, name)
+        return phase
+
+    def push(self, name):
+        if name not in self.parent:
+            self.parent[name] = self.stack[-1][0] if self.stack else None
+        self.stack.append((name, time.perf_counter()))
+
+    def pop(self):
+        end = time.perf_counter()
+        name, start = self.stack.pop()
+        self.totals[name] += end - start
+        if self.events is not None:
+            self.events.append({'name': name, 'ph': 'X', 'ts': self.us(start), 'dur': (end - start) * 1e6,
+                                'pid': os.getpid(), 'tid': 0})
+
+    def instrument(self, owner, **phases):
+        """Time owner.method as a phase for each method=phase given; owner is an object, class or module."""
+        if not self.enabled:
+            return
+        for attribute, name in phases.items():
+            method = getattr(owner, attribute)
+            phase = self.phase(name)
+
+            def timed(*args, method=method, phase=phase, **kwargs):
+                with phase:
+                    return method(*args, **kwargs)
+            setattr(owner, attribute, timed)
+
+    def count(self, name, value):
+        """Report a count (balls, particles, ...) for this frame."""
+        if self.enabled:
+            self.counts[name] = value
+
+    def end_frame(self):
+        """Close the frame: it runs from the previous end_frame() to now."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.history.append((now - self.frame_start, dict(self.totals)))
+        if self.events is not None:
+            pid = os.getpid()
+            self.events.append({'name': 'frame', 'ph': 'X', 'ts': self.us(self.frame_start),
+                                'dur': (now - self.frame_start) * 1e6, 'pid': pid, 'tid': 1})
+            if self.counts:
+                self.events.append({'name': 'counts', 'ph': 'C', 'ts': self.us(now), 'pid': pid,
+                                    'args': dict(self.counts)})
+        self.totals.clear()
+        self.frame_start = now
+        self.frames += 1
+
+    def us(self, t):
+        return (t - self.origin) * 1e6
+
+    def tree(self, parent=None, depth=0):
+        """(name, depth) of each phase, children right after their parent."""
+        for name, above in self.parent.items():
+            if above == parent:
+                yield name, depth
+                yield from self.tree(name, depth + 1)
+
+    def rows(self):
+        """(label, value) lines of the overlay."""
+        frame_times = [frame for frame, _ in self.history]
+        mean = sum(frame_times) / len(frame_times)
+        rows = [(f"{1 / mean if mean else 0:.1f} fps", f"{mean * 1000:6.2f} ms  max {max(frame_times) * 1000:6.2f}")]
+        for name, depth in self.tree():
+            times = [totals.get(name, 0.0) for _, totals in self.history]
+            rows.append(('   ' * depth + name, f"{sum(times) / len(times) * 1000:6.2f} ms  max {max(times) * 1000:6.2f}"))
+        if self.counts:
+            rows.append(('  '.join(f"{name} {value}" for name, value in self.counts.items()), ''))
+        return rows
+
+    def draw(self, surface, position=(8, 8)):
+        """Blit the overlay onto surface; returns the rectangle covered (None when disabled).
+
+        The panel is opaque, so with dirty-rectangle drawing it is enough to update that
+        rectangle after drawing it last.
+        """
+        if not self.enabled or not self.history:
+            return None
+        with self.phase('hud'):
+            if self.panel is None or self.frames % self.refresh == 0:
+                if self.font is None:
+                    pygame.font.init()
+                    self.font = pygame.font.Font(None, 18)
+                rendered = [(self.font.render(label, True, (230, 230, 230)), self.font.render(value, True, (230, 230, 230)))
+                            for label, value in self.rows()]
+                width = max(max(label.get_width(), 110 + value.get_width()) for label, value in rendered)
+                self.panel_width = max(self.panel_width, width + 12)
+                self.panel = pygame.Surface((self.panel_width, 14 * len(rendered) + 8))
+                self.panel.fill((24, 24, 24))
+                for row, (label, value) in enumerate(rendered):
+                    self.panel.blit(label, (6, 4 + 14 * row))
+                    self.panel.blit(value, (116, 4 + 14 * row))
+            return surface.blit(self.panel, position)
+
+    def close(self):
+        """Write the trace, if one was asked for."""
+        if not self.enabled or self.events is None:
+            return
+        with open(self.trace_path, 'w') as f:
+            json.dump({'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}, f)
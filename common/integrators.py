@@ -0,0 +1,98 @@
+# Fixed-step integrators for small ODE systems, shared by the pygame pendulums.
+#
+# Every stepper has the signature step(f, y, dt) -> new y, where y is a 1-D NumPy array and
+# f(y) returns dy/dt. The leapfrog stepper treats the first half of y as positions and the
+# second half as momenta/velocities.
+#
+# Orders below are the ones bench_steppers.py measures. Note that none of the pendulums here is a
+# separable system: their position derivative depends on the positions too (claudeCode's momentum
+# form) or their accelerations depend on the velocities (common/pendulum.py, common/chain.py).
+import numpy as np
+
+
+def euler_step(f, y, dt):
+    return y + dt * f(y)
+
+
+def rk4_step(f, y, dt):
+    k1 = f(y)
+    k2 = f(y + 0.5 * dt * k1)
+    k3 = f(y + 0.5 * dt * k2)
+    k4 = f(y + dt * k3)
+    return y + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def leapfrog_step(f, y, dt):
+    # Kick-drift-kick. This is velocity Verlet (second order, symplectic) only for separable
+    # systems, where dq/dt depends on p alone and dp/dt on q alone. The kicks here evaluate the
+    # acceleration with stale velocities, so on the velocity-form pendulums it is only first order
+    # (second order on claudeCode's momentum form). Use midpoint_step for a method that is second
+    # order on all of them.
+    n = len(y) // 2
+    half = y.copy()
+    half[n:] += 0.5 * dt * f(y)[n:]
+    drifted = half.copy()
+    drifted[:n] += dt * f(half)[:n]
+    drifted[n:] += 0.5 * dt * f(drifted)[n:]
+    return drifted
+
+
+def midpoint_step(f, y, dt, tol=1e-12, max_iterations=20):
+    # Implicit midpoint: y1 = y + dt f((y + y1) / 2). Second order and time-reversible for any f,
+    # and symplectic for a Hamiltonian system in canonical coordinates. The slope at the
+    # midpoint is found by fixed-point iteration; at the frame steps used here it converges in a
+    # handful of f evaluations.
+    k = f(y)
+    for _ in range(max_iterations):
+        k_next = f(y + 0.5 * dt * k)
+        converged = dt * np.max(np.abs(k_next - k)) <= tol * (1.0 + np.max(np.abs(y)))
+        k = k_next
+        if converged:
+            break
+    return y + dt * k
+
+
+class AdaptiveStepper:
+    """RK4 with step doubling: splits each frame step into as many substeps as tol requires."""
+
+    def __init__(self, tol=1e-6, min_substep=1e-5):
+        self.tol = tol
+        self.min_substep = min_substep
+        self.substep = None  # remembered between frames so the next frame starts close
+        self.substeps_taken = 0
+
+    def __call__(self, f, y, dt):
+        h = dt if self.substep is None else min(self.substep, dt)
+        t = 0.0
+        while dt - t > 1e-12 * dt:
+            h = min(h, dt - t)
+            full = rk4_step(f, y, h)
+            half = rk4_step(f, rk4_step(f, y, 0.5 * h), 0.5 * h)
+            # Richardson error estimate for a 4th-order method
+            error = np.max(np.abs(half - full)) / 15.0
+            scale = self.tol * (1.0 + np.max(np.abs(y)))
+            if error <= scale or h <= self.min_substep:
+                y = half + (half - full) / 15.0
+                t += h
+                self.substeps_taken += 1
+                # Grow the next substep, but gently
+                h *= min(2.0, 0.9 * (scale / max(error, 1e-300)) ** 0.2)
+            else:
+                h *= max(0.2, 0.9 * (scale / error) ** 0.2)
+        self.substep = h
+        return y
+
+
+def make_stepper(name):
+    """Return a stepper by name: 'euler', 'rk4', 'leapfrog', 'midpoint' or 'adaptive'."""
+    if name == 'euler':
+        return euler_step
+    if name == 'rk4':
+        return rk4_step
+    if name in ('leapfrog', 'verlet'):
+        return leapfrog_step
+    if name == 'midpoint':
+        return midpoint_step
+    if name == 'adaptive':
+        return AdaptiveStepper()
+    raise ValueError(f"Unknown stepper: {name!r}")
@@ -0,0 +1,177 @@
+# Multi-process BallWorld: the box is cut into vertical strips, one per worker process.
+#
+# Ball state lives in one shared-memory block that every worker maps. A step runs in three
+# phases separated by barriers:
+#   1. each worker integrates and wall-bounces the balls currently inside its strip;
+#   2. each worker finds the contacts of its strip plus a halo of neighbouring balls read
+#      straight from shared memory, and writes the resulting impulses into its own slice
+#      of a shared delta block (no two workers ever write the same memory);
+#   3. each worker adds every worker's deltas to the balls it owns.
+# Ownership is just floor(x / strip width), recomputed from shared state once per step, so
+# balls migrate between strips without any messages. The physics is the same as BallWorld's
+# (common/ball_world.py); only the final state arrays are read back by the renderer.
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .ball_world import bounce_walls, busiest_contacts, integrate, pair_response
+from .broadphase import overlapping_pairs
+
+FIELDS = ('x', 'y', 'vx', 'vy', 'radius', 'mass')
+
+
+class ParallelBallWorld:
+    def __init__(self, x, y, vx, vy, radius, mass, width, height, color=None,
+                 gravity=(0.0, 0.5), dt=1.0, wall_elasticity=1.0, pair_elasticity=1.0,
+                 friction=1.0, separate=True, workers=None):
+        n = len(x)
+        self.workers = workers or os.cpu_count() or 1
+        self._state_memory = shared_memory.SharedMemory(create=True, size=len(FIELDS) * n * 8)
+        self._delta_memory = shared_memory.SharedMemory(create=True, size=self.workers * 4 * n * 8)
+        self.state = np.ndarray((len(FIELDS), n), dtype=float, buffer=self._state_memory.buf)
+        for row, values in zip(self.state, (x, y, vx, vy, radius, mass)):
+            row[:] = np.broadcast_to(np.asarray(values, dtype=float), (n,))
+        np.ndarray((self.workers, 4, n), dtype=float, buffer=self._delta_memory.buf)[:] = 0
+
+        if color is None:
+            color = np.full((n, 3), 255)
+        self.color = np.array(color, dtype=np.uint8).reshape(n, 3)
+        self.width = width
+        self.height = height
+
+        params = dict(n=n, workers=self.workers, width=width, height=height, gravity=gravity, dt=dt,
+                      wall_elasticity=wall_elasticity, pair_elasticity=pair_elasticity,
+                      friction=friction, separate=separate)
+        # The main process joins start/done; the workers also sync among themselves between phases
+        self._steps = mp.Value('q', 0, lock=False)
+        self._start = mp.Barrier(self.workers + 1)
+        self._done = mp.Barrier(self.workers + 1)
+        phase = mp.Barrier(self.workers)
+        self._processes = [
+            mp.Process(target=run_worker, daemon=True,
+                       args=(rank, self._state_memory.name, self._delta_memory.name, params,
+                             self._steps, self._start, self._done, phase))
+            for rank in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+    def __len__(self):
+        return self.state.shape[1]
+
+    # Same attribute names as BallWorld, so BallView and the drawing code work unchanged
+    x = property(lambda self: self.state[0])
+    y = property(lambda self: self.state[1])
+    vx = property(lambda self: self.state[2])
+    vy = property(lambda self: self.state[3])
+    radius = property(lambda self: self.state[4])
+    mass = property(lambda self: self.state[5])
+
+    def step(self, steps=1):
+        """Run steps on the workers and wait; the state arrays are only touched between calls."""
+        self._steps.value = steps
+        self._start.wait()
+        self._done.wait()
+
+    def close(self):
+        if not self._processes:
+            return
+        self._steps.value = -1
+        self._start.wait()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+        del self.state
+        self._state_memory.close()
+        self._state_memory.unlink()
+        self._delta_memory.close()
+        self._delta_memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def kinetic_energy(self):
+        return 0.5 * float(np.sum(self.mass * (self.vx * self.vx + self.vy * self.vy)))
+
+
+def run_worker(rank, state_name, delta_name, params, steps, start, done, phase):
+    state_memory = shared_memory.SharedMemory(name=state_name)
+    delta_memory = shared_memory.SharedMemory(name=delta_name)
+    n, workers = params['n'], params['workers']
+    state = np.ndarray((len(FIELDS), n), dtype=float, buffer=state_memory.buf)
+    deltas = np.ndarray((workers, 4, n), dtype=float, buffer=delta_memory.buf)
+    x, y, vx, vy, radius, mass = state
+    strip = params['width'] / workers
+    x0, x1 = rank * strip, (rank + 1) * strip
+    reach = 2.0 * float(radius.max())
+    # A ball's contact count needs all of its partners, so look one reach further than the
+    # balls that can touch this strip
+    halo = 2.0 * reach
+    touched = np.empty(0, dtype=np.intp)
+
+    def owned():
+        owner = np.clip((x // strip).astype(np.int64), 0, workers - 1)
+        return np.flatnonzero(owner == rank)
+
+    # Ownership must be worked out while nobody is writing x, so it is taken during phase 2
+    # (which only writes deltas) and carried into the next phase 1
+    mine = owned()
+    while True:
+        start.wait()
+        count = steps.value
+        if count < 0:
+            break
+        for _ in range(count):
+            # 1. Motion and walls for this strip's balls
+            bx, by, bvx, bvy = x[mine], y[mine], vx[mine], vy[mine]
+            integrate(bx, by, bvx, bvy, params['gravity'], params['dt'], params['friction'])
+            bounce_walls(bx, by, bvx, bvy, radius[mine], params['width'], params['height'],
+                         params['wall_elasticity'])
+            x[mine], y[mine], vx[mine], vy[mine] = bx, by, bvx, bvy
+            phase.wait()
+
+            # 2. Contacts among this strip and its halo; keep the pairs whose lower index is ours
+            mine = owned()
+            deltas[rank][:, touched] = 0
+            near = np.flatnonzero((x >= x0 - halo) & (x < x1 + halo))
+            i, j = overlapping_pairs(x[near], y[near], radius[near], cell_size=reach)
+            touched = np.empty(0, dtype=np.intp)
+            if len(i):
+                i, j = near[i], near[j]
+                contacts = busiest_contacts(i, j, n)
+                lower = np.minimum(i, j)
+                ours = np.clip((x[lower] // strip).astype(np.int64), 0, workers - 1) == rank
+                i, j, contacts = i[ours], j[ours], contacts[ours]
+            if len(i):
+                px, py, sx, sy = pair_response(x, y, vx, vy, radius, mass, i, j, contacts,
+                                               params['pair_elasticity'], params['separate'])
+                delta = deltas[rank]
+                np.add.at(delta[0], i, -px / mass[i])
+                np.add.at(delta[1], i, -py / mass[i])
+                np.add.at(delta[0], j, px / mass[j])
+                np.add.at(delta[1], j, py / mass[j])
+                if params['separate']:
+                    np.add.at(delta[2], i, -sx)
+                    np.add.at(delta[3], i, -sy)
+                    np.add.at(delta[2], j, sx)
+                    np.add.at(delta[3], j, sy)
+                touched = np.unique(np.concatenate([i, j]))
+            phase.wait()
+
+            # 3. Gather everyone's deltas for the balls this strip owns
+            total = deltas[:, :, mine].sum(axis=0)
+            vx[mine] += total[0]
+            vy[mine] += total[1]
+            x[mine] += total[2]
+            y[mine] += total[3]
+            phase.wait()
+        done.wait()
+
+    del x, y, vx, vy, radius, mass, state, deltas
+    state_memory.close()
+    delta_memory.close()
@@ -0,0 +1,159 @@
+# Preallocated structure-of-arrays particle pool for the fireworks scenes.
+#
+# Position, velocity, colour, age, lifetime, owner and an alive flag for every particle slot live
+# in NumPy arrays, and one update() call moves, drags, pulls down and ages all of them at once.
+# Dead slots go onto a free-list stack and are handed out again by the next spawn(), so
+# explosions stop allocating objects; the arrays only grow (by doubling) if the pool runs dry.
+import numpy as np
+
+
+class ParticlePool:
+    def __init__(self, capacity=4096, gravity=0.0, fall=0.0, drag=1.0, fade='lifetime', fade_rate=4):
+        """Physics per update, matching the fireworks scripts' Particle classes:
+
+        gravity    added to vy before moving (an acceleration)
+        fall       added to y after moving (a constant sink speed)
+        drag       velocity multiplier applied after moving
+        fade       'lifetime': alpha falls linearly from 255 to 0 over each particle's lifetime
+                   'rate': alpha drops by fade_rate per update, down to 0
+        """
+        self.gravity = gravity
+        self.fall = fall
+        self.drag = drag
+        self.fade = fade
+        self.fade_rate = fade_rate
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        self.color = np.zeros((0, 3), dtype=np.uint8)
+        self.age = np.zeros(0, dtype=np.int32)
+        self.lifetime = np.zeros(0, dtype=np.int32)
+        self.owner = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.free = np.zeros(0, dtype=np.intp)  # stack of free slots; the top is free[free_count - 1]
+        self.free_count = 0
+        self.grow(capacity)
+
+    @property
+    def capacity(self):
+        return len(self.x)
+
+    def __len__(self):
+        """Number of live particles."""
+        return self.capacity - self.free_count
+
+    def grow(self, capacity):
+        old = self.capacity
+        for name in ('x', 'y', 'vx', 'vy', 'color', 'age', 'lifetime', 'owner', 'alive'):
+            array = getattr(self, name)
+            bigger = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            bigger[:old] = array
+            setattr(self, name, bigger)
+        # New slots go under the existing free ones, lowest index on top
+        free = np.empty(capacity, dtype=np.intp)
+        added = capacity - old
+        free[:added] = np.arange(capacity - 1, old - 1, -1)
+        free[added:added + self.free_count] = self.free[:self.free_count]
+        self.free = free
+        self.free_count += added
+
+    def spawn(self, x, y, vx, vy, color, lifetime, owner=-1):
+        """Start len(vx) particles; scalars are broadcast. Returns the slot indices used."""
+        vx = np.atleast_1d(np.asarray(vx, dtype=float))
+        count = len(vx)
+        if count > self.free_count:
+            self.grow(max(2 * self.capacity, len(self) + count))
+        slots = self.free[self.free_count - count:self.free_count].copy()
+        self.free_count -= count
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = vx
+        self.vy[slots] = vy
+        self.color[slots] = color
+        self.age[slots] = 0
+        self.lifetime[slots] = lifetime
+        self.owner[slots] = owner
+        self.alive[slots] = True
+        return slots
+
+    def update(self):
+        """One frame for every live particle, then recycle the ones that reached their lifetime."""
+        alive = self.alive
+        if self.gravity:
+            self.vy += self.gravity
+        self.x += self.vx
+        self.y += self.vy
+        if self.fall:
+            self.y += self.fall
+        if self.drag != 1.0:
+            self.vx *= self.drag
+            self.vy *= self.drag
+        self.age += alive  # dead slots stay at whatever age they died
+
+        self.kill(np.flatnonzero(alive & (self.age >= self.lifetime)))
+
+    def kill(self, slots):
+        """Recycle the given live slots."""
+        if len(slots):
+            self.alive[slots] = False
+            self.free[self.free_count:self.free_count + len(slots)] = slots
+            self.free_count += len(slots)
+
+    def merge(self, cell):
+        """Collapse live particles of the same owner that share a cell x cell square into one.
+
+        The survivor takes the group's mean position and velocity. Used as a level of detail
+        when frames run over budget; returns the number of particles removed.
+        """
+        live = self.live()
+        if len(live) < 2:
+            return 0
+        keys = np.stack([self.owner[live],
+                         np.floor(self.x[live] / cell).astype(np.int64),
+                         np.floor(self.y[live] / cell).astype(np.int64)], axis=1)
+        _, first, group, counts = np.unique(keys, axis=0, return_index=True,
+                                            return_inverse=True, return_counts=True)
+        group = group.ravel()
+        if len(first) == len(live):
+            return 0
+        survivors = live[first]
+        for name in ('x', 'y', 'vx', 'vy'):
+            array = getattr(self, name)
+            array[survivors] = np.bincount(group, weights=array[live]) / counts
+        merged = np.ones(len(live), dtype=bool)
+        merged[first] = False
+        self.kill(live[merged])
+        return int(merged.sum())
+
+    def live(self):
+        """Slot indices of the live particles."""
+        return np.flatnonzero(self.alive)
+
+    def snapshot(self):
+        """(2, capacity) copy of every slot's position, e.g. for a FixedStep snapshot."""
+        return np.stack([self.x, self.y])
+
+    def interpolate(self, previous, current, t):
+        """Positions a fraction t of the way from one snapshot to the next.
+
+        Particles spawned in the latest update (age 0) took over slots that held something else
+        in previous, so they sit at their current position.
+        """
+        if previous.shape != current.shape:
+            return current
+        blended = previous + (current - previous) * t
+        born = self.age[:current.shape[1]] == 0
+        blended[:, born] = current[:, born]
+        return blended
+
+    def alpha(self, slots):
+        """Current opacity (0-255) of the given slots."""
+        age = self.age[slots]
+        if self.fade == 'rate':
+            return np.maximum(0, 255 - self.fade_rate * age)
+        return (255 * (1 - age / self.lifetime[slots])).astype(int)
+
+    def owned(self, slots, owner):
+        """Whether any of slots is still alive and still belongs to owner (slots get reused)."""
+        return bool(np.any(self.alive[slots] & (self.owner[slots] == owner)))
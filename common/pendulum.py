@@ -0,0 +1,153 @@
+# Double pendulum equations of motion, written to work on whole arrays of states at once.
+#
+# State layout follows DeepSeek/deepseekCode.py: (theta1, theta2, omega1, omega2), angles measured
+# from the downward vertical. A single state is shape (4,), an ensemble is shape (N, 4).
+import math
+
+import numpy as np
+
+# Default constants (same as the scripts)
+G = 9.81  # gravity (m/s^2)
+L1 = 1.0  # length of the first pendulum (m)
+L2 = 1.0  # length of the second pendulum (m)
+M1 = 1.0  # mass of the first pendulum (kg)
+M2 = 1.0  # mass of the second pendulum (kg)
+
+
+def accelerations(theta1, theta2, omega1, omega2, g=G, L1=L1, L2=L2, m1=M1, m2=M2, xp=np):
+    """Angular accelerations of both arms for arrays of any matching shape.
+
+    Pass xp=math for plain Python floats: math.sin is several times cheaper than np.sin on scalars.
+    """
+    delta = theta2 - theta1
+    sin_d = xp.sin(delta)
+    cos_d = xp.cos(delta)
+    den1 = (m1 + m2) * L1 - m2 * L1 * cos_d ** 2
+    den2 = (L2 / L1) * den1
+
+    domega1 = (m2 * L1 * omega1 ** 2 * sin_d * cos_d +
+               m2 * g * xp.sin(theta2) * cos_d +
+               m2 * L2 * omega2 ** 2 * sin_d -
+               (m1 + m2) * g * xp.sin(theta1)) / den1
+    domega2 = (-m2 * L2 * omega2 ** 2 * sin_d * cos_d +
+               (m1 + m2) * (g * xp.sin(theta1) * cos_d -
+                            L1 * omega1 ** 2 * sin_d -
+                            g * xp.sin(theta2))) / den2
+    return domega1, domega2
+
+
+def derivatives(t, y, g=G, L1=L1, L2=L2, m1=M1, m2=M2):
+    """solve_ivp right-hand side returning an array. Also takes (4, k) columns for vectorized=True."""
+    if np.ndim(y) == 1:
+        # Single state: scalar math is much cheaper than NumPy on 4 elements
+        theta1, theta2, omega1, omega2 = np.asarray(y, dtype=float).tolist()
+        xp = math
+    else:
+        theta1, theta2, omega1, omega2 = y
+        xp = np
+    domega1, domega2 = accelerations(theta1, theta2, omega1, omega2, g, L1, L2, m1, m2, xp)
+    return np.array([omega1, omega2, domega1, domega2])
+
+
+def jacobian(t, y, g=G, L1=L1, L2=L2, m1=M1, m2=M2):
+    """Closed-form 4x4 Jacobian of derivatives() for implicit solvers (Radau, BDF, LSODA)."""
+    theta1, theta2, omega1, omega2 = np.asarray(y, dtype=float).tolist()
+    delta = theta2 - theta1
+    s, c = math.sin(delta), math.cos(delta)
+    cos2 = c * c - s * s  # d(sin*cos)/d(delta)
+    den1 = (m1 + m2) * L1 - m2 * L1 * c ** 2
+    den2 = (L2 / L1) * den1
+    # d(den1)/d(theta1); d(den1)/d(theta2) is the negative of this
+    dden1 = -2 * m2 * L1 * c * s
+
+    n1 = (m2 * L1 * omega1 ** 2 * s * c + m2 * g * math.sin(theta2) * c +
+          m2 * L2 * omega2 ** 2 * s - (m1 + m2) * g * math.sin(theta1))
+    n2 = (-m2 * L2 * omega2 ** 2 * s * c +
+          (m1 + m2) * (g * math.sin(theta1) * c - L1 * omega1 ** 2 * s - g * math.sin(theta2)))
+
+    dn1_dtheta1 = (-m2 * L1 * omega1 ** 2 * cos2 + m2 * g * math.sin(theta2) * s -
+                   m2 * L2 * omega2 ** 2 * c - (m1 + m2) * g * math.cos(theta1))
+    dn1_dtheta2 = (m2 * L1 * omega1 ** 2 * cos2 + m2 * g * (math.cos(theta2) * c - math.sin(theta2) * s) +
+                   m2 * L2 * omega2 ** 2 * c)
+    dn2_dtheta1 = (m2 * L2 * omega2 ** 2 * cos2 +
+                   (m1 + m2) * (g * math.cos(theta1) * c + g * math.sin(theta1) * s + L1 * omega1 ** 2 * c))
+    dn2_dtheta2 = (-m2 * L2 * omega2 ** 2 * cos2 -
+                   (m1 + m2) * (g * math.sin(theta1) * s + L1 * omega1 ** 2 * c + g * math.cos(theta2)))
+
+    jac = np.zeros((4, 4))
+    jac[0, 2] = 1.0
+    jac[1, 3] = 1.0
+    # Quotient rule: d(n/den) = (dn - (n/den) * dden) / den
+    jac[2, 0] = (dn1_dtheta1 - n1 / den1 * dden1) / den1
+    jac[2, 1] = (dn1_dtheta2 + n1 / den1 * dden1) / den1
+    jac[2, 2] = 2 * m2 * L1 * omega1 * s * c / den1
+    jac[2, 3] = 2 * m2 * L2 * omega2 * s / den1
+    dden2 = (L2 / L1) * dden1
+    jac[3, 0] = (dn2_dtheta1 - n2 / den2 * dden2) / den2
+    jac[3, 1] = (dn2_dtheta2 + n2 / den2 * dden2) / den2
+    jac[3, 2] = -2 * (m1 + m2) * L1 * omega1 * s / den2
+    jac[3, 3] = -2 * m2 * L2 * omega2 * s * c / den2
+    return jac
+
+
+def ensemble_derivatives(states, g=G, L1=L1, L2=L2, m1=M1, m2=M2):
+    """Derivatives of an (N, 4) ensemble in one batched NumPy evaluation."""
+    out = np.empty_like(states)
+    out[:, 0] = states[:, 2]
+    out[:, 1] = states[:, 3]
+    out[:, 2], out[:, 3] = accelerations(states[:, 0], states[:, 1], states[:, 2], states[:, 3],
+                                         g, L1, L2, m1, m2)
+    return out
+
+
+def rk4_step(states, dt, g=G, L1=L1, L2=L2, m1=M1, m2=M2):
+    """Advance an (N, 4) ensemble by one classical Runge-Kutta step."""
+    params = (g, L1, L2, m1, m2)
+    k1 = ensemble_derivatives(states, *params)
+    k2 = ensemble_derivatives(states + 0.5 * dt * k1, *params)
+    k3 = ensemble_derivatives(states + 0.5 * dt * k2, *params)
+    k4 = ensemble_derivatives(states + dt * k3, *params)
+    return states + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def integrate_ensemble(states, t_max, dt, g=G, L1=L1, L2=L2, m1=M1, m2=M2):
+    """Integrate an (N, 4) ensemble to t_max with fixed RK4 steps and return the final states."""
+    steps = int(round(t_max / dt))
+    for _ in range(steps):
+        states = rk4_step(states, dt, g, L1, L2, m1, m2)
+    return states
+
+
+def positions(states, L1=L1, L2=L2):
+    """Cartesian bob positions (x1, y1, x2, y2) for states shaped (4,), (N, 4) or (4, T)."""
+    states = np.asarray(states)
+    if states.ndim == 2 and states.shape[1] == 4:
+        theta1, theta2 = states[:, 0], states[:, 1]
+    else:
+        theta1, theta2 = states[0], states[1]
+    x1 = L1 * np.sin(theta1)
+    y1 = -L1 * np.cos(theta1)
+    x2 = x1 + L2 * np.sin(theta2)
+    y2 = y1 - L2 * np.cos(theta2)
+    return x1, y1, x2, y2
+
+
+def energy(states, g=G, L1=L1, L2=L2, m1=M1, m2=M2):
+    """Total mechanical energy for each state in an (N, 4) ensemble (or a single (4,) state)."""
+    states = np.asarray(states)
+    theta1, theta2, omega1, omega2 = states.T
+    kinetic = (0.5 * (m1 + m2) * L1 ** 2 * omega1 ** 2 +
+               0.5 * m2 * L2 ** 2 * omega2 ** 2 +
+               m2 * L1 * L2 * omega1 * omega2 * np.cos(theta1 - theta2))
+    potential = -(m1 + m2) * g * L1 * np.cos(theta1) - m2 * g * L2 * np.cos(theta2)
+    return kinetic + potential
+
+
+def fan(theta1, theta2, count, spread, omega1=0.0, omega2=0.0):
+    """(count, 4) ensemble of nearly identical starts, theta2 spread evenly over +-spread/2."""
+    states = np.empty((count, 4))
+    states[:, 0] = theta1
+    states[:, 1] = theta2 + np.linspace(-spread / 2, spread / 2, count)
+    states[:, 2] = omega1
+    states[:, 3] = omega2
+    return states
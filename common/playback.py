@@ -0,0 +1,87 @@
+# Dense-output playback for the matplotlib pendulums.
+#
+# The system is integrated once, lazily, in fixed-length segments with solve_ivp(dense_output=True).
+# Each frame asks for the state at the current playback time, which is interpolated from the
+# segment covering it, so simulation time is independent of how many frames actually get drawn.
+# Only the boundary state of each segment is kept for good; a bounded number of dense segments
+# are kept around and anything evicted is re-integrated from its boundary state on demand.
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+
+class DensePlayback:
+    def __init__(self, rhs, y0, segment=5.0, keep_segments=8, speed=1.0, checkpoints=None,
+                 **solve_kwargs):
+        self.rhs = rhs
+        self.segment = segment
+        self.keep_segments = keep_segments
+        self.solve_kwargs = solve_kwargs
+        # checkpoints[k] is the state at t = k * segment
+        if checkpoints is not None:
+            self.checkpoints = [np.array(c, dtype=float) for c in np.asarray(checkpoints).T]
+        else:
+            self.checkpoints = [np.array(y0, dtype=float)]
+        self.segments = OrderedDict()
+        self.speed = speed
+        self.anchor_time = 0.0
+        self.anchor_wall = time.perf_counter()
+
+    # Playback clock
+    def now(self):
+        """Current playback time, driven by the wall clock and the playback speed."""
+        t = self.anchor_time + (time.perf_counter() - self.anchor_wall) * self.speed
+        if t < 0:
+            self.seek(0.0)
+            return 0.0
+        return t
+
+    def seek(self, t):
+        self.anchor_time = max(0.0, t)
+        self.anchor_wall = time.perf_counter()
+
+    def set_speed(self, speed):
+        # Re-anchor so changing speed doesn't make the playback time jump
+        self.anchor_time = self.now()
+        self.anchor_wall = time.perf_counter()
+        self.speed = speed
+
+    # Interpolation
+    def state_at(self, t):
+        """State vector at simulation time t >= 0, integrating further if needed."""
+        t = max(0.0, t)
+        k = int(t // self.segment)
+        return self.dense_segment(k)(t)
+
+    def current_state(self):
+        t = self.now()
+        return t, self.state_at(t)
+
+    def dense_segment(self, k):
+        if k in self.segments:
+            self.segments.move_to_end(k)
+            return self.segments[k]
+        # Extend the checkpoints up to segment k, keeping the dense solutions we pass on the way
+        while len(self.checkpoints) <= k:
+            self.integrate_segment(len(self.checkpoints) - 1)
+        if k not in self.segments:
+            self.integrate_segment(k)
+        return self.segments[k]
+
+    def integrate_segment(self, k):
+        t0 = k * self.segment
+        t1 = t0 + self.segment
+        sol = solve_ivp(self.rhs, [t0, t1], self.checkpoints[k], dense_output=True,
+                        **self.solve_kwargs)
+        if len(self.checkpoints) == k + 1:
+            self.checkpoints.append(sol.y[:, -1])
+        self.segments[k] = sol.sol
+        self.segments.move_to_end(k)
+        while len(self.segments) > self.keep_segments:
+            self.segments.popitem(last=False)
+
+    def checkpoint_array(self):
+        """Segment boundary states as a (n_states, n_checkpoints) array, e.g. for caching."""
+        return np.array(self.checkpoints).T
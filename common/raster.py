@@ -0,0 +1,63 @@
+# Additive accumulation-buffer rasterizer for the fireworks scenes.
+#
+# Instead of clearing the screen and drawing every particle with pygame, all live particles are
+# scattered into a float RGB array in one vectorized step (np.bincount over flat pixel indices,
+# so overlapping particles add up and glow). Trails come for free: each frame the whole buffer is
+# multiplied by a decay factor rather than cleared. The result goes to the display through
+# pygame.surfarray, so the drawing cost depends on the pixel count, not on the particle count.
+import numpy as np
+import pygame
+
+
+def glow_taps(radius):
+    """(dx, dy, weight) for a soft dot: full weight in the middle, fading out past radius."""
+    taps = []
+    reach = int(np.ceil(radius)) + 1
+    for dx in range(-reach, reach + 1):
+        for dy in range(-reach, reach + 1):
+            weight = 1.0 - np.hypot(dx, dy) / (radius + 1)
+            if weight > 0:
+                taps.append((dx, dy, weight))
+    return taps
+
+
+class AccumulationBuffer:
+    def __init__(self, width, height, decay=0.85, radius=1):
+        self.width = width
+        self.height = height
+        self.decay = decay  # share of last frame's light that survives; 0 clears every frame
+        self.taps = glow_taps(radius)
+        # (x, y, rgb) to match pygame.surfarray; flat is the same memory as (pixel, rgb)
+        self.buffer = np.zeros((width, height, 3), dtype=np.float32)
+        self.flat = self.buffer.reshape(-1, 3)
+
+    def fade(self):
+        self.buffer *= self.decay
+
+    def splat(self, xs, ys, colors, alphas=None):
+        """Add one glowing dot per particle centred on (x, y); alphas (0..255) scale brightness."""
+        xs = np.asarray(xs).astype(np.int64)
+        ys = np.asarray(ys).astype(np.int64)
+        light = np.asarray(colors, dtype=np.float32).reshape(-1, 3)
+        if alphas is not None:
+            light = light * (np.asarray(alphas, dtype=np.float32) / 255)[:, None]
+
+        indices = []
+        values = []
+        for dx, dy, weight in self.taps:
+            px = xs + dx
+            py = ys + dy
+            inside = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+            indices.append(px[inside] * self.height + py[inside])
+            values.append(light[inside] * weight)
+        indices = np.concatenate(indices)
+        if len(indices) == 0:
+            return
+        values = np.concatenate(values)
+        pixels = self.width * self.height
+        for channel in range(3):
+            self.flat[:, channel] += np.bincount(indices, weights=values[:, channel], minlength=pixels)
+
+    def present(self, surface):
+        """Copy the buffer to a surface of the same size, saturating at white."""
+        pygame.surfarray.blit_array(surface, np.minimum(self.buffer, 255).astype(np.uint8))
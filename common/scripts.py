@@ -0,0 +1,29 @@
+# Load the model-written simulation scripts as modules, without opening any windows.
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_headless_backends():
+    """Point SDL and matplotlib at their off-screen backends. Call before importing pygame/pyplot."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+def load_script(relative_path, name=None):
+    """Import e.g. 'Claude/claudeCode.py' as a module. Its main loop must sit behind __main__."""
+    use_headless_backends()
+    path = os.path.join(ROOT, relative_path)
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,53 @@
+# Cache of small alpha-faded dot sprites for the fireworks scenes.
+#
+# Drawing a fading particle used to mean allocating a fresh SRCALPHA surface and drawing a circle
+# into it, every particle, every frame. The atlas renders each (colour, alpha level) once and
+# hands back the same surface afterwards; alphas are quantized to a fixed number of levels so
+# the cache stays small while the fade still looks continuous.
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+
+class SpriteAtlas:
+    def __init__(self, radius, levels=32, capacity=4096):
+        self.radius = radius
+        self.size = 2 * radius + 1  # same surface the scripts drew into, circle centred in it
+        self.levels = levels
+        self.capacity = capacity  # colours come and go with the fireworks, so bound the cache
+        self.sprites = OrderedDict()  # packed (colour, level) key -> Surface
+
+    def ensure(self, keys):
+        """Render any missing sprites for the given packed keys and mark them recently used."""
+        for key in keys:
+            if key in self.sprites:
+                self.sprites.move_to_end(key)
+                continue
+            color = ((key >> 24) & 255, (key >> 16) & 255, (key >> 8) & 255)
+            alpha = round((key & 255) * 255 / (self.levels - 1))
+            sprite = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*color, alpha), (self.radius, self.radius), self.radius)
+            self.sprites[key] = sprite
+        while len(self.sprites) > max(self.capacity, len(keys)):
+            self.sprites.popitem(last=False)
+
+    def blits(self, surface, xs, ys, colors, alphas, offset=None):
+        """Draw one dot per particle with a single Surface.blits call.
+
+        xs, ys are integer pixel positions, colors an (n, 3) RGB array and alphas 0..255.
+        offset is added to each position to get the sprite's top-left corner; the default
+        centres the sprite on (x, y). Dots that quantize to alpha 0 are skipped.
+        """
+        if offset is None:
+            offset = -self.radius
+        colors = np.asarray(colors, dtype=np.int64).reshape(-1, 3)
+        levels = np.rint(np.asarray(alphas) * ((self.levels - 1) / 255)).astype(np.int64)
+        keys = ((colors[:, 0] << 16 | colors[:, 1] << 8 | colors[:, 2]) << 8) | levels
+        visible = levels > 0
+        keys = keys[visible]
+        # Cache work is per distinct sprite, not per particle
+        self.ensure(np.unique(keys).tolist())
+        sprites = map(self.sprites.__getitem__, keys.tolist())
+        corners = zip((np.asarray(xs)[visible] + offset).tolist(), (np.asarray(ys)[visible] + offset).tolist())
+        surface.blits(list(zip(sprites, corners)), False)
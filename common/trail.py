@@ -0,0 +1,58 @@
+# Fixed-capacity trail storage for the pendulum visualizations.
+#
+# Points live in preallocated NumPy ring buffers, so appending never allocates and a frame's
+# cost doesn't grow with how long the program has been running. With levels > 1, points that
+# fall off the end of one ring are decimated by `factor` into the next, so the trail keeps
+# reaching back in time at progressively coarser resolution.
+import numpy as np
+
+
+class TrailBuffer:
+    def __init__(self, capacity=100, levels=1, factor=4):
+        self.capacity = capacity
+        self.levels = levels
+        self.factor = factor
+        self.data = np.empty((levels, capacity, 2))
+        self.start = [0] * levels
+        self.count = [0] * levels
+        self.evicted = [0] * levels
+        self.out = np.empty((levels * capacity, 2))
+
+    def __len__(self):
+        return sum(self.count)
+
+    def clear(self):
+        self.start = [0] * self.levels
+        self.count = [0] * self.levels
+        self.evicted = [0] * self.levels
+
+    def append(self, x, y):
+        level = 0
+        while True:
+            ring = self.data[level]
+            if self.count[level] < self.capacity:
+                ring[(self.start[level] + self.count[level]) % self.capacity] = (x, y)
+                self.count[level] += 1
+                return
+            # Full: overwrite the oldest point and hand every factor-th one down a level
+            i = self.start[level]
+            old_x, old_y = ring[i]
+            ring[i] = (x, y)
+            self.start[level] = (i + 1) % self.capacity
+            self.evicted[level] += 1
+            if level + 1 == self.levels or self.evicted[level] % self.factor:
+                return
+            level += 1
+            x, y = old_x, old_y
+
+    def points(self):
+        """(n, 2) array of the trail from oldest to newest. A view, valid until the next call."""
+        n = 0
+        for level in reversed(range(self.levels)):
+            count, start = self.count[level], self.start[level]
+            ring = self.data[level]
+            first = min(count, self.capacity - start)
+            self.out[n:n + first] = ring[start:start + first]
+            self.out[n + first:n + count] = ring[:count - first]
+            n += count
+        return self.out[:n]
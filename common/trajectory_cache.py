@@ -0,0 +1,135 @@
+# Trajectory store for the pendulum scripts.
+#
+# Solutions are keyed by the quantized initial conditions and physical constants, plus the
+# solver settings that produced them. The most recent ones stay in a bounded in-memory LRU; older
+# ones are spilled to .npy files and loaded back as read-only memory maps, so revisiting a setting
+# never needs another solve. The disk tier is LRU too: a file is touched whenever it is read
+# back. get/put/flush may be called from different threads (deepseekCode.py fills the cache from
+# its integration worker), and several processes may share the directory.
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "double_pendulum")
+
+
+class TrajectoryCache:
+    def __init__(self, namespace, capacity=32, directory=DEFAULT_DIRECTORY, disk_capacity=2048,
+                 resolution=1e-6):
+        # namespace keeps scripts with different equations/state layouts apart
+        self.namespace = namespace
+        self.capacity = capacity
+        self.directory = directory
+        self.disk_capacity = disk_capacity
+        self.resolution = resolution
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, y0, solver=None, **constants):
+        """Quantize the initial state and constants (g, L1, L2, m1, m2, t_max, dt, ...) into a key.
+
+        solver holds the integrator settings (method, rtol, atol); those are kept exactly, since a
+        method name can't be quantized and tolerances are far below the resolution.
+        """
+        values = [int(round(float(v) / self.resolution)) for v in y0]
+        values += [(name, int(round(float(constants[name]) / self.resolution)))
+                   for name in sorted(constants)]
+        settings = sorted((name, repr(value)) for name, value in (solver or {}).items())
+        return hashlib.sha1(repr((self.namespace, values, settings)).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{self.namespace}-{key}.npy")
+
+    def get(self, key):
+        """Return the cached sol.y array for key, or None."""
+        with self.lock:
+            return self._get(key)
+
+    def _get(self, key):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return self.memory[key]
+        if self.directory is not None and os.path.exists(self.path(key)):
+            try:
+                y = np.load(self.path(key), mmap_mode='r')
+            except (OSError, ValueError):
+                # Truncated or corrupt file: treat as a miss and let it be rewritten
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(self.path(key))
+            self._remember(key, y)
+            return y
+        self.misses += 1
+        return None
+
+    def put(self, key, y):
+        with self.lock:
+            self._remember(key, np.asarray(y))
+
+    def flush(self):
+        """Write every in-memory trajectory to disk so the next session can reuse it."""
+        with self.lock:
+            for key, y in list(self.memory.items()):
+                self._spill(key, y)
+
+    def _remember(self, key, y):
+        self.memory[key] = y
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            old_key, old_y = self.memory.popitem(last=False)
+            self._spill(old_key, old_y)
+
+    def _spill(self, key, y):
+        if self.directory is None or isinstance(y, np.memmap):
+            return  # nowhere to spill, or already backed by its file
+        path = self.path(key)
+        if os.path.exists(path) and self._same_as_file(path, y):
+            return  # e.g. checkpoints read back and not extended since
+        # A unique temporary name, so two processes spilling the same key don't write into one
+        # file; whichever replace lands last wins, and both wrote the same trajectory
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=os.path.basename(path) + ".",
+                                   suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, y)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self._trim_disk()
+
+    def _same_as_file(self, path, y):
+        try:
+            stored = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return False  # unreadable: overwrite it
+        return stored.shape == y.shape and stored.dtype == y.dtype and np.array_equal(stored, y)
+
+    def _touch(self, path):
+        # Eviction goes by mtime, so a read counts as a use
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _trim_disk(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.startswith(self.namespace + "-") and name.endswith(".npy")]
+        if len(files) <= self.disk_capacity:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.disk_capacity]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,65 @@
+# Chaos fan: thousands of nearly identical double pendulums integrated together in one batched
+# NumPy step, to show how quickly tiny differences in the initial conditions blow up.
+#
+# Usage: python tools/chaos_fan.py --count 10000 --spread 1e-3
+import argparse
+import os
+import sys
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from matplotlib.collections import LineCollection
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import pendulum  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Animate an ensemble of double pendulums.")
+    parser.add_argument("--count", type=int, default=10000, help="number of pendulums")
+    parser.add_argument("--theta1", type=float, default=np.pi / 2, help="initial theta1 (rad)")
+    parser.add_argument("--theta2", type=float, default=np.pi / 2, help="initial theta2 (rad)")
+    parser.add_argument("--spread", type=float, default=1e-3, help="total spread of theta2 (rad)")
+    parser.add_argument("--fps", type=int, default=30, help="animation frames per second")
+    parser.add_argument("--substeps", type=int, default=4, help="RK4 steps per frame")
+    args = parser.parse_args()
+
+    states = pendulum.fan(args.theta1, args.theta2, args.count, args.spread)
+    dt = 1.0 / (args.fps * args.substeps)
+
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.set_xlim(-2.5, 2.5)
+    ax.set_ylim(-2.5, 2.5)
+    ax.set_aspect('equal')
+    ax.set_facecolor('black')
+
+    # One LineCollection for every rod in the fan, coloured by position in the fan
+    colors = plt.cm.plasma(np.linspace(0, 1, args.count))
+    colors[:, 3] = min(1.0, 20.0 / np.sqrt(args.count))
+    segments = np.zeros((args.count, 3, 2))
+    rods = LineCollection(segments, colors=colors, linewidths=0.5)
+    ax.add_collection(rods)
+    time_text = ax.text(0.02, 0.95, '', transform=ax.transAxes, color='white')
+
+    def update(frame):
+        nonlocal states
+        for _ in range(args.substeps):
+            states = pendulum.rk4_step(states, dt)
+        x1, y1, x2, y2 = pendulum.positions(states)
+        segments[:, 1, 0] = x1
+        segments[:, 1, 1] = y1
+        segments[:, 2, 0] = x2
+        segments[:, 2, 1] = y2
+        rods.set_segments(segments)
+        time_text.set_text(f"t = {(frame + 1) / args.fps:.1f} s   N = {args.count}")
+        return rods, time_text
+
+    # Keep a reference so the animation isn't garbage collected
+    ani = FuncAnimation(fig, update, interval=1000 / args.fps, blit=True, cache_frame_data=False)
+    plt.show()
+    return ani
+
+
+if __name__ == "__main__":
+    main()
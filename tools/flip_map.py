@@ -0,0 +1,201 @@
+# Flip-time fractal: sweep a grid of (theta1, theta2) starts, record when each double pendulum
+# first flips over (or its finite-time Lyapunov exponent) and write the result as an image array.
+#
+# The grid is split into square tiles that a process pool integrates in batches and writes
+# straight into a shared memory-mapped .npy file. A second small .npy marks finished tiles, so
+# re-running the same command after an interruption only computes what is missing. The settings
+# are kept in <out>.meta.json, and resuming with different ones is refused.
+#
+# Usage: python tools/flip_map.py --size 1024 --out flipmap.npy --png flipmap.png
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import pendulum  # noqa: E402
+
+# Opened once per worker process by init_worker
+_image = None
+_done = None
+_config = None
+
+
+def tile_grid(size, tile):
+    """All (row, col) tile indices for a size x size image."""
+    n = (size + tile - 1) // tile
+    return [(r, c) for r in range(n) for c in range(n)]
+
+
+def start_angles(config, r, c):
+    size, tile = config['size'], config['tile']
+    rows = np.arange(r * tile, min((r + 1) * tile, size))
+    cols = np.arange(c * tile, min((c + 1) * tile, size))
+    angles = np.linspace(-np.pi, np.pi, size)
+    theta2, theta1 = np.meshgrid(angles[rows], angles[cols], indexing='ij')
+    return theta1, theta2, rows, cols
+
+
+def flip_times(theta1, theta2, config):
+    """Time of the first flip for every start (NaN if none before t_max)."""
+    params = config['params']
+    g, L1, L2, m1, m2 = params
+    states = np.zeros((theta1.size, 4))
+    states[:, 0] = theta1.ravel()
+    states[:, 1] = theta2.ravel()
+    result = np.full(theta1.size, np.nan, dtype=np.float32)
+
+    # Starts without enough energy to lift either bob over the top can never flip
+    energy = pendulum.energy(states, *params)
+    flip_energy = min((m1 + m2) * g * L1 - m2 * g * L2, m2 * g * L2 - (m1 + m2) * g * L1)
+    active = np.flatnonzero(energy >= flip_energy)
+    states = states[active]
+
+    dt = config['dt']
+    steps = int(round(config['t_max'] / dt))
+    for step in range(1, steps + 1):
+        if active.size == 0:
+            break
+        states = pendulum.rk4_step(states, dt, *params)
+        flipped = (np.abs(states[:, 0]) > np.pi) | (np.abs(states[:, 1]) > np.pi)
+        if flipped.any():
+            result[active[flipped]] = step * dt
+            keep = ~flipped
+            active = active[keep]
+            states = states[keep]
+    return result.reshape(theta1.shape)
+
+
+def lyapunov_exponents(theta1, theta2, config):
+    """Finite-time Lyapunov exponent from a renormalized twin trajectory."""
+    params = config['params']
+    d0 = 1e-8
+    states = np.zeros((theta1.size, 4))
+    states[:, 0] = theta1.ravel()
+    states[:, 1] = theta2.ravel()
+    twins = states.copy()
+    twins[:, 0] += d0
+    log_growth = np.zeros(theta1.size)
+
+    dt = config['dt']
+    steps = int(round(config['t_max'] / dt))
+    renorm_every = 10
+    for step in range(1, steps + 1):
+        states = pendulum.rk4_step(states, dt, *params)
+        twins = pendulum.rk4_step(twins, dt, *params)
+        if step % renorm_every == 0 or step == steps:
+            diff = twins - states
+            dist = np.maximum(np.sqrt(np.sum(diff * diff, axis=1)), 1e-300)
+            log_growth += np.log(dist / d0)
+            twins = states + diff * (d0 / dist)[:, None]
+    return (log_growth / (steps * dt)).astype(np.float32).reshape(theta1.shape)
+
+
+def init_worker(out, done_path, config):
+    global _image, _done, _config
+    _image = np.load(out, mmap_mode='r+')
+    _done = np.load(done_path, mmap_mode='r+')
+    _config = config
+
+
+def compute_tile(tile_index):
+    r, c = tile_index
+    theta1, theta2, rows, cols = start_angles(_config, r, c)
+    if _config['metric'] == 'flip':
+        values = flip_times(theta1, theta2, _config)
+    else:
+        values = lyapunov_exponents(theta1, theta2, _config)
+    _image[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1] = values
+    _image.flush()
+    # Only mark the tile finished once its pixels are on disk
+    _done[r, c] = True
+    _done.flush()
+    return tile_index
+
+
+def open_outputs(out, config):
+    """Create the image and tile-done arrays, or reopen them to resume a previous run.
+
+    The run settings go next to them in <out>.meta.json; a resume with different settings is
+    refused, since its tiles would not match the ones already on disk.
+    """
+    stem = os.path.splitext(out)[0]
+    done_path = stem + ".done.npy"
+    meta_path = stem + ".meta.json"
+    size, tile = config['size'], config['tile']
+    n = (size + tile - 1) // tile
+    # Round-trip through JSON so tuples compare equal to the lists read back
+    settings = json.loads(json.dumps(config))
+    if os.path.exists(out) and os.path.exists(done_path):
+        saved = None
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                saved = json.load(f)
+        if saved != settings:
+            changed = sorted(k for k in settings if saved is None or saved.get(k) != settings[k])
+            sys.exit(f"{out} was started with different settings ({', '.join(changed)}); "
+                     f"remove it or pick another --out to start over")
+        return done_path, np.array(np.load(done_path, mmap_mode='r'))
+    with open(meta_path, 'w') as f:
+        json.dump(settings, f, indent=1)
+    image = np.lib.format.open_memmap(out, mode='w+', dtype=np.float32, shape=(size, size))
+    image[:] = np.nan
+    image.flush()
+    done = np.lib.format.open_memmap(done_path, mode='w+', dtype=np.bool_, shape=(n, n))
+    done.flush()
+    return done_path, np.zeros((n, n), dtype=bool)
+
+
+def save_png(out, png, metric):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    image = np.load(out, mmap_mode='r')
+    cmap = plt.get_cmap('magma' if metric == 'flip' else 'viridis').copy()
+    cmap.set_bad('black')
+    data = np.log10(image) if metric == 'flip' else np.asarray(image)
+    plt.imsave(png, np.ma.masked_invalid(data), cmap=cmap, origin='lower')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Double pendulum flip-time / Lyapunov map.")
+    parser.add_argument("--size", type=int, default=1024, help="image width and height in pixels")
+    parser.add_argument("--tile", type=int, default=64, help="tile width and height in pixels")
+    parser.add_argument("--metric", choices=['flip', 'lyapunov'], default='flip')
+    parser.add_argument("--t-max", type=float, default=30.0, help="simulated seconds per start")
+    parser.add_argument("--dt", type=float, default=0.01, help="RK4 step (s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--out", default="flipmap.npy", help="output .npy image array")
+    parser.add_argument("--png", default=None, help="also save a colour-mapped PNG here")
+    args = parser.parse_args()
+
+    config = {
+        'size': args.size, 'tile': args.tile, 'metric': args.metric,
+        't_max': args.t_max, 'dt': args.dt,
+        'params': (pendulum.G, pendulum.L1, pendulum.L2, pendulum.M1, pendulum.M2),
+    }
+    done_path, done = open_outputs(args.out, config)
+    pending = [t for t in tile_grid(args.size, args.tile) if not done[t]]
+    total = done.size
+    print(f"{total - len(pending)}/{total} tiles already done, {len(pending)} to go "
+          f"on {args.workers} workers")
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers, initializer=init_worker,
+                              initargs=(args.out, done_path, config)) as pool:
+        for count, _ in enumerate(pool.imap_unordered(compute_tile, pending), 1):
+            print(f"\r{count}/{len(pending)} tiles, {time.perf_counter() - start:.1f} s",
+                  end='', flush=True)
+    print()
+
+    if args.png:
+        save_png(args.out, args.png, args.metric)
+        print(f"Saved {args.png}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,529 @@
+# Render any of the nine simulations (or a 60-link version of the Claude pendulum) to PNG frames
+# or a video file, without a display.
+#
+# The simulation runs in this process, deterministically (seeded, a fixed number of physics
+# ticks per output frame), and hands each frame's state (a few small arrays) to a pool of worker
+# processes. Workers draw it off-screen (pygame surfaces on the SDL dummy driver for the pygame
+# scenes, matplotlib's Agg canvas for the matplotlib ones) at the requested resolution and
+# encode it. Finished frames are written to disk in order as they come back, with a bounded
+# number in flight, so memory stays flat however long the capture is.
+#
+# Interactive parts (sliders, key bindings, the Tk dialog) are left out; chatgpt-pendulum starts
+# from theta1 = theta2 = 90 degrees. The fireworks are drawn as plain faded dots rather than with
+# the accumulation-buffer trails, since a trail frame depends on every frame before it.
+#
+# Usage: python tools/render_offline.py claude-fireworks --seconds 600 --size 1920x1080 --out fw.mp4
+#        python tools/render_offline.py deepseek-balls --seconds 10 --out frames/
+import argparse
+import collections
+import io
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.scripts import load_script, use_headless_backends  # noqa: E402
+
+use_headless_backends()
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from common.playback import DensePlayback  # noqa: E402
+from common.sprite_atlas import SpriteAtlas  # noqa: E402
+from common.trail import TrailBuffer  # noqa: E402
+
+VIDEO_SUFFIXES = ('.mp4', '.mkv', '.mov', '.webm', '.avi')
+
+
+# Scenes: the simulation side. Each one has a tick rate, step() for one tick, state() for what
+# the painter needs this frame, and style (picklable, sent to each worker once).
+
+class ClaudePendulum:
+    painter = 'pygame-pendulum'
+
+    links = 0
+
+    def __init__(self, seed):
+        self.m = load_script('Claude/claudeCode.py')
+        self.m.CHAIN_LINKS = self.links
+        self.pendulum = self.m.new_pendulum()
+        self.rate = self.m.PHYSICS_RATE
+        self.style = {'native': (self.m.WIDTH, self.m.HEIGHT), 'bob': 10 if self.links <= 2 else 2}
+
+    def step(self):
+        self.pendulum.update(1 / self.rate)
+
+    def state(self):
+        center = np.array([self.m.WIDTH // 2, self.m.HEIGHT // 2])
+        return {'center': center, 'bobs': np.array(self.pendulum.positions(), dtype=float) + center,
+                'trail': self.pendulum.trail.points().copy()}
+
+
+class ClaudeChain(ClaudePendulum):
+    links = 60
+
+
+class PygameBalls:
+    painter = 'pygame-balls'
+    script = None
+
+    def __init__(self, seed):
+        self.m = load_script(self.script)
+        random.seed(seed)
+        self.world = self.m.create_world()
+        if isinstance(self.world, tuple):  # claudeCode2 also returns its Ball views
+            self.world = self.world[0]
+        self.rate = self.m.PHYSICS_RATE
+        self.style = {'native': (self.m.WIDTH, self.m.HEIGHT), 'radius': self.world.radius.copy(),
+                      'color': np.asarray(self.world.color).copy()}
+
+    def step(self):
+        self.world.step()
+
+    def state(self):
+        return {'x': self.world.x.copy(), 'y': self.world.y.copy()}
+
+
+class ClaudeBalls(PygameBalls):
+    script = 'Claude/claudeCode2.py'
+
+
+class ChatGPTBalls(PygameBalls):
+    script = 'ChatGPT/chatgptCode2.py'
+
+
+class Fireworks:
+    painter = 'pygame-fireworks'
+
+    def rockets(self, fireworks):
+        flying = [f for f in fireworks if not f.exploded]
+        return {'rockets': np.array([(f.x, f.y) for f in flying]).reshape(-1, 2),
+                'rocket_colors': np.array([f.color[:3] for f in flying]).reshape(-1, 3)}
+
+    def particle_state(self, particles):
+        live = particles.live()
+        return {'x': particles.x[live], 'y': particles.y[live], 'color': particles.color[live],
+                'alpha': particles.alpha(live)}
+
+
+class ClaudeFireworks(Fireworks):
+    def __init__(self, seed):
+        self.m = load_script('Claude/claudeCode3.py')
+        self.show = self.m.FireworkShow(seed=seed)
+        self.rate = self.m.PHYSICS_RATE
+        self.style = {'native': (self.m.WIDTH, self.m.HEIGHT), 'dot': 1, 'centred': True,
+                      'rocket': 2, 'fade': True}
+
+    def step(self):
+        self.show.step()
+
+    def state(self):
+        return {**self.rockets(self.show.fireworks), **self.particle_state(self.show.particles)}
+
+
+class ModuleFireworks(Fireworks):
+    # chatgptCode3 / deepseekCode3 keep their show in module globals and step it with simulate()
+    script = None
+
+    def __init__(self, seed):
+        self.m = load_script(self.script)
+        random.seed(seed)
+        if hasattr(self.m, 'explosions'):
+            self.m.explosions = self.m.ExplosionTemplates(seed=seed)
+        self.rate = self.m.PHYSICS_RATE
+
+    def step(self):
+        self.m.simulate()
+
+    def state(self):
+        return {**self.rockets(self.m.fireworks), **self.particle_state(self.m.particles)}
+
+
+class ChatGPTFireworks(ModuleFireworks):
+    script = 'ChatGPT/chatgptCode3.py'
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        # 5x5 dot with its top-left corner on the particle
+        self.style = {'native': (self.m.WIDTH, self.m.HEIGHT), 'dot': 2, 'centred': False,
+                      'rocket': 3, 'fade': True}
+
+
+class DeepSeekFireworks(ModuleFireworks):
+    script = 'DeepSeek/deepseekCode3.py'
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        # pygame.draw.circle ignores the alpha on a plain display surface, so no fading here
+        self.style = {'native': (self.m.WIDTH, self.m.HEIGHT), 'dot': 2, 'centred': True,
+                      'rocket': 3, 'fade': False}
+
+
+class DeepSeekPendulum:
+    painter = 'mpl-pendulum'
+    rate = 50
+
+    def __init__(self, seed):
+        m = self.m = load_script('DeepSeek/deepseekCode.py')
+        y0 = [m.theta1_0, m.theta2_0, m.omega1_0, m.omega2_0]
+        self.playback = DensePlayback(m.rhs, y0, segment=m.SEGMENT, **m.solver_options)
+        self.t = 0.0
+        # The script also draws the whole path of the second bob over t_max
+        theta = np.array([self.playback.state_at(t)[:2] for t in m.t_eval]).T
+        _, _, path_x, path_y = self.arms(theta[0], theta[1])
+        self.style = {'limit': 2.5, 'figsize': (8, 8), 'arm': 'k-', 'path': (path_x, path_y),
+                      'trace': None, 'clock': False}
+
+    def arms(self, theta1, theta2):
+        x1 = self.m.L1 * np.sin(theta1)
+        y1 = -self.m.L1 * np.cos(theta1)
+        return x1, y1, x1 + self.m.L2 * np.sin(theta2), y1 - self.m.L2 * np.cos(theta2)
+
+    def step(self):
+        self.t += 1 / self.rate
+
+    def state(self):
+        theta1, theta2 = self.playback.state_at(self.t)[:2]
+        return {'arms': np.array(self.arms(theta1, theta2)), 't': self.t}
+
+
+class ChatGPTPendulum(DeepSeekPendulum):
+    rate = 50  # the script's animation interval is 20 ms, one trail point per frame
+
+    def __init__(self, seed):
+        m = self.m = load_script('ChatGPT/chatgptCode.py')
+        # In place of the Tk dialog: theta1 = theta2 = 90 degrees, at rest
+        y0 = [np.pi / 2, 0, np.pi / 2, 0]
+        self.playback = DensePlayback(m.rhs, y0, segment=m.SEGMENT, **m.solver_options)
+        self.trail = TrailBuffer(m.TRAIL_LENGTH, levels=m.TRAIL_LEVELS)
+        self.t = 0.0
+        self.style = {'limit': 2.0, 'figsize': (6.4, 4.8), 'arm': 'o-', 'path': None,
+                      'trace': 'r-', 'clock': True}
+        self.step_trail()
+
+    def step(self):
+        self.t += 1 / self.rate
+        self.step_trail()
+
+    def step_trail(self):
+        _, _, x2, y2 = self.arms(*self.angles())
+        self.trail.append(x2, y2)
+
+    def angles(self):
+        theta1, _, theta2, _ = self.playback.state_at(self.t)
+        return theta1, theta2
+
+    def state(self):
+        return {'arms': np.array(self.arms(*self.angles())), 't': self.t,
+                'trace': self.trail.points().copy()}
+
+
+class DeepSeekBalls:
+    painter = 'mpl-balls'
+
+    def __init__(self, seed):
+        m = load_script('DeepSeek/deepseekCode2.py')
+        np.random.seed(seed)
+        self.world = m.create_world()
+        self.rate = 1 / m.DT  # the animation runs one DT step per DT of wall time
+        self.style = {'box': (m.WIDTH, m.HEIGHT), 'radius': m.RADIUS}
+
+    def step(self):
+        self.world.step()
+
+    def state(self):
+        return {'x': np.array(self.world.x), 'y': np.array(self.world.y)}
+
+
+SCENES = {
+    'claude-pendulum': ClaudePendulum,
+    'claude-chain': ClaudeChain,
+    'claude-balls': ClaudeBalls,
+    'claude-fireworks': ClaudeFireworks,
+    'chatgpt-pendulum': ChatGPTPendulum,
+    'chatgpt-balls': ChatGPTBalls,
+    'chatgpt-fireworks': ChatGPTFireworks,
+    'deepseek-pendulum': DeepSeekPendulum,
+    'deepseek-balls': DeepSeekBalls,
+    'deepseek-fireworks': DeepSeekFireworks,
+}
+
+
+def scene_states(scene, frames, fps):
+    """State for each output frame; frame i shows the simulation after floor(i * rate / fps) ticks."""
+    ticks = 0
+    for i in range(frames):
+        due = math.floor(i * scene.rate / fps + 1e-9)
+        while ticks < due:
+            scene.step()
+            ticks += 1
+        yield scene.state()
+
+
+# Painters: the worker side. One canvas per worker process, set up by init_worker.
+
+_painter = None
+
+
+class PygameCanvas:
+    def __init__(self, size, style):
+        self.surface = pygame.Surface(size)
+        native_w, native_h = style['native']
+        # Fit the script's window into the frame, centred
+        self.scale = min(size[0] / native_w, size[1] / native_h)
+        self.origin = np.array([(size[0] - native_w * self.scale) / 2,
+                                (size[1] - native_h * self.scale) / 2])
+        self.style = style
+
+    def to_pixels(self, points):
+        return (np.asarray(points, dtype=float) * self.scale + self.origin).astype(int)
+
+    def length(self, value):
+        return max(1, int(round(value * self.scale)))
+
+    def frame(self):
+        return self.surface
+
+
+class PendulumPainter(PygameCanvas):
+    def paint(self, state):
+        surface = self.surface
+        surface.fill((0, 0, 0))
+        if len(state['trail']) > 1:
+            pygame.draw.lines(surface, (0, 0, 255), False, self.to_pixels(state['trail']).tolist(),
+                              self.length(1))
+        joints = self.to_pixels(np.vstack([state['center'], state['bobs']])).tolist()
+        for start, end in zip(joints, joints[1:]):
+            pygame.draw.line(surface, (255, 255, 255), start, end, self.length(2))
+        for joint in joints[1:]:
+            pygame.draw.circle(surface, (255, 0, 0), joint, self.length(self.style['bob']))
+
+
+class BallPainter(PygameCanvas):
+    def __init__(self, size, style):
+        super().__init__(size, style)
+        colors = [tuple(int(c) for c in color) for color in style['color']]
+        radii = [self.length(r) for r in np.asarray(style['radius']).astype(int)]
+        self.balls = list(zip(colors, radii))
+
+    def paint(self, state):
+        self.surface.fill((0, 0, 0))
+        centers = self.to_pixels(np.column_stack([state['x'].astype(int), state['y'].astype(int)]))
+        for (color, radius), center in zip(self.balls, centers.tolist()):
+            pygame.draw.circle(self.surface, color, center, radius)
+
+
+class FireworkPainter(PygameCanvas):
+    def __init__(self, size, style):
+        super().__init__(size, style)
+        self.dots = SpriteAtlas(radius=self.length(style['dot']))
+        self.dot_offset = None if style['centred'] else 0
+
+    def paint(self, state):
+        surface = self.surface
+        surface.fill((0, 0, 0))
+        for (x, y), color in zip(self.to_pixels(state['rockets']).tolist(), state['rocket_colors'].tolist()):
+            pygame.draw.circle(surface, color, (x, y), self.length(self.style['rocket']))
+        points = self.to_pixels(np.column_stack([state['x'].astype(int), state['y'].astype(int)]))
+        alpha = state['alpha'] if self.style['fade'] else np.full(len(points), 255)
+        self.dots.blits(surface, points[:, 0], points[:, 1], state['color'], alpha,
+                        offset=self.dot_offset)
+
+
+class MatplotlibCanvas:
+    def __init__(self, size, style):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        self.size = size
+        self.figure = Figure(figsize=(size[0] / 100, size[1] / 100), dpi=100)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.style = style
+
+    def frame(self):
+        self.canvas.draw()
+        rgb = np.ascontiguousarray(np.asarray(self.canvas.buffer_rgba())[:, :, :3])
+        return pygame.image.frombuffer(rgb.tobytes(), self.size, 'RGB')
+
+
+class MatplotlibPendulumPainter(MatplotlibCanvas):
+    def __init__(self, size, style):
+        super().__init__(size, style)
+        ax = self.ax
+        ax.set_xlim(-style['limit'], style['limit'])
+        ax.set_ylim(-style['limit'], style['limit'])
+        ax.set_aspect('equal')
+        ax.grid()
+        if style['arm'] == 'o-':
+            self.line, = ax.plot([], [], 'o-', lw=2)
+        else:
+            self.arm1, = ax.plot([], [], style['arm'], lw=2)
+            self.arm2, = ax.plot([], [], style['arm'], lw=2)
+        if style['path'] is not None:
+            ax.plot(*style['path'], 'r-', lw=1)
+        self.trace = ax.plot([], [], style['trace'], alpha=0.5)[0] if style['trace'] else None
+        self.clock = ax.text(0.02, 0.95, '', transform=ax.transAxes) if style['clock'] else None
+
+    def paint(self, state):
+        x1, y1, x2, y2 = state['arms']
+        if self.style['arm'] == 'o-':
+            self.line.set_data([0, x1, x2], [0, y1, y2])
+        else:
+            self.arm1.set_data([0, x1], [0, y1])
+            self.arm2.set_data([x1, x2], [y1, y2])
+        if self.trace:
+            self.trace.set_data(state['trace'][:, 0], state['trace'][:, 1])
+        if self.clock:
+            self.clock.set_text(f"t = {state['t']:.1f} s")
+
+
+class MatplotlibBallPainter(MatplotlibCanvas):
+    def __init__(self, size, style):
+        super().__init__(size, style)
+        from matplotlib.collections import EllipseCollection
+        width, height = style['box']
+        self.ax.set_xlim(0, width)
+        self.ax.set_ylim(0, height)
+        self.ax.set_aspect('equal')
+        diameter = 2 * style['radius']
+        self.circles = EllipseCollection(diameter, diameter, 0, units='xy', facecolors='b',
+                                         offsets=np.zeros((0, 2)), offset_transform=self.ax.transData)
+        self.ax.add_collection(self.circles)
+
+    def paint(self, state):
+        self.circles.set_offsets(np.column_stack([state['x'], state['y']]))
+
+
+PAINTERS = {
+    'pygame-pendulum': PendulumPainter,
+    'pygame-balls': BallPainter,
+    'pygame-fireworks': FireworkPainter,
+    'mpl-pendulum': MatplotlibPendulumPainter,
+    'mpl-balls': MatplotlibBallPainter,
+}
+
+
+def init_worker(painter, size, style, encoding):
+    global _painter
+    _painter = (PAINTERS[painter](size, style), encoding)
+
+
+def render_frame(state):
+    """Paint one state and return it encoded: PNG file bytes or raw RGB for ffmpeg."""
+    painter, encoding = _painter
+    painter.paint(state)
+    surface = painter.frame()
+    if encoding == 'png':
+        buffer = io.BytesIO()
+        pygame.image.save(surface, buffer, 'frame.png')
+        return buffer.getvalue()
+    return pygame.image.tobytes(surface, 'RGB')
+
+
+# Output: frames arrive in order and go straight to disk.
+
+class PngWriter:
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.count = 0
+
+    def write(self, data):
+        with open(os.path.join(self.directory, f'frame_{self.count:06d}.png'), 'wb') as f:
+            f.write(data)
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class VideoWriter:
+    def __init__(self, path, size, fps):
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            sys.exit("ffmpeg not found on PATH; install it or give --out a directory for PNG frames")
+        self.process = subprocess.Popen(
+            [ffmpeg, '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{size[0]}x{size[1]}', '-r', str(fps), '-i', '-',
+             '-pix_fmt', 'yuv420p', path], stdin=subprocess.PIPE)
+
+    def write(self, data):
+        self.process.stdin.write(data)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def render(scene, frames, fps, size, out, workers):
+    video = out.lower().endswith(VIDEO_SUFFIXES)
+    writer = VideoWriter(out, size, fps) if video else PngWriter(out)
+    setup = (scene.painter, size, scene.style, 'raw' if video else 'png')
+    states = scene_states(scene, frames, fps)
+    start = time.perf_counter()
+
+    def report(count):
+        if count % 100 == 0 or count == frames:
+            elapsed = time.perf_counter() - start
+            print(f"\r{count}/{frames} frames, {count / elapsed:.1f} fps, "
+                  f"{count / fps / elapsed:.2f}x real time", end='', flush=True)
+
+    if workers == 0:
+        init_worker(*setup)
+        for count, state in enumerate(states, 1):
+            writer.write(render_frame(state))
+            report(count)
+    else:
+        # Spawned, not forked: some scripts call pygame.init() on import, and a forked copy of an
+        # initialised SDL can hang
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(workers, initializer=init_worker, initargs=setup) as pool:
+            # Keep a few frames per worker in flight and write the oldest as soon as it is done
+            pending = collections.deque()
+            written = 0
+            for state in states:
+                pending.append(pool.apply_async(render_frame, (state,)))
+                if len(pending) >= 4 * workers:
+                    writer.write(pending.popleft().get())
+                    written += 1
+                    report(written)
+            while pending:
+                writer.write(pending.popleft().get())
+                written += 1
+                report(written)
+    writer.close()
+    print()
+
+
+def parse_size(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a simulation to PNG frames or video, headless.")
+    parser.add_argument("scene", choices=sorted(SCENES))
+    parser.add_argument("--out", required=True,
+                        help=f"directory for numbered PNGs, or a video file ({', '.join(VIDEO_SUFFIXES)}; needs ffmpeg)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="simulated seconds to capture")
+    parser.add_argument("--fps", type=int, default=60, help="output frame rate")
+    parser.add_argument("--size", type=parse_size, default=(1920, 1080), help="frame size, WIDTHxHEIGHT")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, so runs can be repeated")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="rendering processes (0 renders in this process)")
+    args = parser.parse_args()
+
+    scene = SCENES[args.scene](args.seed)
+    frames = int(round(args.seconds * args.fps))
+    print(f"{args.scene}: {frames} frames at {args.size[0]}x{args.size[1]} on {args.workers} workers")
+    render(scene, frames, args.fps, args.size, args.out, args.workers)
+
+
+if __name__ == "__main__":
+    main()
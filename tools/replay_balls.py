@@ -0,0 +1,165 @@
+# Scrub through a recorded bouncing-ball run (see common/ball_recording.py) without re-simulating.
+#
+# Frames are read straight from the memory-mapped recording, so jumping anywhere in a long
+# 10k-ball run costs one slice. Drag the slider to seek; keys while the window has focus:
+#   space        pause / resume
+#   left/right   play backwards / forwards (pressed while paused: step one frame)
+#   up/down      double / halve the playback speed
+#
+# Usage: python tools/replay_balls.py run.balls [--fps 60] [--start 0]
+#        python tools/replay_balls.py --check   (checks the playback position logic, no recording needed)
+import argparse
+import os
+import sys
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from matplotlib.collections import EllipseCollection
+from matplotlib.widgets import Slider
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.ball_recording import BallReplay  # noqa: E402
+
+
+class Playback:
+    """Playback position. It is a float so slow speeds still advance; the slider shows int(frame)."""
+
+    def __init__(self, frames, start=0):
+        self.last = frames - 1
+        self.frame = float(start)
+        self.speed = 1.0
+        self.paused = False
+
+    def index(self):
+        return int(self.frame)
+
+    def tick(self):
+        if not self.paused:
+            self.frame = float(np.clip(self.frame + self.speed, 0, self.last))
+
+    def step(self, direction):
+        self.frame = float(np.clip(self.index() + direction, 0, self.last))
+
+    def seek(self, index):
+        # The slider echoes every tick's int(frame) back here; taking that as a seek would drop
+        # the fraction and stall any speed below 1x, so only a different frame counts
+        if int(index) != self.index():
+            self.frame = float(index)
+
+
+def connect(slider, player, show):
+    """Slider callback and per-tick animation callback for player."""
+    def on_slider(value):
+        player.seek(value)
+        show(player.index())
+
+    def advance(_):
+        if not player.paused:
+            player.tick()
+            # set_val redraws through on_slider
+            slider.set_val(player.index())
+
+    slider.on_changed(on_slider)
+    return advance
+
+
+def check():
+    """Drive the real slider wiring headless at fractional speeds."""
+    plt.switch_backend('Agg')
+    fig = plt.figure()
+    slider = Slider(fig.add_axes([0.1, 0.1, 0.8, 0.1]), 'frame', 0, 100, valinit=10, valstep=1)
+    player = Playback(101, start=10)
+    shown = []
+    advance = connect(slider, player, shown.append)
+    player.speed = 0.5
+    for _ in range(20):
+        advance(None)
+    assert shown[1::2] == list(range(11, 21)), f"0.5x should move a frame every two ticks, showed {shown}"
+    player.speed = -0.25
+    shown.clear()
+    for _ in range(8):
+        advance(None)
+    assert shown == [19, 19, 19, 19, 18, 18, 18, 18], f"-0.25x should move back a frame every four ticks, showed {shown}"
+    player.seek(50)
+    assert player.frame == 50.0
+    print("playback ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded ball simulation.")
+    parser.add_argument("path", nargs='?', help="recording directory written by BallRecorder")
+    parser.add_argument("--fps", type=float, default=60, help="frames shown per second at speed 1")
+    parser.add_argument("--start", type=int, default=0, help="first frame to show")
+    parser.add_argument("--check", action='store_true', help="check the playback logic and exit")
+    args = parser.parse_args()
+    if args.check:
+        check()
+        return None
+    if args.path is None:
+        parser.error("a recording path is required")
+
+    replay = BallReplay(args.path)
+    if len(replay) == 0:
+        sys.exit(f"{args.path} has no complete frames")
+    meta = replay.meta
+
+    fig, ax = plt.subplots(figsize=(8, 8 * meta['height'] / meta['width']))
+    fig.subplots_adjust(bottom=0.12)
+    ax.set_xlim(0, meta['width'])
+    if meta['y_down']:
+        ax.set_ylim(meta['height'], 0)  # pygame screen coordinates
+    else:
+        ax.set_ylim(0, meta['height'])
+    ax.set_aspect('equal')
+    ax.set_facecolor('black')
+
+    diameter = 2 * replay.radius
+    balls = EllipseCollection(diameter, diameter, np.zeros_like(diameter), units='xy',
+                              facecolors=replay.color / 255.0,
+                              offsets=replay.frame(args.start).T, offset_transform=ax.transData)
+    ax.add_collection(balls)
+    info = ax.text(0.02, 0.97, '', transform=ax.transAxes, color='white', va='top')
+    slider = Slider(fig.add_axes([0.15, 0.03, 0.7, 0.03]), 'frame', 0, len(replay) - 1,
+                    valinit=args.start, valstep=1)
+
+    player = Playback(len(replay), start=args.start)
+
+    def show(index):
+        index = int(np.clip(index, 0, len(replay) - 1))
+        balls.set_offsets(replay.frame(index).T)
+        info.set_text(f"frame {index} / {len(replay) - 1}   speed {player.speed:g}x"
+                      f"{'   (paused)' if player.paused else ''}")
+        fig.canvas.draw_idle()
+
+    def on_key(event):
+        if event.key == ' ':
+            player.paused = not player.paused
+        elif event.key in ('left', 'right'):
+            direction = -1 if event.key == 'left' else 1
+            if player.paused:
+                player.step(direction)
+            else:
+                player.speed = direction * abs(player.speed)
+        elif event.key == 'up':
+            player.speed *= 2
+        elif event.key == 'down':
+            player.speed /= 2
+        slider.set_val(player.index())
+
+    tick = connect(slider, player, show)
+
+    def advance(frame):
+        tick(frame)
+        return balls, info
+
+    fig.canvas.mpl_connect('key_press_event', on_key)
+    show(args.start)
+    # Keep a reference so the animation isn't garbage collected
+    ani = FuncAnimation(fig, advance, interval=1000 / args.fps, cache_frame_data=False)
+    plt.show()
+    return ani
+
+
+if __name__ == "__main__":
+    main()